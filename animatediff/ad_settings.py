@@ -39,6 +39,9 @@ class AnimateDiffSettings:
         return self.adjust_pe.has_anything_to_apply() \
             or self.adjust_weight.has_anything_to_apply()
 
+    def get_adjust_weight_fingerprint(self) -> tuple:
+        return tuple(adjust.get_fingerprint() for adjust in self.adjust_weight.adjusts if adjust.has_anything_to_apply())
+
 
 class AdjustAbstract(ABC):
     def __init__(self, print_adjustment=False):
@@ -219,6 +222,9 @@ class AdjustWeight(AdjustAbstract):
             or self.has_attn_out_weight(self.OP_ANY) \
             or self.has_attn_out_bias(self.OP_ANY) \
             or self.has_other(self.OP_ANY)
+
+    def get_fingerprint(self) -> tuple:
+        return tuple(self._get_val(op=op, attr=attr) for attr in self.ATTRS for op in self.OPS)
     
     def _perform_op(self, model_dict: dict[str, Tensor], key: str, op: str, attr: str):
         val = self._get_val(op=op, attr=attr)
@@ -1,5 +1,9 @@
 # Modified from https://github.com/hehao13/CameraCtrl/blob/main/cameractrl/models/pose_adaptor.py
 # (whose parts were also taken from https://github.com/TencentARC/T2I-Adapter)
+import hashlib
+from collections import OrderedDict
+from typing import Union
+
 import torch
 import torch.nn as nn
 import numpy as np
@@ -39,25 +43,37 @@ def avg_pool_nd(dims, *args, **kwargs):
     raise ValueError(f"unsupported dimensions: {dims}")
 
 
-class CameraEntry:
-    def __init__(self, entry: list[float]):
-        self.entry = entry.copy()
-        self.orig_pose_width = entry[5]
-        self.orig_pose_height = entry[6]
-        # focal length/intrinsic camera parameters
-        fx, fy, cx, cy = entry[1:5]
-        self.fx = fx
-        self.fy = fy
-        self.cx = cx
-        self.cy = cy
-        w2c_mat = np.array(entry[7:]).reshape(3, 4)
-        w2c_mat_4x4 = np.eye(4)
-        w2c_mat_4x4[:3, :] = w2c_mat
-        self.w2c_mat = w2c_mat_4x4
-        self.c2w_mat = np.linalg.inv(w2c_mat_4x4)
-    
-    def clone(self):
-        return CameraEntry(entry=self.entry)
+class CameraPoses:
+    '''
+    Camera poses of all frames, stored as arrays instead of per-frame lists of 19 floats:
+    intrinsics (N, 4) as fx, fy, cx, cy; orig_dims (N, 2) as original pose width, height; w2c (N, 3, 4).
+    '''
+    def __init__(self, intrinsics: np.ndarray, orig_dims: np.ndarray, w2c: np.ndarray):
+        self.intrinsics = intrinsics
+        self.orig_dims = orig_dims
+        self.w2c = w2c
+        self._hash: str = None
+
+    @staticmethod
+    def from_poses(poses: list[list[float]]) -> 'CameraPoses':
+        poses = np.asarray(poses, dtype=np.float64).reshape(-1, 19)
+        # idx 0 is unused, 1-4 are fx, fy, cx, cy, 5-6 are original pose width and height, 7-18 are 3x4 w2c matrix
+        return CameraPoses(intrinsics=poses[:, 1:5].copy(), orig_dims=poses[:, 5:7].copy(), w2c=poses[:, 7:].reshape(-1, 3, 4).copy())
+
+    def __len__(self):
+        return len(self.w2c)
+
+    def select(self, idxs: Union[np.ndarray, list[int]]) -> 'CameraPoses':
+        idxs = np.asarray(idxs, dtype=np.int64)
+        return CameraPoses(intrinsics=self.intrinsics[idxs], orig_dims=self.orig_dims[idxs], w2c=self.w2c[idxs])
+
+    def get_hash(self) -> str:
+        if self._hash is None:
+            h = hashlib.sha256()
+            for array in (self.intrinsics, self.orig_dims, self.w2c):
+                h.update(np.ascontiguousarray(array, dtype=np.float64).tobytes())
+            self._hash = h.hexdigest()
+        return self._hash
 
 
 def get_parameter_dtype(parameter: torch.nn.Module):
@@ -85,9 +101,11 @@ def custom_meshgrid(*args):
     return torch.meshgrid(*args, indexing='ij')
 
 
-def get_relative_pose(cam_params: list[CameraEntry]):
-    abs_w2cs = [cam_param.w2c_mat for cam_param in cam_params]
-    abs_c2ws = [cam_param.c2w_mat for cam_param in cam_params]
+def get_relative_pose(w2c: np.ndarray):
+    # w2c: V, 3, 4
+    w2c_4x4 = np.zeros((len(w2c), 4, 4), dtype=np.float64)
+    w2c_4x4[:, :3, :] = w2c
+    w2c_4x4[:, 3, 3] = 1.0
     cam_to_origin = 0
     target_cam_c2w = np.array([
         [1, 0, 0, 0],
@@ -95,9 +113,10 @@ def get_relative_pose(cam_params: list[CameraEntry]):
         [0, 0, 1, 0],
         [0, 0, 0, 1]
     ])
-    abs2rel = target_cam_c2w @ abs_w2cs[0]
-    ret_poses = [target_cam_c2w, ] + [abs2rel @ abs_c2w for abs_c2w in abs_c2ws[1:]]
-    ret_poses = np.array(ret_poses, dtype=np.float32)
+    abs2rel = target_cam_c2w @ w2c_4x4[0]
+    ret_poses = np.empty((len(w2c), 4, 4), dtype=np.float32)
+    ret_poses[0] = target_cam_c2w
+    ret_poses[1:] = abs2rel @ np.linalg.inv(w2c_4x4[1:])
     return ret_poses
 
 
@@ -128,38 +147,53 @@ def ray_condition(K: Tensor, c2w: Tensor, H, W, device):
     rays_o = c2w[..., :3, 3]  # B, V, 3
     rays_o = rays_o[:, :, None].expand_as(rays_d)  # B, V, 3, HW
     # c2w @ directions
-    rays_dxo = torch.cross(rays_o, rays_d)
+    # dim must be explicit; otherwise the first dim of size 3 is used, which is V for 3-frame windows
+    rays_dxo = torch.cross(rays_o, rays_d, dim=-1)
     plucker = torch.cat([rays_dxo, rays_d], dim=-1)
     plucker = plucker.reshape(B, c2w.shape[1], H, W, 6)  # B, V, H, W, 6
     # plucker = plucker.permute(0, 1, 4, 2, 3)
     return plucker
 
 
-def prepare_pose_embedding(cam_params: list[CameraEntry], image_width, image_height):
-    # clone each CameraEntry in list so that CameraEntries don't get spoiled after a single run
-    cam_params = [entry.clone() for entry in cam_params]
+def get_intrinsics(cam_poses: CameraPoses, image_width, image_height) -> np.ndarray:
+    '''Returns (V, 4) fx, fy, cx, cy in pixels, with focal lengths adjusted for difference in aspect ratio.'''
+    fx, fy, cx, cy = cam_poses.intrinsics.T
     sample_wh_ratio = image_width / image_height
-
-    for cam_param in cam_params:
-        pose_wh_ratio = cam_param.orig_pose_width / cam_param.orig_pose_height
-
-        if pose_wh_ratio > sample_wh_ratio:
-            resized_ori_w = image_height * pose_wh_ratio
-            cam_param.fx = resized_ori_w * cam_param.fx / image_width
-        else:
-            resized_ori_h = image_width / pose_wh_ratio
-            cam_param.fy = resized_ori_h * cam_param.fy / image_height
-    intrinsic = np.asarray([[cam_param.fx * image_width,
-                             cam_param.fy * image_height,
-                             cam_param.cx * image_width,
-                             cam_param.cy * image_height]
-                            for cam_param in cam_params], dtype=np.float32)
-    
-    K = torch.as_tensor(intrinsic)[None]  # [1, 1, 4]
-    c2ws = get_relative_pose(cam_params)
-    c2ws = torch.as_tensor(c2ws)[None]  # [1, n_frame, 4, 4]
+    pose_wh_ratio = cam_poses.orig_dims[:, 0] / cam_poses.orig_dims[:, 1]
+    wider = pose_wh_ratio > sample_wh_ratio
+    resized_ori_w = image_height * pose_wh_ratio
+    resized_ori_h = image_width / pose_wh_ratio
+    fx = np.where(wider, resized_ori_w * fx / image_width, fx)
+    fy = np.where(wider, fy, resized_ori_h * fy / image_height)
+    return np.stack([fx * image_width, fy * image_height, cx * image_width, cy * image_height], axis=-1).astype(np.float32)
+
+
+# plucker embeddings are only a function of poses and resolution, so are reused between steps, windows, and runs;
+# at 6 floats per pixel per frame they get big quickly, so the cache is limited by total size rather than entry count
+POSE_EMBEDDING_CACHE_MAX_BYTES = 512 * 1024 * 1024
+_pose_embedding_cache: OrderedDict[tuple[str, int, int], Tensor] = OrderedDict()
+_pose_embedding_cache_bytes = 0
+
+
+def prepare_pose_embedding(cam_poses: CameraPoses, image_width, image_height):
+    '''Returns plucker embedding of shape (6, n_frame, H, W) on CPU; result may be shared, so must not be modified in place.'''
+    global _pose_embedding_cache_bytes
+    key = (cam_poses.get_hash(), image_width, image_height)
+    plucker_embedding = _pose_embedding_cache.get(key, None)
+    if plucker_embedding is not None:
+        _pose_embedding_cache.move_to_end(key)
+        return plucker_embedding
+    K = torch.as_tensor(get_intrinsics(cam_poses, image_width, image_height))[None]  # [1, n_frame, 4]
+    c2ws = torch.as_tensor(get_relative_pose(cam_poses.w2c))[None]  # [1, n_frame, 4, 4]
     plucker_embedding = ray_condition(K, c2ws, image_height, image_width, device='cpu')[0].permute(0, 3, 1, 2).contiguous()  # V, 6, H, W
     plucker_embedding = rearrange(plucker_embedding, "f c h w -> c f h w")
+    size = plucker_embedding.numel() * plucker_embedding.element_size()
+    if size <= POSE_EMBEDDING_CACHE_MAX_BYTES:
+        _pose_embedding_cache[key] = plucker_embedding
+        _pose_embedding_cache_bytes += size
+        while _pose_embedding_cache_bytes > POSE_EMBEDDING_CACHE_MAX_BYTES:
+            _, evicted = _pose_embedding_cache.popitem(last=False)
+            _pose_embedding_cache_bytes -= evicted.numel() * evicted.element_size()
     return plucker_embedding
 
 
@@ -1,8 +1,6 @@
-from typing import Union
+from typing import Union, TYPE_CHECKING
 
 import torch
-import torchvision
-from PIL import Image, ImageFont, ImageDraw
 
 import numpy as np
 from torch import Tensor
@@ -13,6 +11,8 @@ from comfy.model_patcher import ModelPatcher
 
 from .context_extras import ContextExtrasGroup
 from .utils_motion import get_sorted_list_via_attr
+if TYPE_CHECKING:  # PIL and torchvision are only needed for visualization, so import them on use
+    from PIL import Image, ImageFont, ImageDraw
 
 
 class ContextFuseMethod:
@@ -532,6 +532,8 @@ class VisualizeSettings:
         self.img_width = img_width
         self.grid = img_width // video_length
         self.img_height = self.grid * 5
+        import torchvision
+        from PIL import ImageFont
         self.pil_to_tensor = torchvision.transforms.Compose([torchvision.transforms.PILToTensor()])
         self.font_size = int(self.grid * 0.5)
         self.font = ImageFont.load_default(size=self.font_size)
@@ -548,18 +550,18 @@ class VisualizeSettings:
 
 
 class GridDisplay:
-    def __init__(self, draw: ImageDraw.ImageDraw, vs: VisualizeSettings, home_x: int=0, home_y: int=0):
+    def __init__(self, draw: 'ImageDraw.ImageDraw', vs: VisualizeSettings, home_x: int=0, home_y: int=0):
         self.home_x = home_x
         self.home_y = home_y
         self.draw = draw
         self.vs = vs
 
 
-def get_text_xy(input: str, font: ImageFont, x: int, y: int, centered=True):
+def get_text_xy(input: str, font: 'ImageFont', x: int, y: int, centered=True):
     return (x, y,)
 
 
-def draw_text(text: str, font: ImageFont, gd: GridDisplay, x: int, y: int, color=Colors.WHITE, centered=True):
+def draw_text(text: str, font: 'ImageFont', gd: GridDisplay, x: int, y: int, color=Colors.WHITE, centered=True):
     x, y = get_text_xy(text, font, x, y, centered=centered)
     gd.draw.text(xy=(gd.home_x+x, gd.home_y+y), text=text, fill=color, font=font)
 
@@ -613,6 +615,7 @@ def generate_context_visualization(model: ModelPatcher, context_opts: ContextOpt
         if params is not None:
             context_opts = params.context_options
     context_opts = context_opts.clone()
+    from PIL import Image, ImageDraw
     vs = VisualizeSettings(width, video_length)
     all_imgs = []
 
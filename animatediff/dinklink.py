@@ -11,9 +11,10 @@
 # purposely exposing node pack classes/functions with other node packs.
 ####################################################################################################
 from __future__ import annotations
-import comfy.hooks
+import importlib
+from collections.abc import ItemsView, KeysView, ValuesView
 
-from .motion_module_ad import AnimateDiffModel, AnimateDiffInfo
+import comfy.hooks
 
 DINKLINK = "__DINKLINK"
 
@@ -42,13 +43,95 @@ class DinkLinkConst:
     ADE_ANIMATEDIFFINFO = "AnimateDiffInfo"
     ADE_CREATE_MOTIONMODELPATCHER = "create_MotionModelPatcher"
 
+class LazyLinkDict(dict):
+    '''
+    Dict whose lazy entries are only imported on first access, so exposing classes does not import their
+    (heavy) modules at startup. Lazy entries behave like regular ones: they are reported by 'in', len, iteration,
+    keys/items/values and copies, and are imported when their value is accessed.
+    '''
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy: dict[str, tuple[str, str]] = {}
+
+    def set_lazy(self, key: str, module_name: str, attr_name: str):
+        super().pop(key, None)
+        self.lazy[key] = (module_name, attr_name)
+
+    def __missing__(self, key):
+        if key not in self.lazy:
+            raise KeyError(key)
+        module_name, attr_name = self.lazy[key]
+        value = getattr(importlib.import_module(module_name, __package__), attr_name)
+        self[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        self.lazy.pop(key, None)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        if key in self.lazy:
+            del self.lazy[key]
+        else:
+            super().__delitem__(key)
+
+    def __contains__(self, key):
+        return super().__contains__(key) or key in self.lazy
+
+    def __len__(self):
+        return super().__len__() + len(self.lazy)
+
+    def __iter__(self):
+        # snapshot, since accessing lazy entries while iterating moves them into the dict
+        return iter(list(super().keys()) + list(self.lazy.keys()))
+
+    def keys(self):
+        return KeysView(self)
+
+    def items(self):
+        return ItemsView(self)
+
+    def values(self):
+        return ValuesView(self)
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def pop(self, key, *args):
+        if key in self.lazy:
+            self[key]
+        return super().pop(key, *args)
+
+    def copy(self):
+        copied = LazyLinkDict(dict.items(self))
+        copied.lazy = self.lazy.copy()
+        return copied
+
+
 def prepare_dinklink():
     # expose classes
     d = get_dinklink()
-    link_ade = d.setdefault(DinkLinkConst.ADE, {})
+    link_ade = d.get(DinkLinkConst.ADE, None)
+    if not isinstance(link_ade, LazyLinkDict):
+        link_ade = LazyLinkDict(link_ade or {})
+        d[DinkLinkConst.ADE] = link_ade
     link_ade[DinkLinkConst.VERSION] = 10000
-    link_ade[DinkLinkConst.ADE_ANIMATEDIFFMODEL] = AnimateDiffModel
-    link_ade[DinkLinkConst.ADE_ANIMATEDIFFINFO] = AnimateDiffInfo
+    # motion_module_ad is heavy, so only import it once another node pack asks for its classes
+    link_ade.set_lazy(DinkLinkConst.ADE_ANIMATEDIFFMODEL, ".motion_module_ad", "AnimateDiffModel")
+    link_ade.set_lazy(DinkLinkConst.ADE_ANIMATEDIFFINFO, ".motion_module_ad", "AnimateDiffInfo")
+
+def prepare_dinklink_register_definitions():
+    # expose create_MotionModelPatcher
+    d = get_dinklink()
+    link_ade = d.setdefault(DinkLinkConst.ADE, {})
+    link_ade[DinkLinkConst.ADE_CREATE_MOTIONMODELPATCHER] = create_MotionModelPatcher
+
+def create_MotionModelPatcher(*args, **kwargs):
+    # model_injection is heavy, so only import it once a motion model patcher is actually requested
+    from .model_injection import create_MotionModelPatcher as _create_MotionModelPatcher
+    return _create_MotionModelPatcher(*args, **kwargs)
 
 def get_acn_outer_sample_wrapper(throw_exception=True):
     d = get_dinklink()
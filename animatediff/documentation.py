@@ -43,6 +43,11 @@ def register_description(node_id: str, desc: Union[list, dict]):
     descriptions[node_id] = desc
 
 
+def format_description(node_id: str, node_class):
+    if node_id in descriptions:
+        node_class.DESCRIPTION = as_html(descriptions[node_id])
+
+
 def format_descriptions(nodes):
     for k in descriptions:
         if k.endswith("_collapsed"):
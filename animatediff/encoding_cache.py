@@ -0,0 +1,277 @@
+import hashlib
+import json
+import os
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from typing import Union
+
+import torch
+from torch import Tensor
+import safetensors
+import safetensors.torch
+
+import folder_paths
+from comfy.sd import CLIP
+
+from .logger import logger
+
+
+class TextEncodingCache:
+    '''
+    On-disk cache of text encoder outputs (cond + pooled), shared between runs - and between ComfyUI instances,
+    if cache_dir is on shared storage.
+
+    Each entry is its own safetensors file, named by the hash of its key and sharded into subfolders by the first two
+    characters of the hash. Files are written to a temp file and renamed into place, so readers never see a partial file,
+    and concurrent writers of the same entry just replace each other's identical output. Instead of one index file that
+    several writers could clobber, the full key is kept in each file's metadata, and eviction works off of file sizes and
+    modification times (refreshed on every read, so oldest = least recently used).
+    '''
+    EXTENSION = ".safetensors"
+    TEMP_EXTENSION = ".tmp"
+    # unfinished temp files older than this are assumed to be from crashed writers
+    STALE_TEMP_SECONDS = 60 * 60
+    # when over budget, evict down to this fraction of max_bytes, so eviction does not run on every write
+    EVICT_TO_RATIO = 0.9
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        # estimated total size of entries; refreshed from disk whenever eviction runs
+        self.total_bytes: int = None
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    def get_path(self, key: str):
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}{self.EXTENSION}")
+
+    def load(self, key: str) -> Union[tuple[Tensor, Union[Tensor, None]], None]:
+        path = self.get_path(key)
+        if not os.path.isfile(path):
+            self.misses += 1
+            return None
+        try:
+            with safetensors.safe_open(path, framework="pt", device="cpu") as f:
+                if (f.metadata() or {}).get("key", None) != key:
+                    self.misses += 1
+                    return None
+                cond = f.get_tensor("cond")
+                pooled = f.get_tensor("pooled") if "pooled" in f.keys() else None
+        except Exception as e:
+            # file may have been evicted by another worker in the meantime
+            logger.debug(f"Could not read text encoding cache entry {path}; will encode instead. Error: {e}")
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return cond, pooled
+
+    def save(self, key: str, cond: Tensor, pooled: Union[Tensor, None]):
+        path = self.get_path(key)
+        temp_path = f"{path}.{os.getpid()}.{uuid.uuid4().hex}{self.TEMP_EXTENSION}"
+        tensors = {"cond": cond.detach().to(device="cpu").clone()}
+        if pooled is not None:
+            tensors["pooled"] = pooled.detach().to(device="cpu").clone()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            safetensors.torch.save_file(tensors, temp_path, metadata={"key": key})
+            # entry may already exist (e.g. written by another worker); only count the difference in size
+            try:
+                replaced_bytes = os.path.getsize(path)
+            except OSError:
+                replaced_bytes = 0
+            os.replace(temp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not write text encoding cache entry to {path}. Error: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+        self.writes += 1
+        if self.total_bytes is None:
+            self.evict()
+        else:
+            self.total_bytes += os.path.getsize(path) - replaced_bytes
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+
+    def evict(self):
+        '''Removes least recently used entries until total size is within budget; also refreshes total_bytes.'''
+        entries = []
+        now = time.time()
+        for shard in self._scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in self._scandir(shard.path):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if entry.name.endswith(self.TEMP_EXTENSION):
+                    if now - stat.st_mtime > self.STALE_TEMP_SECONDS:
+                        self._remove(entry.path)
+                    continue
+                if entry.name.endswith(self.EXTENSION):
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total_bytes = sum(size for _, size, _ in entries)
+        if total_bytes > self.max_bytes:
+            target_bytes = int(self.max_bytes * self.EVICT_TO_RATIO)
+            entries.sort()
+            for _, size, path in entries:
+                if total_bytes <= target_bytes:
+                    break
+                if self._remove(path):
+                    self.evictions += 1
+                total_bytes -= size
+        self.total_bytes = total_bytes
+
+    def get_stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "writes": self.writes, "evictions": self.evictions,
+                "bytes": self.total_bytes, "max_bytes": self.max_bytes}
+
+    @staticmethod
+    def _scandir(path: str):
+        try:
+            return list(os.scandir(path))
+        except OSError:
+            return []
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            # already removed by another worker
+            return True
+        except OSError as e:
+            logger.warning(f"Could not remove text encoding cache entry {path}. Error: {e}")
+            return False
+
+
+# caches are kept per directory, so size estimates and stats carry over between runs
+_text_encoding_caches: dict[str, TextEncodingCache] = {}
+
+
+def get_default_cache_dir():
+    return os.path.join(folder_paths.get_user_directory(), "ADE_text_encoding_cache")
+
+
+def get_text_encoding_cache(cache_dir: str, max_bytes: int) -> TextEncodingCache:
+    if not cache_dir:
+        cache_dir = get_default_cache_dir()
+    cache_dir = os.path.abspath(cache_dir)
+    cache = _text_encoding_caches.get(cache_dir, None)
+    if cache is None:
+        cache = TextEncodingCache(cache_dir=cache_dir, max_bytes=max_bytes)
+        _text_encoding_caches[cache_dir] = cache
+    elif cache.max_bytes != max_bytes:
+        cache.max_bytes = max_bytes
+        cache.evict()
+    return cache
+
+
+def get_encoding_cache_key(clip_fingerprint: str, tokens_key: tuple):
+    return json.dumps(["ADE_text_encoding_v1", clip_fingerprint, tokens_key], separators=(',', ':'))
+
+
+# base weight fingerprints per text encoder model; weights are never changed outside of patching, so these can be reused
+# (hashing every weight is slow for big text encoders, so it should only happen once per loaded model)
+_weights_fingerprints: weakref.WeakKeyDictionary[torch.nn.Module, str] = weakref.WeakKeyDictionary()
+# recently used patch fingerprints per patches_uuid, since patches_uuid changes whenever patches do
+_patches_fingerprints: OrderedDict[str, str] = OrderedDict()
+PATCHES_FINGERPRINT_CACHE_SIZE = 32
+
+
+def get_clip_fingerprint(clip: CLIP) -> Union[str, None]:
+    '''
+    Returns hash of everything besides tokens that affects text encoder outputs: weights, weight patches (LoRAs),
+    hooks and their current keyframe strengths, and clip skip. Returns None if any part could not be fingerprinted.
+    '''
+    try:
+        patcher = clip.patcher
+        model = patcher.model
+        weights_fingerprint = _weights_fingerprints.get(model, None)
+        if weights_fingerprint is None:
+            weights_fingerprint = _get_weights_fingerprint(model, getattr(patcher, "backup", {}))
+            _weights_fingerprints[model] = weights_fingerprint
+        patches_uuid = getattr(patcher, "patches_uuid", None)
+        if patches_uuid is None:
+            # without patches_uuid, there is no telling when patches change
+            logger.debug("CLIP patcher has no patches_uuid; text encoding cache will not be used.")
+            return None
+        patches_uuid = str(patches_uuid)
+        patches_fingerprint = _patches_fingerprints.get(patches_uuid, None)
+        if patches_fingerprint is None:
+            patches_fingerprint = _hash_value(patcher.patches)
+            _patches_fingerprints[patches_uuid] = patches_fingerprint
+            while len(_patches_fingerprints) > PATCHES_FINGERPRINT_CACHE_SIZE:
+                _patches_fingerprints.popitem(last=False)
+        else:
+            _patches_fingerprints.move_to_end(patches_uuid)
+        hooks_fingerprint = None
+        forced_hooks = getattr(patcher, "forced_hooks", None)
+        if forced_hooks is not None and len(forced_hooks.hooks) > 0:
+            hooks_fingerprint = _hash_value([(type(hook).__name__, getattr(hook, "strength_clip", None),
+                                              getattr(getattr(hook, "hook_keyframe", None), "strength", None),
+                                              getattr(hook, "weights_clip", None) or getattr(hook, "weights", None))
+                                             for hook in forced_hooks.hooks])
+        return _hash_value([type(model).__name__, weights_fingerprint, patches_fingerprint, hooks_fingerprint,
+                            getattr(clip, "layer_idx", None)])
+    except Exception as e:
+        logger.debug(f"Could not fingerprint CLIP for text encoding cache; cache will not be used. Error: {e}")
+        return None
+
+
+def _get_weights_fingerprint(model: torch.nn.Module, backup: dict) -> str:
+    h = hashlib.sha256()
+    for name, weight in model.state_dict().items():
+        # if currently patched, original weight is in backup
+        if name in backup:
+            weight = backup[name].weight
+        h.update(name.encode())
+        h.update(_hash_tensor(weight).encode())
+    return h.hexdigest()
+
+
+def _hash_tensor(tensor: Tensor) -> str:
+    # every byte is hashed, so edits that only touch a few values (e.g. a single embedding row) are still told apart
+    h = hashlib.sha256(f"{tuple(tensor.shape)}{tensor.dtype}".encode())
+    if tensor.is_meta or tensor.numel() == 0:
+        return h.hexdigest()
+    # viewed as bytes, since numpy does not support every torch dtype (e.g. bfloat16)
+    data = tensor.detach().to(device="cpu").contiguous().reshape(-1).view(torch.uint8)
+    h.update(memoryview(data.numpy()))
+    return h.hexdigest()
+
+
+def _hash_value(value, depth=0) -> str:
+    h = hashlib.sha256()
+    h.update(_describe_value(value, depth).encode())
+    return h.hexdigest()
+
+
+def _describe_value(value, depth: int) -> str:
+    if depth > 8:
+        raise ValueError("Value is nested too deeply to fingerprint.")
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return repr(value)
+    if isinstance(value, Tensor):
+        return _hash_tensor(value)
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{_describe_value(k, depth+1)}:{_describe_value(v, depth+1)}" for k, v in value.items()) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(_describe_value(x, depth+1) for x in value) + "]"
+    # weight adapters and similar objects hold their data in attributes
+    if hasattr(value, "__dict__"):
+        return f"{type(value).__name__}{_describe_value(vars(value), depth+1)}"
+    raise ValueError(f"Cannot fingerprint value of type {type(value).__name__}.")
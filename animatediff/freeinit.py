@@ -10,9 +10,13 @@
 
 # Code has been modified from https://github.com/TianxingWu/FreeInit
 
+from collections import OrderedDict
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
 import torch
 import torch.fft as fft
-import math
 
 
 class FreeInitFilter:
@@ -24,36 +28,113 @@ class FreeInitFilter:
     LIST = [GAUSSIAN, BUTTERWORTH, IDEAL, BOX]
 
 
-def freq_mix_3d(x: torch.Tensor, noise: torch.Tensor, LPF: torch.Tensor):
+class FreeInitMixDevice:
+    LATENTS = "latents"
+    CPU = "cpu"
+    GPU = "gpu"
+
+    LIST = [LATENTS, CPU, GPU]
+
+
+# latents with more frames than this get mixed in chunks
+FREQ_MIX_CHUNK_FRAMES = 32
+
+
+def freq_mix_3d(x: torch.Tensor, noise: torch.Tensor, LPF: torch.Tensor, chunk_frames: int=None, workers: int=1, device=None):
     """
     Noise reinitialization.
 
     Args:
         x: diffused latent
         noise: randomly sampled noise
-        LPF: low pass filter
+        LPF: low pass filter, from get_rfft_freq_filter
+        chunk_frames: if x has more frames than this, mix in chunks (see freq_mix_3d_chunked)
+        workers: (only for chunks) amount of chunks to process at the same time
+        device: (only for chunks) device to do FFTs on; defaults to x's device
     """
     noise = noise.to(dtype=x.dtype, device=x.device)
+    if chunk_frames is not None and x.shape[-4] > chunk_frames:
+        return freq_mix_3d_chunked(x=x, noise=noise, LPF=LPF, chunk_frames=chunk_frames, workers=workers, device=device)
     LPF = LPF.to(dtype=x.dtype, device=x.device)
-    # FFT
-    x_freq = fft.fftn(x, dim=(-4, -2, -1))
-    x_freq = fft.fftshift(x_freq, dim=(-4, -2, -1))
-    noise_freq = fft.fftn(noise, dim=(-4, -2, -1))
-    noise_freq = fft.fftshift(noise_freq, dim=(-4, -2, -1))
-
-    # frequency mix
-    HPF = 1 - LPF
-    x_freq_low = x_freq * LPF
-    noise_freq_high = noise_freq * HPF
-    x_freq_mixed = x_freq_low + noise_freq_high # mix in freq domain
-
-    # IFFT
-    x_freq_mixed = fft.ifftshift(x_freq_mixed, dim=(-4, -2, -1))
-    x_mixed = fft.ifftn(x_freq_mixed, dim=(-4, -2, -1)).real
+    # x_freq * LPF + noise_freq * (1 - LPF) == noise_freq + (x_freq - noise_freq) * LPF,
+    # so only the difference needs to be transformed; inputs are real, so only half of the last dim is needed
+    diff_freq = fft.rfftn(x - noise, dim=(-4, -2, -1))
+    diff_freq.mul_(LPF)
+    return noise + fft.irfftn(diff_freq, s=(x.shape[-4], x.shape[-2], x.shape[-1]), dim=(-4, -2, -1))
+
 
+def freq_mix_3d_chunked(x: torch.Tensor, noise: torch.Tensor, LPF: torch.Tensor, chunk_frames: int=16, workers: int=1, device=None):
+    """
+    Same as freq_mix_3d, but the 3D FFT is split into a spatial FFT per block of frames and a temporal FFT per tile of rows,
+    so that only one (half-size) frequency buffer is kept on x's device and FFTs only ever see a chunk at a time.
+    """
+    T, H, W = x.shape[-4], x.shape[-2], x.shape[-1]
+    device = device if device is not None else x.device
+    work_dtype = torch.float64 if x.dtype == torch.float64 else torch.float32
+    noise = noise.to(dtype=x.dtype, device=x.device)
+    diff_freq = torch.empty((*x.shape[:-1], W//2 + 1), dtype=torch.complex128 if work_dtype == torch.float64 else torch.complex64, device=x.device)
+    x_mixed = torch.empty_like(x)
+    # tiles of rows hold about as many values as blocks of frames
+    tile_rows = max(1, (chunk_frames * H) // T)
+
+    def spatial_fft(start_idx: int):
+        block = (x[start_idx:start_idx+chunk_frames] - noise[start_idx:start_idx+chunk_frames]).to(dtype=work_dtype, device=device)
+        diff_freq[start_idx:start_idx+chunk_frames] = fft.rfft2(block).to(x.device)
+
+    def temporal_filter(start_row: int):
+        tile = diff_freq[..., start_row:start_row+tile_rows, :].to(device)
+        tile = fft.fft(tile, dim=-4)
+        tile.mul_(LPF[..., start_row:start_row+tile_rows, :].to(dtype=work_dtype, device=device))
+        diff_freq[..., start_row:start_row+tile_rows, :] = fft.ifft(tile, dim=-4).to(x.device)
+
+    def spatial_ifft(start_idx: int):
+        block = fft.irfft2(diff_freq[start_idx:start_idx+chunk_frames].to(device), s=(H, W)).to(dtype=x.dtype, device=x.device)
+        x_mixed[start_idx:start_idx+chunk_frames] = noise[start_idx:start_idx+chunk_frames] + block
+
+    _run_chunks(spatial_fft, range(0, T, chunk_frames), workers)
+    _run_chunks(temporal_filter, range(0, H, tile_rows), workers)
+    _run_chunks(spatial_ifft, range(0, T, chunk_frames), workers)
     return x_mixed
 
 
+def _run_chunks(func: Callable[[int], None], starts: Iterable[int], workers: int):
+    # chunks write to separate parts of their buffers, so they can run in any order
+    if workers <= 1:
+        for start in starts:
+            func(start)
+        return
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ADE_freeinit") as executor:
+        list(executor.map(func, starts))
+
+
+# recently used rfft filters, keyed by (shape, device, filter_type, n, d_s, d_t)
+_rfft_filter_cache: OrderedDict[tuple, torch.Tensor] = OrderedDict()
+RFFT_FILTER_CACHE_SIZE = 4
+
+
+def get_rfft_freq_filter(shape, device, filter_type, n, d_s, d_t):
+    """
+    Form the frequency filter for noise reinitialization, in the layout expected by freq_mix_3d; results are cached.
+
+    The filter is moved from fftshift-ed to natural frequency order, and made symmetric across positive and negative
+    frequencies (which is what taking the real part of the complex IFFT does), so that only the rfft half is needed.
+    """
+    key = (tuple(shape), str(device), filter_type, n, d_s, d_t)
+    if key in _rfft_filter_cache:
+        _rfft_filter_cache.move_to_end(key)
+        return _rfft_filter_cache[key]
+    dims = (-4, -2, -1)
+    LPF = fft.ifftshift(get_freq_filter(shape, device="cpu", filter_type=filter_type, n=n, d_s=d_s, d_t=d_t), dim=dims)
+    # value at negated frequency index (-k mod N) for each of the dims
+    LPF_negated = torch.roll(torch.flip(LPF, dims=dims), shifts=(1, 1, 1), dims=dims)
+    LPF = (LPF + LPF_negated) / 2
+    LPF = LPF[..., :shape[-1]//2 + 1].contiguous().to(device)
+    _rfft_filter_cache[key] = LPF
+    while len(_rfft_filter_cache) > RFFT_FILTER_CACHE_SIZE:
+        _rfft_filter_cache.popitem(last=False)
+    return LPF
+
+
 def get_freq_filter(shape, device, filter_type, n, d_s, d_t):
     """
     Form the frequency filter for noise reinitialization.
@@ -76,6 +157,21 @@ def get_freq_filter(shape, device, filter_type, n, d_s, d_t):
     else:
         raise NotImplementedError
 
+
+def _get_filter_shape(shape):
+    # filters are the same for every channel, so channel dim is left to broadcasting
+    return (shape[-4], 1, shape[-2], shape[-1])
+
+
+def _get_d_square(shape, d_s, d_t):
+    T, H, W = shape[-4], shape[-2], shape[-1]
+    t = ((d_s/d_t)*(2*torch.arange(T, dtype=torch.float64)/T-1))**2
+    h = (2*torch.arange(H, dtype=torch.float64)/H-1)**2
+    w = (2*torch.arange(W, dtype=torch.float64)/W-1)**2
+    # T, 1, H, W
+    return (t.reshape(T, 1, 1, 1) + h.reshape(1, 1, H, 1)) + w.reshape(1, 1, 1, W)
+
+
 def gaussian_low_pass_filter(shape, d_s=0.25, d_t=0.25):
     """
     Compute the gaussian low pass filter mask.
@@ -85,16 +181,10 @@ def gaussian_low_pass_filter(shape, d_s=0.25, d_t=0.25):
         d_s: normalized stop frequency for spatial dimensions (0.0-1.0)
         d_t: normalized stop frequency for temporal dimension (0.0-1.0)
     """
-    T, H, W = shape[-4], shape[-2], shape[-1]
-    mask = torch.zeros(shape)
     if d_s==0 or d_t==0:
-        return mask
-    for t in range(T):
-        for h in range(H):
-            for w in range(W):
-                d_square = (((d_s/d_t)*(2*t/T-1))**2 + (2*h/H-1)**2 + (2*w/W-1)**2)
-                mask[t, ..., h,w] = math.exp(-1/(2*d_s**2) * d_square)
-    return mask
+        return torch.zeros(_get_filter_shape(shape))
+    d_square = _get_d_square(shape, d_s=d_s, d_t=d_t)
+    return torch.exp(-1/(2*d_s**2) * d_square).to(torch.float32)
 
 
 def butterworth_low_pass_filter(shape, n=4, d_s=0.25, d_t=0.25):
@@ -107,16 +197,10 @@ def butterworth_low_pass_filter(shape, n=4, d_s=0.25, d_t=0.25):
         d_s: normalized stop frequency for spatial dimensions (0.0-1.0)
         d_t: normalized stop frequency for temporal dimension (0.0-1.0)
     """
-    T, H, W = shape[-4], shape[-2], shape[-1]
-    mask = torch.zeros(shape)
     if d_s==0 or d_t==0:
-        return mask
-    for t in range(T):
-        for h in range(H):
-            for w in range(W):
-                d_square = (((d_s/d_t)*(2*t/T-1))**2 + (2*h/H-1)**2 + (2*w/W-1)**2)
-                mask[t, ..., h,w] = 1 / (1 + (d_square / d_s**2)**n)
-    return mask
+        return torch.zeros(_get_filter_shape(shape))
+    d_square = _get_d_square(shape, d_s=d_s, d_t=d_t)
+    return (1 / (1 + (d_square / d_s**2)**n)).to(torch.float32)
 
 
 def ideal_low_pass_filter(shape, d_s=0.25, d_t=0.25):
@@ -128,16 +212,10 @@ def ideal_low_pass_filter(shape, d_s=0.25, d_t=0.25):
         d_s: normalized stop frequency for spatial dimensions (0.0-1.0)
         d_t: normalized stop frequency for temporal dimension (0.0-1.0)
     """
-    T, H, W = shape[-4], shape[-2], shape[-1]
-    mask = torch.zeros(shape)
     if d_s==0 or d_t==0:
-        return mask
-    for t in range(T):
-        for h in range(H):
-            for w in range(W):
-                d_square = (((d_s/d_t)*(2*t/T-1))**2 + (2*h/H-1)**2 + (2*w/W-1)**2)
-                mask[t, ...,h,w] =  1 if d_square <= d_s*2 else 0
-    return mask
+        return torch.zeros(_get_filter_shape(shape))
+    d_square = _get_d_square(shape, d_s=d_s, d_t=d_t)
+    return (d_square <= d_s*2).to(torch.float32)
 
 
 def box_low_pass_filter(shape, d_s=0.25, d_t=0.25):
@@ -150,7 +228,7 @@ def box_low_pass_filter(shape, d_s=0.25, d_t=0.25):
         d_t: normalized stop frequency for temporal dimension (0.0-1.0)
     """
     T, H, W = shape[-4], shape[-2], shape[-1]
-    mask = torch.zeros(shape)
+    mask = torch.zeros(_get_filter_shape(shape))
     if d_s==0 or d_t==0:
         return mask
 
@@ -161,4 +239,3 @@ def box_low_pass_filter(shape, d_s=0.25, d_t=0.25):
     mask[cframe - threshold_t:cframe + threshold_t, ..., crow - threshold_s:crow + threshold_s, ccol - threshold_s:ccol + threshold_s] = 1.0
 
     return mask
-
@@ -1,6 +1,8 @@
 import copy
-from typing import Union, Callable
-from collections import namedtuple
+from typing import Any, Union, Callable
+from collections import namedtuple, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 from einops import rearrange
 from torch import Tensor
@@ -8,6 +10,8 @@ import torch.nn.functional as F
 import torch
 import uuid
 import math
+import weakref
+import numpy as np
 
 import comfy.conds
 import comfy.lora
@@ -19,7 +23,7 @@ from comfy.model_base import BaseModel
 from comfy.sd import CLIP, VAE
 
 from .ad_settings import AnimateDiffSettings, AdjustPE, AdjustWeight
-from .adapter_cameractrl import CameraPoseEncoder, CameraEntry, prepare_pose_embedding
+from .adapter_cameractrl import CameraPoseEncoder, CameraPoses, prepare_pose_embedding
 from .context import ContextOptions, ContextOptions, ContextOptionsGroup
 from .motion_module_ad import (AnimateDiffModel, AnimateDiffFormat, AnimateDiffInfo, EncoderOnlyAnimateDiffModel, VersatileAttention, PerBlock, AllPerBlocks,
                                VanillaTemporalModule, has_mid_block, normalize_ad_state_dict, get_position_encoding_max_len)
@@ -29,16 +33,9 @@ from .utils_motion import (ADKeyframe, ADKeyframeGroup, MotionCompatibilityError
                            ade_broadcast_image_to, extend_to_batch_size, prepare_mask_batch)
 from .conditioning import HookRef, LoraHook, LoraHookGroup, LoraHookMode
 from .motion_lora import MotionLoraInfo, MotionLoraList
-from .utils_model import get_motion_lora_path, get_motion_model_path, get_sd_model_type, vae_encode_raw_batched
+from .utils_model import calculate_file_hash, get_motion_lora_path, get_motion_model_path, get_sd_model_type, vae_encode_raw_batched
 from .sample_settings import SampleSettings, SeedNoiseGeneration
-from .dinklink import DinkLinkConst, get_dinklink, get_acn_outer_sample_wrapper
-
-
-def prepare_dinklink_register_definitions():
-    # expose create_MotionModelPatcher
-    d = get_dinklink()
-    link_ade = d.setdefault(DinkLinkConst.ADE, {})
-    link_ade[DinkLinkConst.ADE_CREATE_MOTIONMODELPATCHER] = create_MotionModelPatcher
+from .dinklink import get_acn_outer_sample_wrapper
 
 
 class MotionModelPatcher(ModelPatcher):
@@ -194,7 +191,9 @@ def create_MotionModelPatcher(model, load_device, offload_device) -> MotionModel
     patcher.add_callback_with_key(CallbacksMP.ON_LOAD, ade, _mm_handle_float8_pe_tensors_callback)
     patcher.add_callback_with_key(CallbacksMP.ON_PRE_RUN, ade, _mm_pre_run_callback)
     patcher.add_callback_with_key(CallbacksMP.ON_CLEANUP, ade, _mm_clean_callback)
+    patcher.add_callback_with_key(CallbacksMP.ON_CLONE, ade, _mm_clone_callback)
     patcher.set_attachments(ade, MotionModelAttachment())
+    _mm_set_cached_patch_weight_to_device(patcher)
     return patcher
 
 
@@ -235,11 +234,54 @@ def _mm_clean_callback(self: MotionModelPatcher, *args, **kwargs):
     attachment = get_mm_attachment(self)
     attachment.cleanup(self)
 
+def _mm_clone_callback(self: MotionModelPatcher, n: MotionModelPatcher, *args, **kwargs):
+    _mm_set_cached_patch_weight_to_device(n)
+
+def _mm_set_cached_patch_weight_to_device(patcher: MotionModelPatcher):
+    # bound per-instance, since clones are created as vanilla ModelPatchers
+    def patch_weight_to_device(key, device_to=None, inplace_update=False):
+        return _mm_cached_patch_weight_to_device(patcher, key, device_to=device_to, inplace_update=inplace_update)
+    patcher.patch_weight_to_device = patch_weight_to_device
+
+def _mm_cached_patch_weight_to_device(self: MotionModelPatcher, key: str, device_to=None, inplace_update=False):
+    cache_key = None
+    if key in self.patches:
+        cache_key = get_mm_attachment(self).get_weight_cache_key(self)
+    if cache_key is None:
+        return ModelPatcher.patch_weight_to_device(self, key, device_to=device_to, inplace_update=inplace_update)
+    cached_weight = motion_weight_cache.get_weight(cache_key, key)
+    # weights loaded from same file may have been cast to a different dtype
+    if cached_weight is not None and cached_weight.dtype != comfy.utils.get_attr(self.model, key).dtype:
+        cached_weight = None
+    if cached_weight is None:
+        ModelPatcher.patch_weight_to_device(self, key, device_to=device_to, inplace_update=inplace_update)
+        patched_weight: Tensor = comfy.utils.get_attr(self.model, key)
+        motion_weight_cache.set_weight(cache_key, key, patched_weight.detach().to(device=self.offload_device, copy=True))
+        return
+    # cached weight is already fully patched, so only need to back up original weight and swap in cached one
+    inplace_update = self.weight_inplace_update or inplace_update
+    if key not in self.backup:
+        weight: Tensor = comfy.utils.get_attr(self.model, key)
+        self.backup[key] = namedtuple('Dimension', ['weight', 'inplace_update'])(weight.to(device=self.offload_device, copy=inplace_update), inplace_update)
+    if inplace_update:
+        comfy.utils.copy_to_param(self.model, key, cached_weight.to(device=device_to) if device_to is not None else cached_weight)
+    else:
+        # always swap in a copy, so that in-place writes to the model's weight cannot alter the cached weight
+        if device_to is not None:
+            cached_weight = cached_weight.to(device=device_to, copy=True)
+        else:
+            cached_weight = cached_weight.clone()
+        comfy.utils.set_attr_param(self.model, key, cached_weight)
+
 
 def get_mm_attachment(patcher: MotionModelPatcher) -> 'MotionModelAttachment':
     return patcher.get_attachment(ModelPatcherHelper.ADE)
 
 
+# encoded CameraCtrl features of context windows are kept on device between steps, up to this total size
+CAMERA_FEATURES_CACHE_MAX_BYTES = 512 * 1024**2
+
+
 class MotionModelAttachment:
     def __init__(self):
         self.timestep_percent_range = (0.0, 1.0)
@@ -259,9 +301,10 @@ class MotionModelAttachment:
         self.img_latents_shape: tuple = None
 
         # CameraCtrl
-        self.orig_camera_entries: list[CameraEntry] = None
-        self.camera_features: list[Tensor] = None  # temporary
-        self.camera_features_shape: tuple = None
+        self.orig_camera_poses: CameraPoses = None
+        self.camera_features_cache: dict[tuple, list[Tensor]] = {}  # temporary; per context window
+        self.camera_features_cache_bytes = 0
+        self.camera_window: tuple = None
         self.cameractrl_multival: Union[float, Tensor] = None
 
         # PIA
@@ -273,6 +316,12 @@ class MotionModelAttachment:
         self.prev_current_pia_input: InputPIA = None
         self.pia_multival: Union[float, Tensor] = None
 
+        # Motion LoRA weight cache
+        self.weights_id: str = None
+        self.weights_fingerprint: tuple = ()
+        self.motion_loras: MotionLoraList = MotionLoraList()
+        self.lora_patches_uuid: uuid.UUID = None
+
         # FancyVideo
         self.orig_fancy_images: Tensor = None
         self.fancy_vae: VAE = None
@@ -416,31 +465,45 @@ class MotionModelAttachment:
         full_length = ad_params["full_length"]
         sub_idxs = ad_params["sub_idxs"]
         goal_length = x.size(0) // batched_number
-        # calculate camera_features if needed
-        if self.camera_features_shape is None or sub_idxs != self.prev_sub_idxs or batched_number != self.prev_batched_number:
-            # make sure there are enough camera_poses to match full_length
-            camera_poses = self.orig_camera_entries.copy()
-            if len(camera_poses) < full_length:
-                for i in range(full_length-len(camera_poses)):
-                    camera_poses.append(camera_poses[-1])
-            if sub_idxs is not None:
-                camera_poses = [camera_poses[idx] for idx in sub_idxs]
-            # make sure camera_poses matches goal_length
-            if len(camera_poses) > goal_length:
-                camera_poses = camera_poses[:goal_length]
-            elif len(camera_poses) < goal_length:
-                # pad the camera_poses with the last element to match goal_length
-                for i in range(goal_length-len(camera_poses)):
-                    camera_poses.append(camera_poses[-1])
-            # create encoded embeddings
-            b, c, h, w = x.shape
-            plucker_embedding = prepare_pose_embedding(camera_poses, image_width=w*8, image_height=h*8).to(dtype=x.dtype, device=x.device)
-            camera_embedding = patcher.model.camera_encoder(plucker_embedding, video_length=goal_length, batched_number=batched_number)
+        b, c, h, w = x.shape
+        # camera poses do not change between steps, so the features of each context window only need to be encoded once
+        window_key = (tuple(sub_idxs) if sub_idxs is not None else None, full_length, goal_length, h, w, x.dtype, x.device)
+        camera_window = (window_key, batched_number)
+        if camera_window != self.camera_window:
+            camera_features = self.camera_features_cache.get(window_key, None)
+            if camera_features is None:
+                camera_features = self.encode_camera_features(patcher, x, full_length, sub_idxs, goal_length)
+                # windows are visited in the same order every step, so once the cache is full, keep what is
+                # already cached instead of evicting (least recently used eviction would never get a hit)
+                size = sum(feature.numel() * feature.element_size() for feature in camera_features)
+                if self.camera_features_cache_bytes + size <= CAMERA_FEATURES_CACHE_MAX_BYTES:
+                    self.camera_features_cache[window_key] = camera_features
+                    self.camera_features_cache_bytes += size
+            # camera features are (h w) f c, with cond_or_uncond batches stacked along first dim
+            camera_embedding = [feature.repeat(batched_number, 1, 1) for feature in camera_features]
             patcher.model.set_camera_features(camera_features=camera_embedding)
-            self.camera_features_shape = len(camera_embedding)
+            self.camera_window = camera_window
         self.prev_sub_idxs = sub_idxs
         self.prev_batched_number = batched_number
 
+    def encode_camera_features(self, patcher: MotionModelPatcher, x: Tensor, full_length: int, sub_idxs: list[int], goal_length: int) -> list[Tensor]:
+        # make sure there are enough camera_poses to match full_length, by repeating the last pose
+        pose_idxs = np.arange(max(full_length, len(self.orig_camera_poses)))
+        pose_idxs = np.minimum(pose_idxs, len(self.orig_camera_poses)-1)
+        if sub_idxs is not None:
+            pose_idxs = pose_idxs[sub_idxs]
+        # make sure camera_poses matches goal_length, padding with the last element if needed
+        if len(pose_idxs) > goal_length:
+            pose_idxs = pose_idxs[:goal_length]
+        elif len(pose_idxs) < goal_length:
+            pose_idxs = np.concatenate([pose_idxs, np.full(goal_length-len(pose_idxs), pose_idxs[-1])])
+        # poses are relative to the first pose of the window
+        camera_poses = self.orig_camera_poses.select(pose_idxs)
+        # create encoded embeddings
+        b, c, h, w = x.shape
+        plucker_embedding = prepare_pose_embedding(camera_poses, image_width=w*8, image_height=h*8).to(dtype=x.dtype, device=x.device)
+        return patcher.model.camera_encoder(plucker_embedding, video_length=goal_length, batched_number=1)
+
     def get_pia_c_concat(self, model: BaseModel, x: Tensor) -> Tensor:
         # if have cached shape, check if matches - if so, return cached pia_latents
         if self.prev_pia_latents_shape is not None:
@@ -542,6 +605,13 @@ class MotionModelAttachment:
         finally:
             comfy.model_management.load_models_gpu(cached_loaded_models)
 
+    def get_weight_cache_key(self, patcher: MotionModelPatcher) -> Union[tuple, None]:
+        # only cache weights when patches are known to come exclusively from motion LoRAs
+        if self.weights_id is None or len(self.motion_loras.loras) == 0 or patcher.patches_uuid != self.lora_patches_uuid:
+            return None
+        loras = tuple(sorted((lora.name, lora.strength) for lora in self.motion_loras.loras))
+        return (self.weights_id, loras, self.weights_fingerprint)
+
     def is_pia(self, patcher: MotionModelPatcher):
         return patcher.model.mm_info.mm_format == AnimateDiffFormat.PIA and self.orig_pia_images is not None
 
@@ -556,9 +626,9 @@ class MotionModelAttachment:
         self.img_features = None
         self.img_latents_shape = None
         # CameraCtrl
-        del self.camera_features
-        self.camera_features = None
-        self.camera_features_shape = None
+        self.camera_features_cache.clear()
+        self.camera_features_cache_bytes = 0
+        self.camera_window = None
         # PIA
         self.combined_pia_mask = None
         self.combined_pia_effect = None
@@ -590,13 +660,18 @@ class MotionModelAttachment:
         n.orig_insertion_weights = self.orig_insertion_weights.copy() if self.orig_insertion_weights is not None else self.orig_insertion_weights
         n.orig_apply_ref_when_disabled = self.orig_apply_ref_when_disabled
         # CameraCtrl
-        n.orig_camera_entries = self.orig_camera_entries
+        n.orig_camera_poses = self.orig_camera_poses
         n.cameractrl_multival = self.cameractrl_multival
         # PIA
         n.orig_pia_images = self.orig_pia_images
         n.pia_vae = self.pia_vae
         n.pia_input = self.pia_input
         n.pia_multival = self.pia_multival
+        # Motion LoRA weight cache
+        n.weights_id = self.weights_id
+        n.weights_fingerprint = self.weights_fingerprint
+        n.motion_loras = self.motion_loras.clone()
+        n.lora_patches_uuid = self.lora_patches_uuid
         return n
 
 
@@ -677,6 +752,88 @@ class MotionModelGroup:
         return ", ".join(identifiers)
 
 
+MOTION_WEIGHT_CACHE_MAX_BYTES = 2 * 1024**3
+
+
+class MotionWeightCache:
+    '''
+    Bounded LRU cache of fully patched motion model weights, so that switching back to a recently used
+    combination of motion LoRAs does not require recalculating every patched weight. Total size is bounded by max_bytes;
+    weight sets of a weights_id are released once no motion model with those weights exists anymore.
+    '''
+    def __init__(self, max_bytes: int=MOTION_WEIGHT_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.weight_sets: OrderedDict[tuple, dict[str, Tensor]] = OrderedDict()
+        # models are tracked per weights_id, since models loaded from the same file share weight sets
+        self.tracked_models: weakref.WeakKeyDictionary[torch.nn.Module, str] = weakref.WeakKeyDictionary()
+        self.model_counts: dict[str, int] = {}
+        # filled by finalizers, which can run at any point during garbage collection; handled on next cache access
+        self.pending_releases: list[str] = []
+
+    def track_model(self, weights_id: str, model: torch.nn.Module):
+        if weights_id is None or model in self.tracked_models:
+            return
+        self.tracked_models[model] = weights_id
+        self.model_counts[weights_id] = self.model_counts.get(weights_id, 0) + 1
+        weakref.finalize(model, self.pending_releases.append, weights_id)
+
+    def get_weight(self, cache_key: tuple, key: str) -> Union[Tensor, None]:
+        self._handle_pending_releases()
+        weight_set = self.weight_sets.get(cache_key, None)
+        if weight_set is None:
+            return None
+        self.weight_sets.move_to_end(cache_key)
+        return weight_set.get(key, None)
+
+    def set_weight(self, cache_key: tuple, key: str, weight: Tensor):
+        self._handle_pending_releases()
+        weight_set = self.weight_sets.get(cache_key, None)
+        if weight_set is None:
+            weight_set = {}
+            self.weight_sets[cache_key] = weight_set
+        self.weight_sets.move_to_end(cache_key)
+        size = weight.numel() * weight.element_size()
+        # evict least recently used weight sets to make room; if the current set alone does not fit,
+        # leave the rest of its weights uncached (missing weights are just patched as usual)
+        while self.total_bytes + size > self.max_bytes and len(self.weight_sets) > 1:
+            self._remove(next(iter(self.weight_sets)))
+        if self.total_bytes + size > self.max_bytes:
+            return
+        old_weight = weight_set.get(key, None)
+        if old_weight is not None:
+            self.total_bytes -= old_weight.numel() * old_weight.element_size()
+        weight_set[key] = weight
+        self.total_bytes += size
+
+    def release(self, weights_id: str):
+        if weights_id is None:
+            return
+        for cache_key in [x for x in self.weight_sets.keys() if x[0] == weights_id]:
+            self._remove(cache_key)
+
+    def clear(self):
+        self.weight_sets.clear()
+        self.total_bytes = 0
+
+    def _handle_pending_releases(self):
+        while len(self.pending_releases) > 0:
+            weights_id = self.pending_releases.pop()
+            count = self.model_counts.get(weights_id, 0) - 1
+            if count > 0:
+                self.model_counts[weights_id] = count
+                continue
+            self.model_counts.pop(weights_id, None)
+            self.release(weights_id)
+
+    def _remove(self, cache_key: tuple):
+        weight_set = self.weight_sets.pop(cache_key)
+        self.total_bytes -= sum(weight.numel() * weight.element_size() for weight in weight_set.values())
+
+
+motion_weight_cache = MotionWeightCache()
+
+
 def get_vanilla_model_patcher(m: ModelPatcher) -> ModelPatcher:
     model = ModelPatcher(m.model, m.load_device, m.offload_device, m.size, weight_inplace_update=m.weight_inplace_update)
     model.patches = {}
@@ -690,6 +847,19 @@ def get_vanilla_model_patcher(m: ModelPatcher) -> ModelPatcher:
     return model
 
 
+MAX_LOAD_WORKERS = 4
+
+def run_loads_in_parallel(load_funcs: list[Callable[[], Any]]) -> list:
+    '''
+    Runs file reads and CPU-side conversions concurrently, returning results in the same order as load_funcs.
+    '''
+    if len(load_funcs) <= 1:
+        return [load_func() for load_func in load_funcs]
+    with ThreadPoolExecutor(max_workers=min(len(load_funcs), MAX_LOAD_WORKERS), thread_name_prefix="ADE_load") as executor:
+        futures = [executor.submit(load_func) for load_func in load_funcs]
+        return [future.result() for future in futures]
+
+
 # adapted from https://github.com/guoyww/AnimateDiff/blob/main/animatediff/utils/convert_lora_safetensor_to_diffusers.py
 # Example LoRA keys:
 #   down_blocks.0.motion_modules.0.temporal_transformer.transformer_blocks.0.attention_blocks.0.processor.to_q_lora.down.weight
@@ -698,10 +868,7 @@ def get_vanilla_model_patcher(m: ModelPatcher) -> ModelPatcher:
 # Example model keys: 
 #   down_blocks.0.motion_modules.0.temporal_transformer.transformer_blocks.0.attention_blocks.0.to_q.weight
 #
-def load_motion_lora_as_patches(motion_model: MotionModelPatcher, lora: MotionLoraInfo) -> None:
-    def get_version(has_midblock: bool):
-        return "v2" if has_midblock else "v1"
-
+def prepare_motion_lora_patches(lora: MotionLoraInfo) -> tuple[dict[str, tuple[Tensor]], bool]:
     lora_path = get_motion_lora_path(lora.name)
     logger.info(f"Loading motion LoRA {lora.name}")
     state_dict = comfy.utils.load_torch_file(lora_path)
@@ -713,16 +880,11 @@ def load_motion_lora_as_patches(motion_model: MotionModelPatcher, lora: MotionLo
     if len(state_dict) == 0:
         raise ValueError(f"'{lora.name}' contains no temporal keys; it is not a valid motion LoRA!")
 
-    model_has_midblock = motion_model.model.mid_block != None
     lora_has_midblock = has_mid_block(state_dict)
-    logger.info(f"Applying a {get_version(lora_has_midblock)} LoRA ({lora.name}) to a { motion_model.model.mm_info.mm_version} motion model.")
 
     patches = {}
     # convert lora state dict to one that matches motion_module keys and tensors
     for key in state_dict:
-        # if motion_module doesn't have a midblock, skip mid_block entries
-        if not model_has_midblock:
-            if "mid_block" in key: continue
         # only process lora down key (we will process up at the same time as down)
         if "up." in key: continue
 
@@ -745,24 +907,61 @@ def load_motion_lora_as_patches(motion_model: MotionModelPatcher, lora: MotionLo
             comfy.model_management.cast_to_device(weight_down, weight_down.device, torch.float32)
             ),)
     del state_dict
+    return patches, lora_has_midblock
+
+
+def load_motion_lora_as_patches(motion_model: MotionModelPatcher, lora: MotionLoraInfo,
+                                prepared_patches: tuple[dict[str, tuple[Tensor]], bool]=None) -> None:
+    def get_version(has_midblock: bool):
+        return "v2" if has_midblock else "v1"
+
+    if prepared_patches is None:
+        prepared_patches = prepare_motion_lora_patches(lora)
+    patches, lora_has_midblock = prepared_patches
+
+    model_has_midblock = motion_model.model.mid_block != None
+    logger.info(f"Applying a {get_version(lora_has_midblock)} LoRA ({lora.name}) to a { motion_model.model.mm_info.mm_version} motion model.")
+    # if motion_module doesn't have a midblock, skip mid_block entries
+    if not model_has_midblock:
+        patches = {key: patch for key, patch in patches.items() if "mid_block" not in key}
     # add patches to motion ModelPatcher
     motion_model.add_patches(patches=patches, strength_patch=lora.strength)
+    # keep track of applied loras, so patched weights can be cached
+    attachment = get_mm_attachment(motion_model)
+    attachment.motion_loras.add_lora(lora.clone())
+    attachment.lora_patches_uuid = motion_model.patches_uuid
 
 
-def load_motion_module_gen1(model_name: str, model: ModelPatcher, motion_lora: MotionLoraList = None, motion_model_settings: AnimateDiffSettings = None) -> MotionModelPatcher:
+def load_motion_loras_as_patches(motion_model: MotionModelPatcher, motion_lora: MotionLoraList) -> None:
+    # read and convert all loras concurrently, then apply in order
+    all_prepared_patches = run_loads_in_parallel([partial(prepare_motion_lora_patches, lora) for lora in motion_lora.loras])
+    for lora, prepared_patches in zip(motion_lora.loras, all_prepared_patches):
+        load_motion_lora_as_patches(motion_model, lora, prepared_patches=prepared_patches)
+
+
+def load_motion_module_state_dict(model_name: str, motion_model_settings: AnimateDiffSettings = None) -> tuple[dict[str, Tensor], AnimateDiffInfo]:
     model_path = get_motion_model_path(model_name)
-    logger.info(f"Loading motion module {model_name}")
     mm_state_dict = comfy.utils.load_torch_file(model_path, safe_load=True)
     # TODO: check for empty state dict?
-    # get normalized state_dict and motion model info
+    # get normalized state_dict and motion model info (converts alternate AD models like HotshotXL into AD keys)
     mm_state_dict, mm_info = normalize_ad_state_dict(mm_state_dict=mm_state_dict, mm_name=model_name)
+    # apply motion model settings
+    mm_state_dict = apply_mm_settings(model_dict=mm_state_dict, mm_settings=motion_model_settings)
+    return mm_state_dict, mm_info
+
+
+def load_motion_module_gen1(model_name: str, model: ModelPatcher, motion_lora: MotionLoraList = None, motion_model_settings: AnimateDiffSettings = None) -> MotionModelPatcher:
+    logger.info(f"Loading motion module {model_name}")
+    loras = motion_lora.loras if motion_lora is not None else []
+    # read motion module and motion loras concurrently
+    loaded = run_loads_in_parallel([partial(load_motion_module_state_dict, model_name, motion_model_settings)]
+                                   + [partial(prepare_motion_lora_patches, lora) for lora in loras])
+    (mm_state_dict, mm_info), all_prepared_patches = loaded[0], loaded[1:]
     # check that motion model is compatible with sd model
     model_sd_type = get_sd_model_type(model)
     if model_sd_type != mm_info.sd_type:
         raise MotionCompatibilityError(f"Motion module '{mm_info.mm_name}' is intended for {mm_info.sd_type} models, " \
                                        + f"but the provided model is type {model_sd_type}.")
-    # apply motion model settings
-    mm_state_dict = apply_mm_settings(model_dict=mm_state_dict, mm_settings=motion_model_settings)
     # initialize AnimateDiffModelWrapper
     ad_wrapper = AnimateDiffModel(mm_state_dict=mm_state_dict, mm_info=mm_info)
     ad_wrapper.to(model.model_dtype())
@@ -771,22 +970,20 @@ def load_motion_module_gen1(model_name: str, model: ModelPatcher, motion_lora: M
     verify_load_result(load_result=load_result, mm_info=mm_info)
     # wrap motion_module into a ModelPatcher, to allow motion lora patches
     motion_model = create_MotionModelPatcher(model=ad_wrapper, load_device=model.load_device, offload_device=model.offload_device)
+    set_weights_id(motion_model, model_name, motion_model_settings)
     # load motion_lora, if present
-    if motion_lora is not None:
-        for lora in motion_lora.loras:
-            load_motion_lora_as_patches(motion_model, lora)
+    for lora, prepared_patches in zip(loras, all_prepared_patches):
+        load_motion_lora_as_patches(motion_model, lora, prepared_patches=prepared_patches)
     return motion_model
 
 
-def load_motion_module_gen2(model_name: str, motion_model_settings: AnimateDiffSettings = None) -> MotionModelPatcher:
-    model_path = get_motion_model_path(model_name)
+def load_motion_module_gen2(model_name: str, motion_model_settings: AnimateDiffSettings = None, motion_lora: MotionLoraList = None) -> MotionModelPatcher:
     logger.info(f"Loading motion module {model_name} via Gen2")
-    mm_state_dict = comfy.utils.load_torch_file(model_path, safe_load=True)
-    # TODO: check for empty state dict?
-    # get normalized state_dict and motion model info (converts alternate AD models like HotshotXL into AD keys)
-    mm_state_dict, mm_info = normalize_ad_state_dict(mm_state_dict=mm_state_dict, mm_name=model_name)
-    # apply motion model settings
-    mm_state_dict = apply_mm_settings(model_dict=mm_state_dict, mm_settings=motion_model_settings)
+    loras = motion_lora.loras if motion_lora is not None else []
+    # read motion module and motion loras concurrently
+    loaded = run_loads_in_parallel([partial(load_motion_module_state_dict, model_name, motion_model_settings)]
+                                   + [partial(prepare_motion_lora_patches, lora) for lora in loras])
+    (mm_state_dict, mm_info), all_prepared_patches = loaded[0], loaded[1:]
     # initialize AnimateDiffModelWrapper
     ad_wrapper = AnimateDiffModel(mm_state_dict=mm_state_dict, mm_info=mm_info)
     ad_wrapper.to(comfy.model_management.unet_dtype())
@@ -796,9 +993,23 @@ def load_motion_module_gen2(model_name: str, motion_model_settings: AnimateDiffS
     # wrap motion_module into a ModelPatcher, to allow motion lora patches
     motion_model = create_MotionModelPatcher(model=ad_wrapper, load_device=comfy.model_management.get_torch_device(),
                                               offload_device=comfy.model_management.unet_offload_device())
+    set_weights_id(motion_model, model_name, motion_model_settings)
+    # load motion_lora, if present
+    for lora, prepared_patches in zip(loras, all_prepared_patches):
+        load_motion_lora_as_patches(motion_model, lora, prepared_patches=prepared_patches)
     return motion_model
 
 
+def set_weights_id(motion_model: MotionModelPatcher, model_name: str, motion_model_settings: AnimateDiffSettings=None):
+    # identifies the loaded (unpatched) weights for the motion LoRA weight cache;
+    # file hash comes from the hash index, so reloading an unchanged file keeps the same id
+    attachment = get_mm_attachment(motion_model)
+    attachment.weights_id = calculate_file_hash(get_motion_model_path(model_name))
+    motion_weight_cache.track_model(attachment.weights_id, motion_model.model)
+    if motion_model_settings is not None:
+        attachment.weights_fingerprint = motion_model_settings.get_adjust_weight_fingerprint()
+
+
 IncompatibleKeys = namedtuple('IncompatibleKeys', ['missing_keys', 'unexpected_keys'])
 def verify_load_result(load_result: IncompatibleKeys, mm_info: AnimateDiffInfo):
     error_msgs: list[str] = []
@@ -829,40 +1040,74 @@ def verify_load_result(load_result: IncompatibleKeys, mm_info: AnimateDiffInfo):
                             mm_info.mm_name, "\n\t".join(error_msgs)))
     
 
+def can_share_weights(*patchers: ModelPatcher) -> bool:
+    # with weight_inplace_update, patching and unpatching write into the weights' storage (comfy.utils.copy_to_param),
+    # which would alter every other model sharing them
+    return not any(patcher.weight_inplace_update for patcher in patchers)
+
+
+def get_shared_state_dict(module: torch.nn.Module, share=True) -> dict[str, Tensor]:
+    '''
+    Returns module's state_dict cast to unet dtype and offload device. If share, tensors that already match are shared, not copied;
+    this is only safe when none of the ModelPatchers of the sharing models use weight_inplace_update, since without it
+    patches replace weights instead of writing into them. Otherwise, all tensors are copied.
+    '''
+    dtype = comfy.model_management.unet_dtype()
+    device = comfy.model_management.unet_offload_device()
+    state_dict = module.state_dict()
+    for key, tensor in state_dict.items():
+        if tensor.is_floating_point():
+            state_dict[key] = tensor.to(device=device, dtype=dtype, copy=not share)
+        else:
+            state_dict[key] = tensor.to(device=device, copy=not share)
+    return state_dict
+
+
 def create_fresh_motion_module(motion_model: MotionModelPatcher) -> MotionModelPatcher:
-    ad_wrapper = AnimateDiffModel(mm_state_dict=motion_model.model.state_dict(), mm_info=motion_model.model.mm_info)
-    ad_wrapper.to(comfy.model_management.unet_dtype())
-    ad_wrapper.to(comfy.model_management.unet_offload_device())
-    ad_wrapper.load_state_dict(motion_model.model.state_dict())
-    return create_MotionModelPatcher(model=ad_wrapper, load_device=comfy.model_management.get_torch_device(),
-                                      offload_device=comfy.model_management.unet_offload_device())
+    mm_state_dict = get_shared_state_dict(motion_model.model, share=can_share_weights(motion_model))
+    ad_wrapper = AnimateDiffModel(mm_state_dict=mm_state_dict, mm_info=motion_model.model.mm_info)
+    # assign shares weights with motion_model instead of copying them, when possible
+    ad_wrapper.load_state_dict(mm_state_dict, assign=True)
+    fresh_motion_model = create_MotionModelPatcher(model=ad_wrapper, load_device=comfy.model_management.get_torch_device(),
+                                                   offload_device=comfy.model_management.unet_offload_device())
+    # patching must never write into weights that may be shared
+    fresh_motion_model.weight_inplace_update = False
+    # same weights, so can share cached patched weights
+    attachment = get_mm_attachment(motion_model)
+    fresh_attachment = get_mm_attachment(fresh_motion_model)
+    fresh_attachment.weights_id = attachment.weights_id
+    fresh_attachment.weights_fingerprint = attachment.weights_fingerprint
+    motion_weight_cache.track_model(fresh_attachment.weights_id, fresh_motion_model.model)
+    return fresh_motion_model
 
 
 def create_fresh_encoder_only_model(motion_model: MotionModelPatcher) -> MotionModelPatcher:
-    ad_wrapper = EncoderOnlyAnimateDiffModel(mm_state_dict=motion_model.model.state_dict(), mm_info=motion_model.model.mm_info)
+    mm_state_dict = get_shared_state_dict(motion_model.model, share=can_share_weights(motion_model))
+    ad_wrapper = EncoderOnlyAnimateDiffModel(mm_state_dict=mm_state_dict, mm_info=motion_model.model.mm_info)
     ad_wrapper.to(comfy.model_management.unet_dtype())
     ad_wrapper.to(comfy.model_management.unet_offload_device())
-    ad_wrapper.load_state_dict(motion_model.model.state_dict(), strict=False)
-    return create_MotionModelPatcher(model=ad_wrapper, load_device=comfy.model_management.get_torch_device(),
-                                      offload_device=comfy.model_management.unet_offload_device())
+    ad_wrapper.load_state_dict(mm_state_dict, strict=False, assign=True)
+    fresh_motion_model = create_MotionModelPatcher(model=ad_wrapper, load_device=comfy.model_management.get_torch_device(),
+                                                   offload_device=comfy.model_management.unet_offload_device())
+    # patching must never write into weights that may be shared
+    fresh_motion_model.weight_inplace_update = False
+    return fresh_motion_model
 
 
 def inject_img_encoder_into_model(motion_model: MotionModelPatcher, w_encoder: MotionModelPatcher):
     motion_model.model.init_img_encoder()
-    motion_model.model.img_encoder.to(comfy.model_management.unet_dtype())
-    motion_model.model.img_encoder.to(comfy.model_management.unet_offload_device())
-    motion_model.model.img_encoder.load_state_dict(w_encoder.model.img_encoder.state_dict())
+    motion_model.model.img_encoder.load_state_dict(get_shared_state_dict(w_encoder.model.img_encoder, share=can_share_weights(motion_model, w_encoder)),
+                                                   assign=True)
 
 
 def inject_pia_conv_in_into_model(motion_model: MotionModelPatcher, w_pia: MotionModelPatcher):
-    motion_model.model.init_conv_in(w_pia.model.state_dict())
-    motion_model.model.conv_in.to(comfy.model_management.unet_dtype())
-    motion_model.model.conv_in.to(comfy.model_management.unet_offload_device())
-    motion_model.model.conv_in.load_state_dict(w_pia.model.conv_in.state_dict())
+    conv_in_state_dict = get_shared_state_dict(w_pia.model.conv_in, share=can_share_weights(motion_model, w_pia))
+    motion_model.model.init_conv_in({"conv_in.weight": conv_in_state_dict["weight"]})
+    motion_model.model.conv_in.load_state_dict(conv_in_state_dict, assign=True)
     motion_model.model.mm_info.mm_format = AnimateDiffFormat.PIA
 
 
-def inject_camera_encoder_into_model(motion_model: MotionModelPatcher, camera_ctrl_name: str):
+def load_camera_ctrl_state_dicts(camera_ctrl_name: str) -> tuple[dict[str, Tensor], dict[str, Tensor]]:
     camera_ctrl_path = get_motion_model_path(camera_ctrl_name)
     full_state_dict = comfy.utils.load_torch_file(camera_ctrl_path, safe_load=True)
     camera_state_dict: dict[str, Tensor] = dict()
@@ -877,6 +1122,14 @@ def inject_camera_encoder_into_model(motion_model: MotionModelPatcher, camera_ct
         raise Exception("Provided CameraCtrl model had no Camera Encoder-related keys; not a valid CameraCtrl model!")
     if len(attention_state_dict) == 0:
         raise Exception("Provided CameraCtrl model had no qkv_merge keys; not a valid CameraCtrl model!")
+    return camera_state_dict, attention_state_dict
+
+
+def inject_camera_encoder_into_model(motion_model: MotionModelPatcher, camera_ctrl_name: str,
+                                     camera_ctrl_state_dicts: tuple[dict[str, Tensor], dict[str, Tensor]]=None):
+    if camera_ctrl_state_dicts is None:
+        camera_ctrl_state_dicts = load_camera_ctrl_state_dicts(camera_ctrl_name)
+    camera_state_dict, attention_state_dict = camera_ctrl_state_dicts
     # initialize CameraPoseEncoder on motion model, and load keys
     camera_encoder = CameraPoseEncoder(channels=motion_model.model.layer_channels, nums_rb=2, ops=motion_model.model.ops).to(
         device=comfy.model_management.unet_offload_device(),
@@ -1,226 +1,244 @@
-import comfy.sample as comfy_sample
-
-from .nodes_gen1 import (AnimateDiffLoaderGen1, LegacyAnimateDiffLoaderWithContext)
-from .nodes_gen2 import (UseEvolvedSamplingNode, ApplyAnimateDiffModelNode, ApplyAnimateDiffModelBasicNode, ADKeyframeNode,
-                         LoadAnimateDiffModelNode)
-from .nodes_animatelcmi2v import (ApplyAnimateLCMI2VModel, LoadAnimateLCMI2VModelNode, LoadAnimateDiffAndInjectI2VNode, UpscaleAndVaeEncode)
-from .nodes_cameractrl import (LoadAnimateDiffModelWithCameraCtrl, ApplyAnimateDiffWithCameraCtrl, CameraCtrlADKeyframeNode,
-                               LoadCameraPosesFromFile, LoadCameraPosesFromPath,
-                               CameraCtrlPoseBasic, CameraCtrlPoseCombo, CameraCtrlPoseAdvanced, CameraCtrlManualAppendPose,
-                               CameraCtrlReplaceCameraParameters, CameraCtrlSetOriginalAspectRatio)
-from .nodes_pia import (ApplyAnimateDiffPIAModel, LoadAnimateDiffAndInjectPIANode, InputPIA_MultivalNode, InputPIA_PaperPresetsNode, PIA_ADKeyframeNode)
-from .nodes_fancyvideo import (ApplyAnimateDiffFancyVideo,)
-from .nodes_multival import MultivalDynamicNode, MultivalScaledMaskNode, MultivalDynamicFloatInputNode, MultivalDynamicFloatsNode, MultivalConvertToMaskNode
-from .nodes_conditioning import (CreateLoraHookKeyframeInterpolationDEPR,
-                                 MaskableLoraLoaderDEPR, MaskableLoraLoaderModelOnlyDEPR, MaskableSDModelLoaderDEPR, MaskableSDModelLoaderModelOnlyDEPR, 
-                                 SetModelLoraHookDEPR, SetClipLoraHookDEPR,
-                                 CombineLoraHooksDEPR, CombineLoraHookFourOptionalDEPR, CombineLoraHookEightOptionalDEPR,
-                                 PairedConditioningSetMaskHookedDEPR, ConditioningSetMaskHookedDEPR,
-                                 PairedConditioningSetMaskAndCombineHookedDEPR, ConditioningSetMaskAndCombineHookedDEPR,
-                                 PairedConditioningSetUnmaskedAndCombineHookedDEPR, ConditioningSetUnmaskedAndCombineHookedDEPR,
-                                 PairedConditioningCombineDEPR, ConditioningCombineDEPR,
-                                 ConditioningTimestepsNodeDEPR, SetLoraHookKeyframesDEPR,
-                                 CreateLoraHookKeyframeDEPR, CreateLoraHookKeyframeFromStrengthListDEPR)
-from .nodes_sample import (FreeInitOptionsNode, NoiseLayerAddWeightedNode, SampleSettingsNode, NoiseLayerAddNode, NoiseLayerReplaceNode, IterationOptionsNode,
-                           CustomCFGNode, CustomCFGSimpleNode, CustomCFGKeyframeNode, CustomCFGKeyframeSimpleNode, CustomCFGKeyframeInterpolationNode, CustomCFGKeyframeFromListNode,
-                           CFGExtrasPAGNode, CFGExtrasPAGSimpleNode, CFGExtrasRescaleCFGNode, CFGExtrasRescaleCFGSimpleNode,
-                           NoisedImageInjectionNode, NoisedImageInjectOptionsNode, NoiseCalibrationNode)
-from .nodes_sigma_schedule import (SigmaScheduleNode, RawSigmaScheduleNode, WeightedAverageSigmaScheduleNode, InterpolatedWeightedAverageSigmaScheduleNode, SplitAndCombineSigmaScheduleNode, SigmaScheduleToSigmasNode)
-from .nodes_context import (LegacyLoopedUniformContextOptionsNode, LoopedUniformContextOptionsNode, LoopedUniformViewOptionsNode, StandardUniformContextOptionsNode, StandardStaticContextOptionsNode, BatchedContextOptionsNode,
-                            StandardStaticViewOptionsNode, StandardUniformViewOptionsNode, ViewAsContextOptionsNode,
-                            VisualizeContextOptionsK, VisualizeContextOptionsKAdv, VisualizeContextOptionsSCustom)
-from .nodes_context_extras import (SetContextExtrasOnContextOptions, ContextExtras_NaiveReuse, ContextExtras_ContextRef,
-                            ContextRef_ModeFirst, ContextRef_ModeSliding, ContextRef_ModeIndexes,
-                            ContextRef_TuneAttn, ContextRef_TuneAttnAdain,
-                            ContextRef_KeyframeMultivalNode, ContextRef_KeyframeInterpolationNode, ContextRef_KeyframeFromListNode,
-                            NaiveReuse_KeyframeMultivalNode, NaiveReuse_KeyframeInterpolationNode, NaiveReuse_KeyframeFromListNode)
-from .nodes_ad_settings import (AnimateDiffSettingsNode, ManualAdjustPENode, SweetspotStretchPENode, FullStretchPENode,
-                                WeightAdjustAllAddNode, WeightAdjustAllMultNode, WeightAdjustIndivAddNode, WeightAdjustIndivMultNode,
-                                WeightAdjustIndivAttnAddNode, WeightAdjustIndivAttnMultNode)
-from .nodes_scheduling import (PromptSchedulingNode, PromptSchedulingLatentsNode, ValueSchedulingNode, ValueSchedulingLatentsNode,
-                               AddValuesReplaceNode, FloatToFloatsNode)
-from .nodes_per_block import (ADBlockComboNode, ADBlockIndivNode, PerBlockHighLevelNode,
-                              PerBlock_SD15_LowLevelNode, PerBlock_SD15_MidLevelNode, PerBlock_SD15_FromFloatsNode,
-                              PerBlock_SDXL_LowLevelNode, PerBlock_SDXL_MidLevelNode, PerBlock_SDXL_FromFloatsNode)
-from .nodes_extras import AnimateDiffUnload, EmptyLatentImageLarge, CheckpointLoaderSimpleWithNoiseSelect, PerturbedAttentionGuidanceMultival, RescaleCFGMultival
-from .nodes_deprecated import (AnimateDiffLoaderDEPR, AnimateDiffLoaderAdvancedDEPR, AnimateDiffCombineDEPR,
-                               AnimateDiffModelSettingsDEPR, AnimateDiffModelSettingsSimpleDEPR, AnimateDiffModelSettingsAdvancedDEPR, AnimateDiffModelSettingsAdvancedAttnStrengthsDEPR)
-from .nodes_lora import AnimateDiffLoraLoader
+import importlib
+from time import perf_counter
 
+from .documentation import format_description
 from .logger import logger
 
 
+# seconds spent on the first import of each node module, in import order
+node_module_import_times: dict[str, float] = {}
+
+
+class LazyNodeMeta(type):
+    '''
+    Metaclass for the lightweight stubs registered with ComfyUI in place of node classes;
+    the node's module (and whatever it imports) is only loaded the first time the node is actually used.
+    '''
+    def _resolve_node(cls) -> type:
+        if cls._lazy_class is None:
+            cls._lazy_class = import_node_class(cls._lazy_module, cls._lazy_class_name, cls._lazy_node_id)
+        return cls._lazy_class
+
+    def __getattr__(cls, name: str):
+        return getattr(cls._resolve_node(), name)
+
+    def __call__(cls, *args, **kwargs):
+        return cls._resolve_node()(*args, **kwargs)
+
+
+def lazy_node(module_name: str, class_name: str) -> type:
+    return LazyNodeMeta(class_name, (), {"_lazy_module": module_name, "_lazy_class_name": class_name,
+                                         "_lazy_node_id": None, "_lazy_class": None})
+
+
+def import_node_class(module_name: str, class_name: str, node_id: str=None) -> type:
+    start = perf_counter()
+    module = importlib.import_module(f".{module_name}", __package__)
+    if module_name not in node_module_import_times:
+        node_module_import_times[module_name] = perf_counter() - start
+        logger.debug(f"Imported {module_name} in {node_module_import_times[module_name]*1000:.1f}ms")
+    node_class = getattr(module, class_name)
+    if node_id is not None:
+        format_description(node_id, node_class)
+    return node_class
+
+
+def benchmark_node_imports() -> dict[str, float]:
+    '''
+    Imports all node modules and returns the import cost of each in seconds; run in a fresh process
+    to get startup numbers. Dependencies shared by several modules are counted for the first one to import them.
+    '''
+    for node in NODE_CLASS_MAPPINGS.values():
+        node._resolve_node()
+    for module_name, seconds in sorted(node_module_import_times.items(), key=lambda x: x[1], reverse=True):
+        logger.info(f"{module_name}: {seconds*1000:.1f}ms")
+    return dict(node_module_import_times)
+
+
+def __getattr__(name: str):
+    # node classes used to be imported here directly, so keep them reachable by name
+    for node in NODE_CLASS_MAPPINGS.values():
+        if node._lazy_class_name == name:
+            return node._resolve_node()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+
 NODE_CLASS_MAPPINGS = {
     # Unencapsulated
-    "ADE_AnimateDiffLoRALoader": AnimateDiffLoraLoader,
-    "ADE_AnimateDiffSamplingSettings": SampleSettingsNode,
-    "ADE_AnimateDiffKeyframe": ADKeyframeNode,
+    "ADE_AnimateDiffLoRALoader": lazy_node("nodes_lora", "AnimateDiffLoraLoader"),
+    "ADE_AnimateDiffSamplingSettings": lazy_node("nodes_sample", "SampleSettingsNode"),
+    "ADE_AnimateDiffKeyframe": lazy_node("nodes_gen2", "ADKeyframeNode"),
     # Multival Nodes
-    "ADE_MultivalDynamic": MultivalDynamicNode,
-    "ADE_MultivalDynamicFloatInput": MultivalDynamicFloatInputNode,
-    "ADE_MultivalDynamicFloats": MultivalDynamicFloatsNode,
-    "ADE_MultivalScaledMask": MultivalScaledMaskNode,
-    "ADE_MultivalConvertToMask": MultivalConvertToMaskNode,
+    "ADE_MultivalDynamic": lazy_node("nodes_multival", "MultivalDynamicNode"),
+    "ADE_MultivalDynamicFloatInput": lazy_node("nodes_multival", "MultivalDynamicFloatInputNode"),
+    "ADE_MultivalDynamicFloats": lazy_node("nodes_multival", "MultivalDynamicFloatsNode"),
+    "ADE_MultivalScaledMask": lazy_node("nodes_multival", "MultivalScaledMaskNode"),
+    "ADE_MultivalConvertToMask": lazy_node("nodes_multival", "MultivalConvertToMaskNode"),
     ###############################################################################
     #------------------------------------------------------------------------------
     # Context Opts
-    "ADE_StandardStaticContextOptions": StandardStaticContextOptionsNode,
-    "ADE_StandardUniformContextOptions": StandardUniformContextOptionsNode,
-    "ADE_LoopedUniformContextOptions": LoopedUniformContextOptionsNode,
-    "ADE_ViewsOnlyContextOptions": ViewAsContextOptionsNode,
-    "ADE_BatchedContextOptions": BatchedContextOptionsNode,
-    "ADE_AnimateDiffUniformContextOptions": LegacyLoopedUniformContextOptionsNode, # Legacy/Deprecated
-    "ADE_VisualizeContextOptionsK": VisualizeContextOptionsK,
-    "ADE_VisualizeContextOptionsKAdv": VisualizeContextOptionsKAdv,
-    "ADE_VisualizeContextOptionsSCustom": VisualizeContextOptionsSCustom,
+    "ADE_StandardStaticContextOptions": lazy_node("nodes_context", "StandardStaticContextOptionsNode"),
+    "ADE_StandardUniformContextOptions": lazy_node("nodes_context", "StandardUniformContextOptionsNode"),
+    "ADE_LoopedUniformContextOptions": lazy_node("nodes_context", "LoopedUniformContextOptionsNode"),
+    "ADE_ViewsOnlyContextOptions": lazy_node("nodes_context", "ViewAsContextOptionsNode"),
+    "ADE_BatchedContextOptions": lazy_node("nodes_context", "BatchedContextOptionsNode"),
+    "ADE_AnimateDiffUniformContextOptions": lazy_node("nodes_context", "LegacyLoopedUniformContextOptionsNode"), # Legacy/Deprecated
+    "ADE_VisualizeContextOptionsK": lazy_node("nodes_context", "VisualizeContextOptionsK"),
+    "ADE_VisualizeContextOptionsKAdv": lazy_node("nodes_context", "VisualizeContextOptionsKAdv"),
+    "ADE_VisualizeContextOptionsSCustom": lazy_node("nodes_context", "VisualizeContextOptionsSCustom"),
     # View Opts
-    "ADE_StandardStaticViewOptions": StandardStaticViewOptionsNode,
-    "ADE_StandardUniformViewOptions": StandardUniformViewOptionsNode,
-    "ADE_LoopedUniformViewOptions": LoopedUniformViewOptionsNode,
+    "ADE_StandardStaticViewOptions": lazy_node("nodes_context", "StandardStaticViewOptionsNode"),
+    "ADE_StandardUniformViewOptions": lazy_node("nodes_context", "StandardUniformViewOptionsNode"),
+    "ADE_LoopedUniformViewOptions": lazy_node("nodes_context", "LoopedUniformViewOptionsNode"),
     # Context Extras
-    "ADE_ContextExtras_Set": SetContextExtrasOnContextOptions,
-    "ADE_ContextExtras_ContextRef": ContextExtras_ContextRef,
-    "ADE_ContextExtras_ContextRef_ModeFirst": ContextRef_ModeFirst,
-    "ADE_ContextExtras_ContextRef_ModeSliding": ContextRef_ModeSliding,
-    "ADE_ContextExtras_ContextRef_ModeIndexes": ContextRef_ModeIndexes,
-    "ADE_ContextExtras_ContextRef_TuneAttn": ContextRef_TuneAttn,
-    "ADE_ContextExtras_ContextRef_TuneAttnAdain": ContextRef_TuneAttnAdain,
-    "ADE_ContextExtras_ContextRef_Keyframe": ContextRef_KeyframeMultivalNode,
-    "ADE_ContextExtras_ContextRef_KeyframeInterpolation": ContextRef_KeyframeInterpolationNode,
-    "ADE_ContextExtras_ContextRef_KeyframeFromList": ContextRef_KeyframeFromListNode,
-    "ADE_ContextExtras_NaiveReuse": ContextExtras_NaiveReuse,
-    "ADE_ContextExtras_NaiveReuse_Keyframe": NaiveReuse_KeyframeMultivalNode,
-    "ADE_ContextExtras_NaiveReuse_KeyframeInterpolation": NaiveReuse_KeyframeInterpolationNode,
-    "ADE_ContextExtras_NaiveReuse_KeyframeFromList": NaiveReuse_KeyframeFromListNode,
+    "ADE_ContextExtras_Set": lazy_node("nodes_context_extras", "SetContextExtrasOnContextOptions"),
+    "ADE_ContextExtras_ContextRef": lazy_node("nodes_context_extras", "ContextExtras_ContextRef"),
+    "ADE_ContextExtras_ContextRef_ModeFirst": lazy_node("nodes_context_extras", "ContextRef_ModeFirst"),
+    "ADE_ContextExtras_ContextRef_ModeSliding": lazy_node("nodes_context_extras", "ContextRef_ModeSliding"),
+    "ADE_ContextExtras_ContextRef_ModeIndexes": lazy_node("nodes_context_extras", "ContextRef_ModeIndexes"),
+    "ADE_ContextExtras_ContextRef_TuneAttn": lazy_node("nodes_context_extras", "ContextRef_TuneAttn"),
+    "ADE_ContextExtras_ContextRef_TuneAttnAdain": lazy_node("nodes_context_extras", "ContextRef_TuneAttnAdain"),
+    "ADE_ContextExtras_ContextRef_Keyframe": lazy_node("nodes_context_extras", "ContextRef_KeyframeMultivalNode"),
+    "ADE_ContextExtras_ContextRef_KeyframeInterpolation": lazy_node("nodes_context_extras", "ContextRef_KeyframeInterpolationNode"),
+    "ADE_ContextExtras_ContextRef_KeyframeFromList": lazy_node("nodes_context_extras", "ContextRef_KeyframeFromListNode"),
+    "ADE_ContextExtras_NaiveReuse": lazy_node("nodes_context_extras", "ContextExtras_NaiveReuse"),
+    "ADE_ContextExtras_NaiveReuse_Keyframe": lazy_node("nodes_context_extras", "NaiveReuse_KeyframeMultivalNode"),
+    "ADE_ContextExtras_NaiveReuse_KeyframeInterpolation": lazy_node("nodes_context_extras", "NaiveReuse_KeyframeInterpolationNode"),
+    "ADE_ContextExtras_NaiveReuse_KeyframeFromList": lazy_node("nodes_context_extras", "NaiveReuse_KeyframeFromListNode"),
     #------------------------------------------------------------------------------
     ###############################################################################
     # Iteration Opts
-    "ADE_IterationOptsDefault": IterationOptionsNode,
-    "ADE_IterationOptsFreeInit": FreeInitOptionsNode,
+    "ADE_IterationOptsDefault": lazy_node("nodes_sample", "IterationOptionsNode"),
+    "ADE_IterationOptsFreeInit": lazy_node("nodes_sample", "FreeInitOptionsNode"),
     # Conditioning
     # Conditioning (DEPRECATED)
-    "ADE_RegisterLoraHook": MaskableLoraLoaderDEPR,
-    "ADE_RegisterLoraHookModelOnly": MaskableLoraLoaderModelOnlyDEPR,
-    "ADE_RegisterModelAsLoraHook": MaskableSDModelLoaderDEPR,
-    "ADE_RegisterModelAsLoraHookModelOnly": MaskableSDModelLoaderModelOnlyDEPR,
-    "ADE_CombineLoraHooks": CombineLoraHooksDEPR,
-    "ADE_CombineLoraHooksFour": CombineLoraHookFourOptionalDEPR,
-    "ADE_CombineLoraHooksEight": CombineLoraHookEightOptionalDEPR,
-    "ADE_SetLoraHookKeyframe": SetLoraHookKeyframesDEPR,
-    "ADE_AttachLoraHookToCLIP": SetClipLoraHookDEPR,
-    "ADE_LoraHookKeyframe": CreateLoraHookKeyframeDEPR,
-    "ADE_LoraHookKeyframeInterpolation": CreateLoraHookKeyframeInterpolationDEPR,
-    "ADE_LoraHookKeyframeFromStrengthList": CreateLoraHookKeyframeFromStrengthListDEPR,
-    "ADE_AttachLoraHookToConditioning": SetModelLoraHookDEPR,
-    "ADE_PairedConditioningSetMask": PairedConditioningSetMaskHookedDEPR,
-    "ADE_ConditioningSetMask": ConditioningSetMaskHookedDEPR,
-    "ADE_PairedConditioningSetMaskAndCombine": PairedConditioningSetMaskAndCombineHookedDEPR,
-    "ADE_ConditioningSetMaskAndCombine": ConditioningSetMaskAndCombineHookedDEPR,
-    "ADE_PairedConditioningSetUnmaskedAndCombine": PairedConditioningSetUnmaskedAndCombineHookedDEPR,
-    "ADE_ConditioningSetUnmaskedAndCombine": ConditioningSetUnmaskedAndCombineHookedDEPR,
-    "ADE_PairedConditioningCombine": PairedConditioningCombineDEPR,
-    "ADE_ConditioningCombine": ConditioningCombineDEPR,
-    "ADE_TimestepsConditioning": ConditioningTimestepsNodeDEPR,
+    "ADE_RegisterLoraHook": lazy_node("nodes_conditioning", "MaskableLoraLoaderDEPR"),
+    "ADE_RegisterLoraHookModelOnly": lazy_node("nodes_conditioning", "MaskableLoraLoaderModelOnlyDEPR"),
+    "ADE_RegisterModelAsLoraHook": lazy_node("nodes_conditioning", "MaskableSDModelLoaderDEPR"),
+    "ADE_RegisterModelAsLoraHookModelOnly": lazy_node("nodes_conditioning", "MaskableSDModelLoaderModelOnlyDEPR"),
+    "ADE_CombineLoraHooks": lazy_node("nodes_conditioning", "CombineLoraHooksDEPR"),
+    "ADE_CombineLoraHooksFour": lazy_node("nodes_conditioning", "CombineLoraHookFourOptionalDEPR"),
+    "ADE_CombineLoraHooksEight": lazy_node("nodes_conditioning", "CombineLoraHookEightOptionalDEPR"),
+    "ADE_SetLoraHookKeyframe": lazy_node("nodes_conditioning", "SetLoraHookKeyframesDEPR"),
+    "ADE_AttachLoraHookToCLIP": lazy_node("nodes_conditioning", "SetClipLoraHookDEPR"),
+    "ADE_LoraHookKeyframe": lazy_node("nodes_conditioning", "CreateLoraHookKeyframeDEPR"),
+    "ADE_LoraHookKeyframeInterpolation": lazy_node("nodes_conditioning", "CreateLoraHookKeyframeInterpolationDEPR"),
+    "ADE_LoraHookKeyframeFromStrengthList": lazy_node("nodes_conditioning", "CreateLoraHookKeyframeFromStrengthListDEPR"),
+    "ADE_AttachLoraHookToConditioning": lazy_node("nodes_conditioning", "SetModelLoraHookDEPR"),
+    "ADE_PairedConditioningSetMask": lazy_node("nodes_conditioning", "PairedConditioningSetMaskHookedDEPR"),
+    "ADE_ConditioningSetMask": lazy_node("nodes_conditioning", "ConditioningSetMaskHookedDEPR"),
+    "ADE_PairedConditioningSetMaskAndCombine": lazy_node("nodes_conditioning", "PairedConditioningSetMaskAndCombineHookedDEPR"),
+    "ADE_ConditioningSetMaskAndCombine": lazy_node("nodes_conditioning", "ConditioningSetMaskAndCombineHookedDEPR"),
+    "ADE_PairedConditioningSetUnmaskedAndCombine": lazy_node("nodes_conditioning", "PairedConditioningSetUnmaskedAndCombineHookedDEPR"),
+    "ADE_ConditioningSetUnmaskedAndCombine": lazy_node("nodes_conditioning", "ConditioningSetUnmaskedAndCombineHookedDEPR"),
+    "ADE_PairedConditioningCombine": lazy_node("nodes_conditioning", "PairedConditioningCombineDEPR"),
+    "ADE_ConditioningCombine": lazy_node("nodes_conditioning", "ConditioningCombineDEPR"),
+    "ADE_TimestepsConditioning": lazy_node("nodes_conditioning", "ConditioningTimestepsNodeDEPR"),
     # Noise Layer Nodes
-    "ADE_NoiseLayerAdd": NoiseLayerAddNode,
-    "ADE_NoiseLayerAddWeighted": NoiseLayerAddWeightedNode,
-    "ADE_NoiseLayerReplace": NoiseLayerReplaceNode,
+    "ADE_NoiseLayerAdd": lazy_node("nodes_sample", "NoiseLayerAddNode"),
+    "ADE_NoiseLayerAddWeighted": lazy_node("nodes_sample", "NoiseLayerAddWeightedNode"),
+    "ADE_NoiseLayerReplace": lazy_node("nodes_sample", "NoiseLayerReplaceNode"),
     # AnimateDiff Settings
-    "ADE_AnimateDiffSettings": AnimateDiffSettingsNode,
-    "ADE_AdjustPESweetspotStretch": SweetspotStretchPENode,
-    "ADE_AdjustPEFullStretch": FullStretchPENode,
-    "ADE_AdjustPEManual": ManualAdjustPENode,
-    "ADE_AdjustWeightAllAdd": WeightAdjustAllAddNode,
-    "ADE_AdjustWeightAllMult": WeightAdjustAllMultNode,
-    "ADE_AdjustWeightIndivAdd": WeightAdjustIndivAddNode,
-    "ADE_AdjustWeightIndivMult": WeightAdjustIndivMultNode,
-    "ADE_AdjustWeightIndivAttnAdd": WeightAdjustIndivAttnAddNode,
-    "ADE_AdjustWeightIndivAttnMult": WeightAdjustIndivAttnMultNode,
+    "ADE_AnimateDiffSettings": lazy_node("nodes_ad_settings", "AnimateDiffSettingsNode"),
+    "ADE_AdjustPESweetspotStretch": lazy_node("nodes_ad_settings", "SweetspotStretchPENode"),
+    "ADE_AdjustPEFullStretch": lazy_node("nodes_ad_settings", "FullStretchPENode"),
+    "ADE_AdjustPEManual": lazy_node("nodes_ad_settings", "ManualAdjustPENode"),
+    "ADE_AdjustWeightAllAdd": lazy_node("nodes_ad_settings", "WeightAdjustAllAddNode"),
+    "ADE_AdjustWeightAllMult": lazy_node("nodes_ad_settings", "WeightAdjustAllMultNode"),
+    "ADE_AdjustWeightIndivAdd": lazy_node("nodes_ad_settings", "WeightAdjustIndivAddNode"),
+    "ADE_AdjustWeightIndivMult": lazy_node("nodes_ad_settings", "WeightAdjustIndivMultNode"),
+    "ADE_AdjustWeightIndivAttnAdd": lazy_node("nodes_ad_settings", "WeightAdjustIndivAttnAddNode"),
+    "ADE_AdjustWeightIndivAttnMult": lazy_node("nodes_ad_settings", "WeightAdjustIndivAttnMultNode"),
     # Sample Settings
-    "ADE_CustomCFGSimple": CustomCFGSimpleNode,
-    "ADE_CustomCFG": CustomCFGNode,
-    "ADE_CustomCFGKeyframeSimple": CustomCFGKeyframeSimpleNode,
-    "ADE_CustomCFGKeyframe": CustomCFGKeyframeNode,
-    "ADE_CustomCFGKeyframeInterpolation": CustomCFGKeyframeInterpolationNode,
-    "ADE_CustomCFGKeyframeFromList": CustomCFGKeyframeFromListNode,
-    "ADE_CFGExtrasPAGSimple": CFGExtrasPAGSimpleNode,
-    "ADE_CFGExtrasPAG": CFGExtrasPAGNode,
-    "ADE_CFGExtrasRescaleCFGSimple": CFGExtrasRescaleCFGSimpleNode,
-    "ADE_CFGExtrasRescaleCFG": CFGExtrasRescaleCFGNode,
-    "ADE_SigmaSchedule": SigmaScheduleNode,
-    "ADE_RawSigmaSchedule": RawSigmaScheduleNode,
-    "ADE_SigmaScheduleWeightedAverage": WeightedAverageSigmaScheduleNode,
-    "ADE_SigmaScheduleWeightedAverageInterp": InterpolatedWeightedAverageSigmaScheduleNode,
-    "ADE_SigmaScheduleSplitAndCombine": SplitAndCombineSigmaScheduleNode,
-    "ADE_SigmaScheduleToSigmas": SigmaScheduleToSigmasNode,
-    "ADE_NoisedImageInjection": NoisedImageInjectionNode,
-    "ADE_NoisedImageInjectOptions": NoisedImageInjectOptionsNode,
-    #"ADE_NoiseCalibration": NoiseCalibrationNode,
+    "ADE_CustomCFGSimple": lazy_node("nodes_sample", "CustomCFGSimpleNode"),
+    "ADE_CustomCFG": lazy_node("nodes_sample", "CustomCFGNode"),
+    "ADE_CustomCFGKeyframeSimple": lazy_node("nodes_sample", "CustomCFGKeyframeSimpleNode"),
+    "ADE_CustomCFGKeyframe": lazy_node("nodes_sample", "CustomCFGKeyframeNode"),
+    "ADE_CustomCFGKeyframeInterpolation": lazy_node("nodes_sample", "CustomCFGKeyframeInterpolationNode"),
+    "ADE_CustomCFGKeyframeFromList": lazy_node("nodes_sample", "CustomCFGKeyframeFromListNode"),
+    "ADE_CFGExtrasPAGSimple": lazy_node("nodes_sample", "CFGExtrasPAGSimpleNode"),
+    "ADE_CFGExtrasPAG": lazy_node("nodes_sample", "CFGExtrasPAGNode"),
+    "ADE_CFGExtrasRescaleCFGSimple": lazy_node("nodes_sample", "CFGExtrasRescaleCFGSimpleNode"),
+    "ADE_CFGExtrasRescaleCFG": lazy_node("nodes_sample", "CFGExtrasRescaleCFGNode"),
+    "ADE_SigmaSchedule": lazy_node("nodes_sigma_schedule", "SigmaScheduleNode"),
+    "ADE_RawSigmaSchedule": lazy_node("nodes_sigma_schedule", "RawSigmaScheduleNode"),
+    "ADE_SigmaScheduleWeightedAverage": lazy_node("nodes_sigma_schedule", "WeightedAverageSigmaScheduleNode"),
+    "ADE_SigmaScheduleWeightedAverageInterp": lazy_node("nodes_sigma_schedule", "InterpolatedWeightedAverageSigmaScheduleNode"),
+    "ADE_SigmaScheduleSplitAndCombine": lazy_node("nodes_sigma_schedule", "SplitAndCombineSigmaScheduleNode"),
+    "ADE_SigmaScheduleToSigmas": lazy_node("nodes_sigma_schedule", "SigmaScheduleToSigmasNode"),
+    "ADE_NoisedImageInjection": lazy_node("nodes_sample", "NoisedImageInjectionNode"),
+    "ADE_NoisedImageInjectOptions": lazy_node("nodes_sample", "NoisedImageInjectOptionsNode"),
+    #"ADE_NoiseCalibration": lazy_node("nodes_sample", "NoiseCalibrationNode"),
     # Scheduling
-    PromptSchedulingNode.NodeID: PromptSchedulingNode,
-    PromptSchedulingLatentsNode.NodeID: PromptSchedulingLatentsNode,
-    ValueSchedulingNode.NodeID: ValueSchedulingNode,
-    ValueSchedulingLatentsNode.NodeID: ValueSchedulingLatentsNode,
-    AddValuesReplaceNode.NodeID: AddValuesReplaceNode,
-    FloatToFloatsNode.NodeID: FloatToFloatsNode,
+    "ADE_PromptScheduling": lazy_node("nodes_scheduling", "PromptSchedulingNode"),
+    "ADE_PromptSchedulingLatents": lazy_node("nodes_scheduling", "PromptSchedulingLatentsNode"),
+    "ADE_ValueScheduling": lazy_node("nodes_scheduling", "ValueSchedulingNode"),
+    "ADE_ValueSchedulingLatents": lazy_node("nodes_scheduling", "ValueSchedulingLatentsNode"),
+    "ADE_ValuesReplace": lazy_node("nodes_scheduling", "AddValuesReplaceNode"),
+    "ADE_FloatToFloats": lazy_node("nodes_scheduling", "FloatToFloatsNode"),
+    "ADE_TextEncodingCache": lazy_node("nodes_scheduling", "TextEncodingCacheNode"),
     # Per-Block
-    ADBlockComboNode.NodeID: ADBlockComboNode,
-    ADBlockIndivNode.NodeID: ADBlockIndivNode,
-    PerBlockHighLevelNode.NodeID: PerBlockHighLevelNode,
-    PerBlock_SD15_MidLevelNode.NodeID: PerBlock_SD15_MidLevelNode,
-    PerBlock_SD15_LowLevelNode.NodeID: PerBlock_SD15_LowLevelNode,
-    PerBlock_SD15_FromFloatsNode.NodeID: PerBlock_SD15_FromFloatsNode,
-    PerBlock_SDXL_MidLevelNode.NodeID: PerBlock_SDXL_MidLevelNode,
-    PerBlock_SDXL_LowLevelNode.NodeID: PerBlock_SDXL_LowLevelNode,
-    PerBlock_SDXL_FromFloatsNode.NodeID: PerBlock_SDXL_FromFloatsNode,
+    "ADE_ADBlockCombo": lazy_node("nodes_per_block", "ADBlockComboNode"),
+    "ADE_ADBlockIndiv": lazy_node("nodes_per_block", "ADBlockIndivNode"),
+    "ADE_PerBlockHighLevel": lazy_node("nodes_per_block", "PerBlockHighLevelNode"),
+    "ADE_PerBlock_SD15_MidLevel": lazy_node("nodes_per_block", "PerBlock_SD15_MidLevelNode"),
+    "ADE_PerBlock_SD15_LowLevel": lazy_node("nodes_per_block", "PerBlock_SD15_LowLevelNode"),
+    "ADE_PerBlock_SD15_FromFloats": lazy_node("nodes_per_block", "PerBlock_SD15_FromFloatsNode"),
+    "ADE_PerBlock_SDXL_MidLevel": lazy_node("nodes_per_block", "PerBlock_SDXL_MidLevelNode"),
+    "ADE_PerBlock_SDXL_LowLevel": lazy_node("nodes_per_block", "PerBlock_SDXL_LowLevelNode"),
+    "ADE_PerBlock_SDXL_FromFloats": lazy_node("nodes_per_block", "PerBlock_SDXL_FromFloatsNode"),
     # Extras Nodes
-    "ADE_AnimateDiffUnload": AnimateDiffUnload,
-    "ADE_EmptyLatentImageLarge": EmptyLatentImageLarge,
-    "CheckpointLoaderSimpleWithNoiseSelect": CheckpointLoaderSimpleWithNoiseSelect,
-    "ADE_PerturbedAttentionGuidanceMultival": PerturbedAttentionGuidanceMultival,
-    "ADE_RescaleCFGMultival": RescaleCFGMultival,
+    "ADE_AnimateDiffUnload": lazy_node("nodes_extras", "AnimateDiffUnload"),
+    "ADE_EmptyLatentImageLarge": lazy_node("nodes_extras", "EmptyLatentImageLarge"),
+    "CheckpointLoaderSimpleWithNoiseSelect": lazy_node("nodes_extras", "CheckpointLoaderSimpleWithNoiseSelect"),
+    "ADE_PerturbedAttentionGuidanceMultival": lazy_node("nodes_extras", "PerturbedAttentionGuidanceMultival"),
+    "ADE_RescaleCFGMultival": lazy_node("nodes_extras", "RescaleCFGMultival"),
     # Gen1 Nodes
-    "ADE_AnimateDiffLoaderGen1": AnimateDiffLoaderGen1,
-    "ADE_AnimateDiffLoaderWithContext": LegacyAnimateDiffLoaderWithContext,
+    "ADE_AnimateDiffLoaderGen1": lazy_node("nodes_gen1", "AnimateDiffLoaderGen1"),
+    "ADE_AnimateDiffLoaderWithContext": lazy_node("nodes_gen1", "LegacyAnimateDiffLoaderWithContext"),
     # Gen2 Nodes
-    "ADE_UseEvolvedSampling": UseEvolvedSamplingNode,
-    "ADE_ApplyAnimateDiffModelSimple": ApplyAnimateDiffModelBasicNode,
-    "ADE_ApplyAnimateDiffModel": ApplyAnimateDiffModelNode,
-    "ADE_LoadAnimateDiffModel": LoadAnimateDiffModelNode,
+    "ADE_UseEvolvedSampling": lazy_node("nodes_gen2", "UseEvolvedSamplingNode"),
+    "ADE_ApplyAnimateDiffModelSimple": lazy_node("nodes_gen2", "ApplyAnimateDiffModelBasicNode"),
+    "ADE_ApplyAnimateDiffModel": lazy_node("nodes_gen2", "ApplyAnimateDiffModelNode"),
+    "ADE_LoadAnimateDiffModel": lazy_node("nodes_gen2", "LoadAnimateDiffModelNode"),
     # AnimateLCM-I2V Nodes
-    "ADE_ApplyAnimateLCMI2VModel": ApplyAnimateLCMI2VModel,
-    "ADE_LoadAnimateLCMI2VModel": LoadAnimateLCMI2VModelNode,
-    "ADE_UpscaleAndVAEEncode": UpscaleAndVaeEncode,
-    "ADE_InjectI2VIntoAnimateDiffModel": LoadAnimateDiffAndInjectI2VNode,
+    "ADE_ApplyAnimateLCMI2VModel": lazy_node("nodes_animatelcmi2v", "ApplyAnimateLCMI2VModel"),
+    "ADE_LoadAnimateLCMI2VModel": lazy_node("nodes_animatelcmi2v", "LoadAnimateLCMI2VModelNode"),
+    "ADE_UpscaleAndVAEEncode": lazy_node("nodes_animatelcmi2v", "UpscaleAndVaeEncode"),
+    "ADE_InjectI2VIntoAnimateDiffModel": lazy_node("nodes_animatelcmi2v", "LoadAnimateDiffAndInjectI2VNode"),
     # CameraCtrl Nodes
-    "ADE_ApplyAnimateDiffModelWithCameraCtrl": ApplyAnimateDiffWithCameraCtrl,
-    "ADE_LoadAnimateDiffModelWithCameraCtrl": LoadAnimateDiffModelWithCameraCtrl,
-    "ADE_CameraCtrlAnimateDiffKeyframe": CameraCtrlADKeyframeNode,
-    "ADE_LoadCameraPoses": LoadCameraPosesFromFile,
-    "ADE_LoadCameraPosesFromPath": LoadCameraPosesFromPath,
-    "ADE_CameraPoseBasic": CameraCtrlPoseBasic,
-    "ADE_CameraPoseCombo": CameraCtrlPoseCombo,
-    "ADE_CameraPoseAdvanced": CameraCtrlPoseAdvanced,
-    "ADE_CameraManualPoseAppend": CameraCtrlManualAppendPose,
-    "ADE_ReplaceCameraParameters": CameraCtrlReplaceCameraParameters,
-    "ADE_ReplaceOriginalPoseAspectRatio": CameraCtrlSetOriginalAspectRatio,
+    "ADE_ApplyAnimateDiffModelWithCameraCtrl": lazy_node("nodes_cameractrl", "ApplyAnimateDiffWithCameraCtrl"),
+    "ADE_LoadAnimateDiffModelWithCameraCtrl": lazy_node("nodes_cameractrl", "LoadAnimateDiffModelWithCameraCtrl"),
+    "ADE_CameraCtrlAnimateDiffKeyframe": lazy_node("nodes_cameractrl", "CameraCtrlADKeyframeNode"),
+    "ADE_LoadCameraPoses": lazy_node("nodes_cameractrl", "LoadCameraPosesFromFile"),
+    "ADE_LoadCameraPosesFromPath": lazy_node("nodes_cameractrl", "LoadCameraPosesFromPath"),
+    "ADE_CameraPoseBasic": lazy_node("nodes_cameractrl", "CameraCtrlPoseBasic"),
+    "ADE_CameraPoseCombo": lazy_node("nodes_cameractrl", "CameraCtrlPoseCombo"),
+    "ADE_CameraPoseAdvanced": lazy_node("nodes_cameractrl", "CameraCtrlPoseAdvanced"),
+    "ADE_CameraManualPoseAppend": lazy_node("nodes_cameractrl", "CameraCtrlManualAppendPose"),
+    "ADE_ReplaceCameraParameters": lazy_node("nodes_cameractrl", "CameraCtrlReplaceCameraParameters"),
+    "ADE_ReplaceOriginalPoseAspectRatio": lazy_node("nodes_cameractrl", "CameraCtrlSetOriginalAspectRatio"),
     # PIA Nodes
-    "ADE_ApplyAnimateDiffModelWithPIA": ApplyAnimateDiffPIAModel,
-    "ADE_InputPIA_Multival": InputPIA_MultivalNode,
-    "ADE_InputPIA_PaperPresets": InputPIA_PaperPresetsNode,
-    "ADE_PIA_AnimateDiffKeyframe": PIA_ADKeyframeNode,
-    "ADE_InjectPIAIntoAnimateDiffModel": LoadAnimateDiffAndInjectPIANode,
+    "ADE_ApplyAnimateDiffModelWithPIA": lazy_node("nodes_pia", "ApplyAnimateDiffPIAModel"),
+    "ADE_InputPIA_Multival": lazy_node("nodes_pia", "InputPIA_MultivalNode"),
+    "ADE_InputPIA_PaperPresets": lazy_node("nodes_pia", "InputPIA_PaperPresetsNode"),
+    "ADE_PIA_AnimateDiffKeyframe": lazy_node("nodes_pia", "PIA_ADKeyframeNode"),
+    "ADE_InjectPIAIntoAnimateDiffModel": lazy_node("nodes_pia", "LoadAnimateDiffAndInjectPIANode"),
     # FancyVideo
-    #ApplyAnimateDiffFancyVideo.NodeID: ApplyAnimateDiffFancyVideo,
+    #"ADE_ApplyAnimateDiffFancyVideo": lazy_node("nodes_fancyvideo", "ApplyAnimateDiffFancyVideo"),
     # Deprecated Nodes
-    "AnimateDiffLoaderV1": AnimateDiffLoaderDEPR,
-    "ADE_AnimateDiffLoaderV1Advanced": AnimateDiffLoaderAdvancedDEPR,
-    "ADE_AnimateDiffCombine": AnimateDiffCombineDEPR,
-    "ADE_AnimateDiffModelSettings_Release": AnimateDiffModelSettingsDEPR,
-    "ADE_AnimateDiffModelSettingsSimple": AnimateDiffModelSettingsSimpleDEPR,
-    "ADE_AnimateDiffModelSettings": AnimateDiffModelSettingsAdvancedDEPR,
-    "ADE_AnimateDiffModelSettingsAdvancedAttnStrengths": AnimateDiffModelSettingsAdvancedAttnStrengthsDEPR,
+    "AnimateDiffLoaderV1": lazy_node("nodes_deprecated", "AnimateDiffLoaderDEPR"),
+    "ADE_AnimateDiffLoaderV1Advanced": lazy_node("nodes_deprecated", "AnimateDiffLoaderAdvancedDEPR"),
+    "ADE_AnimateDiffCombine": lazy_node("nodes_deprecated", "AnimateDiffCombineDEPR"),
+    "ADE_AnimateDiffModelSettings_Release": lazy_node("nodes_deprecated", "AnimateDiffModelSettingsDEPR"),
+    "ADE_AnimateDiffModelSettingsSimple": lazy_node("nodes_deprecated", "AnimateDiffModelSettingsSimpleDEPR"),
+    "ADE_AnimateDiffModelSettings": lazy_node("nodes_deprecated", "AnimateDiffModelSettingsAdvancedDEPR"),
+    "ADE_AnimateDiffModelSettingsAdvancedAttnStrengths": lazy_node("nodes_deprecated", "AnimateDiffModelSettingsAdvancedAttnStrengthsDEPR"),
 }
+for node_id, node in NODE_CLASS_MAPPINGS.items():
+    node._lazy_node_id = node_id
+
 NODE_DISPLAY_NAME_MAPPINGS = {
     # Unencapsulated
     "ADE_AnimateDiffLoRALoader": "Load AnimateDiff LoRA 🎭🅐🅓",
@@ -328,22 +346,23 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "ADE_NoisedImageInjectOptions": "Image Injection Options 🎭🅐🅓",
     "ADE_NoiseCalibration": "Noise Calibration 🎭🅐🅓",
     # Scheduling
-    PromptSchedulingNode.NodeID: PromptSchedulingNode.NodeName,
-    PromptSchedulingLatentsNode.NodeID: PromptSchedulingLatentsNode.NodeName,
-    ValueSchedulingNode.NodeID: ValueSchedulingNode.NodeName,
-    ValueSchedulingLatentsNode.NodeID: ValueSchedulingLatentsNode.NodeName,
-    AddValuesReplaceNode.NodeID: AddValuesReplaceNode.NodeName,
-    FloatToFloatsNode.NodeID:FloatToFloatsNode.NodeName,
+    "ADE_PromptScheduling": "Prompt Scheduling 🎭🅐🅓",
+    "ADE_PromptSchedulingLatents": "Prompt Scheduling [Latents] 🎭🅐🅓",
+    "ADE_ValueScheduling": "Value Scheduling 🎭🅐🅓",
+    "ADE_ValueSchedulingLatents": "Value Scheduling [Latents] 🎭🅐🅓",
+    "ADE_ValuesReplace": "Add Values Replace 🎭🅐🅓",
+    "ADE_FloatToFloats": "Float to Floats 🎭🅐🅓",
+    "ADE_TextEncodingCache": "Text Encoding Cache 🎭🅐🅓",
     # Per-Block
-    ADBlockComboNode.NodeID: ADBlockComboNode.NodeName,
-    ADBlockIndivNode.NodeID: ADBlockIndivNode.NodeName,
-    PerBlockHighLevelNode.NodeID: PerBlockHighLevelNode.NodeName,
-    PerBlock_SD15_MidLevelNode.NodeID: PerBlock_SD15_MidLevelNode.NodeName,
-    PerBlock_SD15_LowLevelNode.NodeID: PerBlock_SD15_LowLevelNode.NodeName,
-    PerBlock_SD15_FromFloatsNode.NodeID: PerBlock_SD15_FromFloatsNode.NodeName,
-    PerBlock_SDXL_MidLevelNode.NodeID: PerBlock_SDXL_MidLevelNode.NodeName,
-    PerBlock_SDXL_LowLevelNode.NodeID: PerBlock_SDXL_LowLevelNode.NodeName,
-    PerBlock_SDXL_FromFloatsNode.NodeID: PerBlock_SDXL_FromFloatsNode.NodeName,
+    "ADE_ADBlockCombo": "AD Block 🎭🅐🅓",
+    "ADE_ADBlockIndiv": "AD Block+ 🎭🅐🅓",
+    "ADE_PerBlockHighLevel": "AD Per Block 🎭🅐🅓",
+    "ADE_PerBlock_SD15_MidLevel": "AD Per Block+ (SD1.5) 🎭🅐🅓",
+    "ADE_PerBlock_SD15_LowLevel": "AD Per Block++ (SD1.5) 🎭🅐🅓",
+    "ADE_PerBlock_SD15_FromFloats": "AD Per Block Floats (SD1.5) 🎭🅐🅓",
+    "ADE_PerBlock_SDXL_MidLevel": "AD Per Block+ (SDXL) 🎭🅐🅓",
+    "ADE_PerBlock_SDXL_LowLevel": "AD Per Block++ (SDXL) 🎭🅐🅓",
+    "ADE_PerBlock_SDXL_FromFloats": "AD Per Block Floats (SDXL) 🎭🅐🅓",
     # Extras Nodes
     "ADE_AnimateDiffUnload": "AnimateDiff Unload 🎭🅐🅓",
     "ADE_EmptyLatentImageLarge": "Empty Latent Image (Big Batch) 🎭🅐🅓",
@@ -382,7 +401,7 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "ADE_PIA_AnimateDiffKeyframe": "AnimateDiff-PIA Keyframe 🎭🅐🅓",
     "ADE_InjectPIAIntoAnimateDiffModel": "🧪Inject PIA into AnimateDiff Model 🎭🅐🅓②",
     # FancyVideo
-    ApplyAnimateDiffFancyVideo.NodeID: ApplyAnimateDiffFancyVideo.NodeName,
+    "ADE_ApplyAnimateDiffFancyVideo": "Apply AD-FancyVideo Model 🎭🅐🅓",
     # Deprecated Nodes
     "AnimateDiffLoaderV1": "🚫AnimateDiff Loader [DEPRECATED] 🎭🅐🅓",
     "ADE_AnimateDiffLoaderV1Advanced": "🚫AnimateDiff Loader (Advanced) [DEPRECATED] 🎭🅐🅓",
@@ -11,12 +11,13 @@ from pathlib import Path
 from collections import OrderedDict
 
 from .ad_settings import AnimateDiffSettings
-from .adapter_cameractrl import CameraEntry
+from .adapter_cameractrl import CameraPoses
 from .logger import logger
-from .utils_model import get_available_motion_models, calculate_file_hash, strip_path, BIGMAX
+from .utils_model import get_available_motion_models, calculate_file_hash_raw, strip_path, BIGMAX
 from .utils_motion import ADKeyframeGroup
 from .motion_lora import MotionLoraList
-from .model_injection import (MotionModelGroup, MotionModelPatcher, get_mm_attachment, load_motion_module_gen2, inject_camera_encoder_into_model)
+from .model_injection import (MotionModelGroup, MotionModelPatcher, get_mm_attachment, load_motion_module_gen2, inject_camera_encoder_into_model,
+                              load_camera_ctrl_state_dicts, run_loads_in_parallel)
 from .nodes_gen2 import ApplyAnimateDiffModelNode, ADKeyframeNode
 
 
@@ -229,9 +230,8 @@ class ApplyAnimateDiffWithCameraCtrl:
         # confirm that model contains camera_encoder
         if curr_model.model.camera_encoder is None:
             raise Exception(f"Motion model '{curr_model.model.mm_info.mm_name}' does not contain a camera_encoder; cannot be used with Apply AnimateDiff-CameraCtrl Model node.")
-        camera_entries = [CameraEntry(entry) for entry in cameractrl_poses]
         attachment = get_mm_attachment(curr_model)
-        attachment.orig_camera_entries = camera_entries
+        attachment.orig_camera_poses = CameraPoses.from_poses(cameractrl_poses)
         attachment.cameractrl_multival = cameractrl_multival
         return new_m_models
 
@@ -255,8 +255,12 @@ class LoadAnimateDiffModelWithCameraCtrl:
     FUNCTION = "load_camera_ctrl"
 
     def load_camera_ctrl(self, model_name: str, camera_ctrl: str, ad_settings: AnimateDiffSettings=None):
-        loaded_motion_model = load_motion_module_gen2(model_name=model_name, motion_model_settings=ad_settings)
-        inject_camera_encoder_into_model(motion_model=loaded_motion_model, camera_ctrl_name=camera_ctrl)
+        # read motion model and CameraCtrl model concurrently
+        loaded_motion_model, camera_ctrl_state_dicts = run_loads_in_parallel([
+            lambda: load_motion_module_gen2(model_name=model_name, motion_model_settings=ad_settings),
+            lambda: load_camera_ctrl_state_dicts(camera_ctrl),
+        ])
+        inject_camera_encoder_into_model(motion_model=loaded_motion_model, camera_ctrl_name=camera_ctrl, camera_ctrl_state_dicts=camera_ctrl_state_dicts)
         return (loaded_motion_model,)
 
 
@@ -337,7 +341,7 @@ class LoadCameraPosesFromPath:
     @classmethod
     def IS_CHANGED(s, file_path, **kwargs):
         if Path(file_path).is_file():
-            return calculate_file_hash(strip_path(file_path))
+            return calculate_file_hash_raw(strip_path(file_path))
         return False
     
     @classmethod
@@ -12,7 +12,7 @@ from .utils_motion import ADKeyframeGroup, get_combined_multival
 from .motion_lora import MotionLoraInfo, MotionLoraList
 from .motion_module_ad import AllPerBlocks
 from .model_injection import (ModelPatcherHelper, InjectionParams, MotionModelGroup, get_mm_attachment,
-                              load_motion_lora_as_patches, load_motion_module_gen1, load_motion_module_gen2, validate_model_compatibility_gen2,
+                              load_motion_module_gen1, load_motion_module_gen2, validate_model_compatibility_gen2,
                               validate_per_block_compatibility)
 from .sample_settings import SampleSettings, SeedNoiseGeneration
 from .sampling import outer_sample_wrapper, sliding_calc_cond_batch
@@ -51,14 +51,10 @@ class AnimateDiffLoaderGen1:
         sample_settings: SampleSettings=None, scale_multival=None, effect_multival=None, ad_keyframes: ADKeyframeGroup=None,
         per_block: AllPerBlocks=None,
     ):
-        # load motion module and motion settings, if included
-        motion_model = load_motion_module_gen2(model_name=model_name, motion_model_settings=ad_settings)
+        # load motion module, motion settings, and motion loras, if included
+        motion_model = load_motion_module_gen2(model_name=model_name, motion_model_settings=ad_settings, motion_lora=motion_lora)
         # confirm that it is compatible with SD model
         validate_model_compatibility_gen2(model=model, motion_model=motion_model)
-        # apply motion model to loaded_mm
-        if motion_lora is not None:
-            for lora in motion_lora.loras:
-                load_motion_lora_as_patches(motion_model, lora)
         attachment = get_mm_attachment(motion_model)
         attachment.scale_multival = scale_multival
         attachment.effect_multival = effect_multival
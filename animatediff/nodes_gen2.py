@@ -12,7 +12,7 @@ from .motion_lora import MotionLoraList
 from .motion_module_ad import AllPerBlocks
 from .model_injection import (ModelPatcherHelper,
                               InjectionParams, MotionModelGroup, MotionModelPatcher, get_mm_attachment, create_fresh_motion_module,
-                              load_motion_module_gen2, load_motion_lora_as_patches, validate_model_compatibility_gen2, validate_per_block_compatibility)
+                              load_motion_module_gen2, load_motion_loras_as_patches, validate_model_compatibility_gen2, validate_per_block_compatibility)
 from .sample_settings import SampleSettings
 from .sampling import outer_sample_wrapper, sliding_calc_cond_batch
 
@@ -126,8 +126,7 @@ class ApplyAnimateDiffModelNode:
                 motion_model = create_fresh_motion_module(motion_model)
         # apply motion model to loaded_mm
         if motion_lora is not None:
-            for lora in motion_lora.loras:
-                load_motion_lora_as_patches(motion_model, lora)
+            load_motion_loras_as_patches(motion_model, motion_lora)
         attachment = get_mm_attachment(motion_model)
         attachment.scale_multival = scale_multival
         attachment.effect_multival = effect_multival
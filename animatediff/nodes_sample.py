@@ -4,7 +4,7 @@ from collections.abc import Iterable
 
 from comfy.sd import VAE
 
-from .freeinit import FreeInitFilter
+from .freeinit import FreeInitFilter, FreeInitMixDevice, FREQ_MIX_CHUNK_FRAMES
 from .sample_settings import (FreeInitOptions, IterationOptions,
                               NoiseLayerAdd, NoiseLayerAddWeighted, NoiseLayerGroup, NoiseLayerReplace, NoiseLayerType,
                               SeedNoiseGeneration, SampleSettings, NoiseCalibration,
@@ -183,6 +183,7 @@ class IterationOptionsNode:
             "optional": {
                 "iter_batch_offset": ("INT", {"default": 0, "min": 0, "max": BIGMAX}),
                 "iter_seed_offset": ("INT", {"default": 0, "min": BIGMIN, "max": BIGMAX}),
+                "early_step_fraction": ("FLOAT", {"default": 1.0, "min": 0.01, "max": 1.0, "step": 0.01}),
             }
         }
 
@@ -190,8 +191,9 @@ class IterationOptionsNode:
     CATEGORY = "Animate Diff 🎭🅐🅓/iteration opts"
     FUNCTION = "create_iter_opts"
 
-    def create_iter_opts(self, iterations: int, iter_batch_offset: int=0, iter_seed_offset: int=0):
-        iter_opts = IterationOptions(iterations=iterations, iter_batch_offset=iter_batch_offset, iter_seed_offset=iter_seed_offset)
+    def create_iter_opts(self, iterations: int, iter_batch_offset: int=0, iter_seed_offset: int=0, early_step_fraction: float=1.0):
+        iter_opts = IterationOptions(iterations=iterations, iter_batch_offset=iter_batch_offset, iter_seed_offset=iter_seed_offset,
+                                     early_step_fraction=early_step_fraction)
         return (iter_opts,)
 
 
@@ -212,6 +214,13 @@ class FreeInitOptionsNode:
             "optional": {
                 "iter_batch_offset": ("INT", {"default": 0, "min": 0, "max": BIGMAX}),
                 "iter_seed_offset": ("INT", {"default": 1, "min": BIGMIN, "max": BIGMAX}),
+                "early_step_fraction": ("FLOAT", {"default": 1.0, "min": 0.01, "max": 1.0, "step": 0.01}),
+                "mix_chunk_frames": ("INT", {"default": FREQ_MIX_CHUNK_FRAMES, "min": 1, "max": BIGMAX,
+                                             "tooltip": "Latents with more frames than this get frequency-mixed in chunks of this many frames, which lowers peak memory for long animations."}),
+                "mix_workers": ("INT", {"default": 1, "min": 1, "max": 64,
+                                        "tooltip": "Amount of chunks to frequency-mix at the same time; only used when latents are mixed in chunks."}),
+                "mix_device": (FreeInitMixDevice.LIST, {"default": FreeInitMixDevice.LATENTS,
+                                                        "tooltip": "Device to run the chunked FFTs on; 'latents' uses the device the latents are on. Chunks are always stored on the latents' device."}),
             },
             "hidden": {
                 "autosize": ("ADEAUTOSIZE", {"padding": 0}),
@@ -224,11 +233,14 @@ class FreeInitOptionsNode:
 
     def create_iter_opts(self, iterations: int, filter: str, d_s: float, d_t: float, n_butterworth: int,
                          sigma_step: int, apply_to_1st_iter: bool, init_type: str,
-                         iter_batch_offset: int=0, iter_seed_offset: int=1):
+                         iter_batch_offset: int=0, iter_seed_offset: int=1, early_step_fraction: float=1.0,
+                         mix_chunk_frames: int=FREQ_MIX_CHUNK_FRAMES, mix_workers: int=1, mix_device: str=FreeInitMixDevice.LATENTS):
         # init_type does nothing for now, not until I add more methods of applying low+high freq noise
         iter_opts = FreeInitOptions(iterations=iterations, step=sigma_step, apply_to_1st_iter=apply_to_1st_iter,
                                     filter=filter, d_s=d_s, d_t=d_t, n=n_butterworth, init_type=init_type,
-                                    iter_batch_offset=iter_batch_offset, iter_seed_offset=iter_seed_offset)
+                                    iter_batch_offset=iter_batch_offset, iter_seed_offset=iter_seed_offset,
+                                    early_step_fraction=early_step_fraction,
+                                    mix_chunk_frames=mix_chunk_frames, mix_workers=mix_workers, mix_device=mix_device)
         return (iter_opts,)
 
 
@@ -1,8 +1,9 @@
 from typing import Union
 
 from .documentation import register_description, short_desc, coll, DocHelper
-from .scheduling import (evaluate_prompt_schedule, evaluate_value_schedule, TensorInterp, PromptOptions,
+from .scheduling import (evaluate_prompt_schedule, evaluate_value_schedule, TensorInterp, PromptOptions, EncodingMemo,
                          verify_key_value)
+from .encoding_cache import get_text_encoding_cache
 from .utils_model import BIGMAX
 from .logger import logger
 
@@ -17,15 +18,21 @@ desc_append_text = {'append_text': 'OPTIONAL, adds text after all prompts.'}
 desc_values_replace = {'values_replace': 'OPTIONAL, replaces keys from value_replace keys with provided value schedules. Keys in the prompt are written as `some_key`, surrounded by the ` characters.'}
 desc_tensor_interp = {'tensor_interp': 'Selects method of interpolating prompt conds - defaults to lerp.'}
 desc_print_schedule = {'print_schedule': 'When True, prints output values for each frame.'}
+desc_lazy_cond = {'lazy_cond': 'When True, only stores unique prompt conds plus how much each frame uses each of them; frame conds are computed when needed, such as per context window. Saves memory on long schedules.'}
+desc_encoding_cache = {'encoding_cache': 'OPTIONAL, reuses prompt encodings saved to disk by previous runs, and saves new ones.'}
+desc_encode_batch_size = {'encode_batch_size': 'Amount of prompts (and token chunks) to run through the text encoder at once. Higher is faster for many unique prompts, but uses more memory; 1 encodes prompts one by one.'}
 
 desc_max_length = {'max_length': 'Used to select the intended length of schedule. If set to 0, will use the largest index in the schedule as max_length, but will disable relative indexes (negative and decimal).'}
 desc_floats = {'floats': 'List of floats, likely outputted by a Value Scheduling node.'}
 desc_FLOAT = {'FLOAT': 'Float (or list of floats) to convert to FLOATS type.'}
 desc_value_key = {'value_key': 'Key to use for value schedule in Prompt Scheduling node. Can only contain a-z, A-Z, 0-9, and _ characters. In Prompt Scheduling, keys can be referred to as `some_key`, where the key is surrounded by ` characters.'}
 desc_prev_replace = {'prev_replace': 'OPTIONAL, other values_replace can be chained.'}
+desc_cache_dir = {'cache_dir': 'Folder to save encodings to. If empty, uses ADE_text_encoding_cache in the ComfyUI user directory. Can be a shared network folder used by multiple ComfyUI instances.'}
+desc_max_size_mb = {'max_size_mb': 'Max total size of saved encodings, in MB. Least recently used encodings are deleted once exceeded.'}
 
 desc_output_conditioning = {'CONDITIONING': 'Encoded prompts.'}
 desc_output_latent = {'LATENT': 'Unmodified input latents; can be used as pipe, or can be ignored.'}
+desc_output_encoding_cache = {'ENCODING_CACHE': 'Text encoding cache to plug into Prompt Scheduling nodes.'}
 
 desc_format_allowed_idxs = {'allowed idxs':
         {'single': 'A positive integer (e.g. 0, 2) schedules value for frame. A negative integer (e.g. -1, -5) schedules value for frame from the end (-1 would be the last frame). ' + 
@@ -73,7 +80,10 @@ class PromptSchedulingLatentsNode:
                 "append_text": ("STRING", {"multiline": True, "default": '', "forceInput": True}),
                 "values_replace": ("VALUES_REPLACE",),
                 "print_schedule": ("BOOLEAN", {"default": False}),
-                "tensor_interp": (TensorInterp._LIST,)
+                "tensor_interp": (TensorInterp._LIST,),
+                "encoding_cache": ("ENCODING_CACHE",),
+                "lazy_cond": ("BOOLEAN", {"default": False}),
+                "encode_batch_size": ("INT", {"default": 8, "min": 1, "max": 256}),
             },
         }
 
@@ -81,18 +91,25 @@ class PromptSchedulingLatentsNode:
     CATEGORY = "Animate Diff 🎭🅐🅓/scheduling"
     FUNCTION = "create_schedule"
 
+    def __init__(self):
+        # keeps encodings between executions, so editing the schedule only encodes changed prompts
+        self.encoding_memo = EncodingMemo()
+
     Desc = [
         short_desc('Encode a schedule of prompts with automatic interpolation, its length matching passed-in latent count.'),
         {'Format': desc_format_prompt},
-        {coll('Inputs'): DocHelper.combine(desc_prompts, desc_clip, desc_latent, desc_values_replace, desc_prepend_text, desc_append_text, desc_tensor_interp, desc_print_schedule)},
+        {coll('Inputs'): DocHelper.combine(desc_prompts, desc_clip, desc_latent, desc_values_replace, desc_prepend_text, desc_append_text, desc_tensor_interp, desc_print_schedule, desc_encoding_cache, desc_lazy_cond, desc_encode_batch_size)},
         {coll('Outputs'): DocHelper.combine(desc_output_conditioning, desc_output_latent)}
     ]
     register_description(NodeID, Desc)
 
     def create_schedule(self, prompts: str, clip, latent: dict, print_schedule=False, tensor_interp=TensorInterp.LERP,
-                        prepend_text='', append_text='', values_replace=None):
+                        prepend_text='', append_text='', values_replace=None, encoding_cache=None, lazy_cond=False,
+                        encode_batch_size=8):
         options = PromptOptions(interp=tensor_interp, prepend_text=prepend_text, append_text=append_text,
-                                values_replace=values_replace, print_schedule=print_schedule)
+                                values_replace=values_replace, print_schedule=print_schedule, encoding_cache=encoding_cache,
+                                lazy_cond=lazy_cond, encoding_memo=self.encoding_memo,
+                                encode_batch_size=encode_batch_size)
         conditioning = evaluate_prompt_schedule(prompts, latent["samples"].size(0), clip, options)
         return (conditioning, latent)
 
@@ -113,7 +130,10 @@ class PromptSchedulingNode:
                 "values_replace": ("VALUES_REPLACE",),
                 "print_schedule": ("BOOLEAN", {"default": False}),
                 "max_length": ("INT", {"default": 0, "min": 0, "max": BIGMAX, "step": 1}),
-                "tensor_interp": (TensorInterp._LIST,)
+                "tensor_interp": (TensorInterp._LIST,),
+                "encoding_cache": ("ENCODING_CACHE",),
+                "lazy_cond": ("BOOLEAN", {"default": False}),
+                "encode_batch_size": ("INT", {"default": 8, "min": 1, "max": 256}),
             },
         }
     
@@ -121,22 +141,57 @@ class PromptSchedulingNode:
     CATEGORY = "Animate Diff 🎭🅐🅓/scheduling"
     FUNCTION = "create_schedule"
 
+    def __init__(self):
+        # keeps encodings between executions, so editing the schedule only encodes changed prompts
+        self.encoding_memo = EncodingMemo()
+
     Desc = [
         short_desc('Encode a schedule of prompts with automatic interpolation.'),
         {'Format': desc_format_prompt},
-        {coll('Inputs'): DocHelper.combine(desc_prompts, desc_clip, desc_values_replace, desc_prepend_text, desc_append_text, desc_max_length, desc_tensor_interp, desc_print_schedule)},
+        {coll('Inputs'): DocHelper.combine(desc_prompts, desc_clip, desc_values_replace, desc_prepend_text, desc_append_text, desc_max_length, desc_tensor_interp, desc_print_schedule, desc_encoding_cache, desc_lazy_cond, desc_encode_batch_size)},
         {coll('Outputs'): DocHelper.combine(desc_output_conditioning)}
     ]
     register_description(NodeID, Desc)
 
     def create_schedule(self, prompts: str, clip, print_schedule=False, max_length: int=0, tensor_interp=TensorInterp.LERP,
-                        prepend_text='', append_text='', values_replace=None):
+                        prepend_text='', append_text='', values_replace=None, encoding_cache=None, lazy_cond=False,
+                        encode_batch_size=8):
         options = PromptOptions(interp=tensor_interp, prepend_text=prepend_text, append_text=append_text,
-                                values_replace=values_replace, print_schedule=print_schedule)
+                                values_replace=values_replace, print_schedule=print_schedule, encoding_cache=encoding_cache,
+                                lazy_cond=lazy_cond, encoding_memo=self.encoding_memo,
+                                encode_batch_size=encode_batch_size)
         conditioning = evaluate_prompt_schedule(prompts, max_length, clip, options)
         return (conditioning,)
 
 
+class TextEncodingCacheNode:
+    NodeID = 'ADE_TextEncodingCache'
+    NodeName = 'Text Encoding Cache 🎭🅐🅓'
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "cache_dir": ("STRING", {"default": ''}),
+                "max_size_mb": ("INT", {"default": 2048, "min": 1, "max": BIGMAX, "step": 1}),
+            },
+        }
+
+    RETURN_TYPES = ("ENCODING_CACHE",)
+    CATEGORY = "Animate Diff 🎭🅐🅓/scheduling"
+    FUNCTION = "get_encoding_cache"
+
+    Desc = [
+        short_desc('Saves Prompt Scheduling encodings to disk, so unchanged prompts do not need to be encoded again in later runs.'),
+        'Encodings are only reused when CLIP weights, LoRAs, hooks, and clip skip all match.',
+        {coll('Inputs'): DocHelper.combine(desc_cache_dir, desc_max_size_mb)},
+        {coll('Outputs'): DocHelper.combine(desc_output_encoding_cache)}
+    ]
+    register_description(NodeID, Desc)
+
+    def get_encoding_cache(self, cache_dir: str, max_size_mb: int):
+        return (get_text_encoding_cache(cache_dir=cache_dir.strip(), max_bytes=max_size_mb*1024*1024),)
+
+
 class ValueSchedulingLatentsNode:
     NodeID = 'ADE_ValueSchedulingLatents'
     NodeName = 'Value Scheduling [Latents] 🎭🅐🅓'
@@ -0,0 +1,99 @@
+import math
+from typing import Union
+
+import torch
+from torch import Tensor
+
+
+# Philox4x32-10 counter-based RNG (Salmon et al., "Parallel Random Numbers: As Easy as 1, 2, 3").
+# Each random value is a pure function of (seed, frame index, position in frame), so noise for any
+# subset of frames can be generated in one vectorized call and is identical regardless of chunking.
+# Only integer ops are used to produce the random bits, so they match exactly on every device; the final
+# normal values match across devices within floating point tolerance (log/cos/sin are not bit-identical everywhere).
+PHILOX_M0 = 0xD2511F53
+PHILOX_M1 = 0xCD9E8D57
+PHILOX_W0 = 0x9E3779B9
+PHILOX_W1 = 0xBB67AE85
+PHILOX_ROUNDS = 10
+MASK_32 = 0xFFFFFFFF
+FRAME_CHUNK = 32
+
+
+def _mulhilo(a: int, b: Tensor) -> tuple[Tensor, Tensor]:
+    # product of two uint32 values fits in 64 bits; int64 wraparound keeps the bits intact
+    prod = b * a
+    return (prod >> 32) & MASK_32, prod & MASK_32
+
+
+def philox_4x32(c0: Tensor, c1: Tensor, c2: Tensor, c3: Tensor, seed: int) -> tuple[Tensor, Tensor, Tensor, Tensor]:
+    '''Returns 4 uint32 values (stored in int64 tensors) per counter.'''
+    k0 = seed & MASK_32
+    k1 = (seed >> 32) & MASK_32
+    for _ in range(PHILOX_ROUNDS):
+        hi0, lo0 = _mulhilo(PHILOX_M0, c0)
+        hi1, lo1 = _mulhilo(PHILOX_M1, c2)
+        c0, c1, c2, c3 = hi1 ^ c1 ^ k0, lo1, hi0 ^ c3 ^ k1, lo0
+        k0 = (k0 + PHILOX_W0) & MASK_32
+        k1 = (k1 + PHILOX_W1) & MASK_32
+    return c0, c1, c2, c3
+
+
+# device type -> whether float64 math is supported (e.g. not on MPS)
+_float64_support: dict[str, bool] = {}
+
+
+def supports_float64(device: torch.device) -> bool:
+    supported = _float64_support.get(device.type, None)
+    if supported is None:
+        try:
+            torch.zeros(1, dtype=torch.float64, device=device).log_()
+            supported = True
+        except (TypeError, RuntimeError):
+            supported = False
+        _float64_support[device.type] = supported
+    return supported
+
+
+def _to_uniform(x: Tensor) -> Tensor:
+    # maps 32-bit words to (0, 1], so log is always finite
+    return (x.to(torch.float64) + 1.0) / 4294967296.0
+
+
+def randn_frames(seed: int, frame_idxs: Union[Tensor, list[int], range], frame_shape: tuple[int], dtype=torch.float32,
+                 device: Union[str, torch.device]="cpu", out_device: Union[str, torch.device]="cpu") -> Tensor:
+    '''
+    Returns standard normal noise of shape (len(frame_idxs), *frame_shape), where each frame only depends on seed and its frame index.
+    Random bits are computed on device, as are normals if device supports float64 (otherwise on CPU); result is moved to out_device.
+    '''
+    frame_idxs = torch.as_tensor(frame_idxs, dtype=torch.int64).reshape(-1)
+    noise = torch.empty((len(frame_idxs), *frame_shape), dtype=dtype, device=out_device)
+    # frames are independent, so work in chunks to bound the size of the intermediate int64 tensors
+    for start_idx in range(0, len(frame_idxs), FRAME_CHUNK):
+        chunk_idxs = frame_idxs[start_idx:start_idx+FRAME_CHUNK].to(device)
+        noise[start_idx:start_idx+FRAME_CHUNK] = _randn_frames_chunk(seed, chunk_idxs, frame_shape).to(dtype=dtype, device=out_device)
+    return noise
+
+
+def _randn_frames_chunk(seed: int, frame_idxs: Tensor, frame_shape: tuple[int]) -> Tensor:
+    device = frame_idxs.device
+    per_frame = math.prod(frame_shape)
+    # each counter gives 4 uniforms -> 4 normals via Box-Muller
+    blocks = (per_frame + 3) // 4
+    block_idxs = torch.arange(blocks, dtype=torch.int64, device=device)
+    c0 = block_idxs.unsqueeze(0).expand(len(frame_idxs), -1)
+    c1 = (frame_idxs & MASK_32).unsqueeze(1).expand(-1, blocks)
+    c2 = ((frame_idxs >> 32) & MASK_32).unsqueeze(1).expand(-1, blocks)
+    c3 = torch.zeros_like(c0)
+    seed = seed & 0xFFFFFFFFFFFFFFFF
+    r0, r1, r2, r3 = philox_4x32(c0, c1, c2, c3, seed)
+    # Box-Muller in float64 keeps results within tolerance across devices once cast down;
+    # where float64 is not supported, do it on CPU instead of losing precision
+    if not supports_float64(device):
+        r0, r1, r2, r3 = r0.cpu(), r1.cpu(), r2.cpu(), r3.cpu()
+    radius_a = torch.sqrt(-2.0 * torch.log(_to_uniform(r0)))
+    theta_a = (2.0 * math.pi) * _to_uniform(r1)
+    radius_b = torch.sqrt(-2.0 * torch.log(_to_uniform(r2)))
+    theta_b = (2.0 * math.pi) * _to_uniform(r3)
+    noise = torch.stack([radius_a * torch.cos(theta_a), radius_a * torch.sin(theta_a),
+                         radius_b * torch.cos(theta_b), radius_b * torch.sin(theta_b)], dim=-1)
+    return noise.reshape(len(frame_idxs), blocks * 4)[:, :per_frame].reshape(len(frame_idxs), *frame_shape)
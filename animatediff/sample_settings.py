@@ -1,9 +1,11 @@
+from collections import OrderedDict
 from collections.abc import Iterable
 from typing import Union, Callable
+import hashlib
+import threading
 import torch
 from torch import Tensor
 import torch.fft as fft
-from einops import rearrange
 
 import comfy.sample
 import comfy.samplers
@@ -12,7 +14,7 @@ from comfy.model_patcher import ModelPatcher
 from comfy.model_base import BaseModel
 from comfy.sd import VAE
 
-from . import freeinit
+from . import freeinit, philox
 from .conditioning import LoraHookMode
 from .context import ContextOptions, ContextOptionsGroup
 from .utils_model import SigmaSchedule
@@ -75,27 +77,55 @@ class SampleSettings:
         self.noise_calibration = noise_calibration
     
     def prepare_noise(self, seed: int, latents: Tensor, noise: Tensor, extra_seed_offset=0, extra_args:dict={}, force_create_noise=True):
+        # identical settings create identical noise, so reuse it across runs when possible
+        cache_key = self.get_noise_cache_key(seed=seed, latents=latents, extra_seed_offset=extra_seed_offset, extra_args=extra_args,
+                                             force_create_noise=force_create_noise)
+        if cache_key is not None:
+            cached_noise = initial_noise_cache.get(cache_key)
+            if cached_noise is not None:
+                logger.info(f"Reusing cached initial noise ({initial_noise_cache.get_stats_string()}).")
+                return cached_noise
+        noise = self.prepare_lazy_noise(seed=seed, latents=latents, noise=noise, extra_seed_offset=extra_seed_offset, extra_args=extra_args,
+                                        force_create_noise=force_create_noise).materialize()
+        if cache_key is not None:
+            initial_noise_cache.put(cache_key, noise)
+        return noise
+
+    def get_noise_cache_key(self, seed: int, latents: Tensor, extra_seed_offset=0, extra_args:dict={}, force_create_noise=True) -> Union[tuple, None]:
+        '''Returns key that fully determines the noise prepare_noise would create, or None if the noise depends on the passed-in noise.'''
+        if self.seed_override is not None:
+            seed = self.seed_override
+        if not isinstance(seed, Iterable) and not (self.batch_offset != 0 or self.seed_offset != 0 or self.noise_type != NoiseLayerType.DEFAULT
+                                                   or self.seed_gen != SeedNoiseGeneration.COMFY or force_create_noise):
+            return None
+        return (_get_seed_key(seed), extra_seed_offset, tuple(latents.shape), latents.dtype, latents.layout,
+                self.noise_type, self.seed_gen, self.batch_offset, self.seed_offset,
+                tuple(layer.get_fingerprint() for layer in self.noise_layers.layers), _get_context_fingerprint(extra_args))
+
+    def prepare_lazy_noise(self, seed: int, latents: Tensor, noise: Tensor, extra_seed_offset=0, extra_args:dict={}, force_create_noise=True) -> 'LazyNoise':
         if self.seed_override is not None:
             seed = self.seed_override
         # if seed is iterable, attempt to do per-latent noises
         if isinstance(seed, Iterable):
-            noise = SeedNoiseGeneration.create_noise_individual_seeds(seeds=seed, latents=latents, seed_offset=self.seed_offset+extra_seed_offset, extra_args=extra_args)
+            get_noise_frames = SeedNoiseGeneration.create_noise_individual_seeds_frames_func(seeds=seed, latents=latents, seed_offset=self.seed_offset+extra_seed_offset,
+                                                                                             extra_args=extra_args)
             seed = seed[0]+self.seed_offset
         else:
             seed += self.seed_offset
             # replace initial noise if not batch_offset 0 or Comfy seed_gen or not NoiseType default
             if self.batch_offset != 0 or self.seed_offset != 0 or self.noise_type != NoiseLayerType.DEFAULT or self.seed_gen != SeedNoiseGeneration.COMFY or force_create_noise:
-                noise = SeedNoiseGeneration.create_noise(seed=seed+extra_seed_offset, latents=latents, existing_seed_gen=self.seed_gen, seed_gen=self.seed_gen,
-                                                        noise_type=self.noise_type, batch_offset=self.batch_offset, extra_args=extra_args)
+                get_noise_frames = SeedNoiseGeneration.create_noise_frames_func(seed=seed+extra_seed_offset, latents=latents, existing_seed_gen=self.seed_gen, seed_gen=self.seed_gen,
+                                                                                noise_type=self.noise_type, batch_offset=self.batch_offset, extra_args=extra_args)
+            else:
+                get_noise_frames = lambda start_idx, end_idx: noise[start_idx:end_idx]
+        lazy_noise = LazyNoise(get_noise_frames, length=latents.shape[0])
         # apply noise layers
         for noise_layer in self.noise_layers.layers:
-            # first, generate new noise matching seed gen override
-            layer_noise = noise_layer.create_layer_noise(existing_seed_gen=self.seed_gen, seed=seed, latents=latents,
-                                                         extra_seed_offset=extra_seed_offset, extra_args=extra_args)
-            # next, get noise after applying layer
-            noise = noise_layer.apply_layer_noise(new_noise=layer_noise, old_noise=noise)
+            # generate new noise matching seed gen override on demand
+            lazy_noise.add_layer(noise_layer, noise_layer.create_layer_noise_frames_func(existing_seed_gen=self.seed_gen, seed=seed, latents=latents,
+                                                                                        extra_seed_offset=extra_seed_offset, extra_args=extra_args))
         # noise prepared now
-        return noise
+        return lazy_noise
     
     def pre_run(self, model: ModelPatcher):
         if self.custom_cfg is not None:
@@ -125,6 +155,23 @@ class NoiseLayer:
         self.seed_offset = seed_offset
         self.seed_override = seed_override
         self.mask = mask
+        # hash of mask contents, for noise cache keys
+        self._mask_hash: str = None
+        self._mask_hash_src: Tensor = None
+
+    def get_fingerprint(self) -> tuple:
+        '''Returns tuple of everything that affects the noise this layer creates and how it is applied.'''
+        return (type(self).__name__, self.noise_type, self.batch_offset, self.seed_gen_override, self.seed_offset,
+                _get_seed_key(self.seed_override), self.get_mask_hash())
+
+    def get_mask_hash(self) -> Union[str, None]:
+        if self.mask is None:
+            return None
+        if self._mask_hash_src is not self.mask:
+            mask = self.mask.detach().to(device="cpu", dtype=torch.float32).contiguous()
+            self._mask_hash = f"{tuple(mask.shape)}:{hashlib.sha256(mask.numpy().tobytes()).hexdigest()}"
+            self._mask_hash_src = self.mask
+        return self._mask_hash
     
     def create_layer_noise(self, existing_seed_gen: str, seed: int, latents: Tensor, extra_seed_offset=0, extra_args:dict={}) -> Tensor:
         if self.seed_override is not None:
@@ -136,14 +183,44 @@ class NoiseLayer:
         return SeedNoiseGeneration.create_noise(seed=seed, latents=latents, existing_seed_gen=existing_seed_gen, seed_gen=self.seed_gen_override,
                                                 noise_type=self.noise_type, batch_offset=self.batch_offset, extra_args=extra_args)
 
-    def apply_layer_noise(self, new_noise: Tensor, old_noise: Tensor) -> Tensor:
-        return old_noise
+    def create_layer_noise_frames_func(self, existing_seed_gen: str, seed: int, latents: Tensor, extra_seed_offset=0, extra_args:dict={}) -> Callable[[int, int], Tensor]:
+        if self.seed_override is not None:
+            seed = self.seed_override
+         # if seed is iterable, attempt to do per-latent noises
+        if isinstance(seed, Iterable):
+            return SeedNoiseGeneration.create_noise_individual_seeds_frames_func(seeds=seed, latents=latents, seed_offset=self.seed_offset+extra_seed_offset, extra_args=extra_args)
+        seed += self.seed_offset + extra_seed_offset
+        return SeedNoiseGeneration.create_noise_frames_func(seed=seed, latents=latents, existing_seed_gen=existing_seed_gen, seed_gen=self.seed_gen_override,
+                                                            noise_type=self.noise_type, batch_offset=self.batch_offset, extra_args=extra_args)
+
+    def apply_layer_noise(self, new_noise: Tensor, old_noise: Tensor, start_idx: int=0, full_length: int=None) -> Tensor:
+        noise_mask = self.get_noise_mask(old_noise, start_idx=start_idx, full_length=full_length)
+        old_weight, new_weight = self.get_blend_weights(noise_mask)
+        return old_weight*old_noise + new_weight*new_noise
+
+    def get_blend_weights(self, noise_mask: Union[Tensor, int]) -> tuple[Union[Tensor, float], Union[Tensor, float]]:
+        '''Returns (old_weight, new_weight) such that the layer's result is old_weight*old_noise + new_weight*new_noise.'''
+        return 1, 0
+
+    def replaces_noise(self) -> bool:
+        '''Returns True if the layer's result does not depend on the noise it is applied to at all.'''
+        return False
     
-    def get_noise_mask(self, noise: Tensor) -> Tensor:
+    def get_noise_mask(self, noise: Tensor, start_idx: int=0, full_length: int=None, mask_cache: dict=None) -> Tensor:
+        '''Returns mask lined up with noise frames from start_idx; mask_cache is owned by the caller, since layers outlive runs as cached node outputs.'''
         if self.mask is None:
             return 1
-        noise_mask = self.mask.reshape((-1, 1, self.mask.shape[-2], self.mask.shape[-1]))
-        return prepare_mask_ad(noise_mask, noise.shape, noise.device)
+        # interpolate each mask frame only once; channels are broadcast instead of repeated
+        key = (tuple(noise.shape[-2:]), noise.device)
+        interpolated = mask_cache.get(key) if mask_cache is not None else None
+        if interpolated is None:
+            noise_mask = self.mask.reshape((-1, 1, self.mask.shape[-2], self.mask.shape[-1]))
+            interpolated = torch.nn.functional.interpolate(noise_mask, size=(noise.shape[-2], noise.shape[-1]), mode="bilinear").to(noise.device)
+            if mask_cache is not None:
+                mask_cache[key] = interpolated
+        # line up mask frames with noise frames, same as repeating mask to full length
+        mask_idxs = torch.arange(start_idx, start_idx+noise.shape[0], device=noise.device) % interpolated.shape[0]
+        return interpolated[mask_idxs]
 
 
 class NoiseLayerReplace(NoiseLayer):
@@ -151,9 +228,11 @@ class NoiseLayerReplace(NoiseLayer):
         super().__init__(noise_type, batch_offset, seed_gen_override, seed_offset, seed_override, mask)
         self.application = NoiseApplication.REPLACE
 
-    def apply_layer_noise(self, new_noise: Tensor, old_noise: Tensor) -> Tensor:
-        noise_mask = self.get_noise_mask(old_noise)
-        return (1-noise_mask)*old_noise + noise_mask*new_noise
+    def get_blend_weights(self, noise_mask: Union[Tensor, int]):
+        return 1-noise_mask, noise_mask
+
+    def replaces_noise(self):
+        return self.mask is None
 
 
 class NoiseLayerAdd(NoiseLayer):
@@ -163,9 +242,12 @@ class NoiseLayerAdd(NoiseLayer):
         self.noise_weight = noise_weight
         self.application = NoiseApplication.ADD
 
-    def apply_layer_noise(self, new_noise: Tensor, old_noise: Tensor) -> Tensor:
-        noise_mask = self.get_noise_mask(old_noise)
-        return (1-noise_mask)*old_noise + noise_mask*(old_noise + new_noise * self.noise_weight)
+    def get_fingerprint(self):
+        return super().get_fingerprint() + (self.noise_weight,)
+
+    def get_blend_weights(self, noise_mask: Union[Tensor, int]):
+        # (1-mask)*old + mask*(old + new*weight)
+        return 1, noise_mask*self.noise_weight
 
 
 class NoiseLayerAddWeighted(NoiseLayerAdd):
@@ -175,9 +257,12 @@ class NoiseLayerAddWeighted(NoiseLayerAdd):
         self.balance_multiplier = balance_multiplier
         self.application = NoiseApplication.ADD_WEIGHTED
 
-    def apply_layer_noise(self, new_noise: Tensor, old_noise: Tensor) -> Tensor:
-        noise_mask = self.get_noise_mask(old_noise)
-        return (1-noise_mask)*old_noise + noise_mask*(old_noise * (1.0-(self.noise_weight*self.balance_multiplier)) + new_noise * self.noise_weight)
+    def get_fingerprint(self):
+        return super().get_fingerprint() + (self.balance_multiplier,)
+
+    def get_blend_weights(self, noise_mask: Union[Tensor, int]):
+        # (1-mask)*old + mask*(old*(1-weight*balance) + new*weight)
+        return 1-noise_mask*(self.noise_weight*self.balance_multiplier), noise_mask*self.noise_weight
 
 
 class NoiseLayerGroup:
@@ -205,6 +290,158 @@ class NoiseLayerGroup:
         return cloned
 
 
+class LazyNoise:
+    '''
+    Noise for a full batch of latents that is only created for the frames requested, with noise layers applied per slice.
+    Noise that cannot be created per-frame (comfy seed_gen, derivative noise types) is created in full once and then sliced.
+
+    Layers are fused into a single pass: noise is only created for layers that contribute to the result,
+    and each layer is blended in place as old_weight*noise + new_weight*layer_noise.
+    '''
+    CHUNK_SIZE = 64
+
+    def __init__(self, get_noise_frames: Callable[[int, int], Tensor], length: int):
+        self.get_noise_frames = get_noise_frames
+        self.length = length
+        self.layers: list[tuple[NoiseLayer, Callable[[int, int], Tensor]]] = []
+        # interpolated masks per layer, only kept for as long as this LazyNoise is
+        self.mask_caches: list[dict] = []
+        # index of last layer that replaces all noise before it; earlier noise never needs to be created
+        self.first_layer_idx = -1
+
+    def add_layer(self, layer: NoiseLayer, get_layer_noise_frames: Callable[[int, int], Tensor]):
+        self.layers.append((layer, get_layer_noise_frames))
+        self.mask_caches.append({})
+        if layer.replaces_noise():
+            self.first_layer_idx = len(self.layers) - 1
+
+    def get_frames(self, start_idx: int, end_idx: int) -> Tensor:
+        if self.first_layer_idx < 0:
+            noise = self.get_noise_frames(start_idx, end_idx)
+        else:
+            noise = self.layers[self.first_layer_idx][1](start_idx, end_idx)
+        # noise may be a view of cached or passed-in noise, so copy before the first in-place op
+        is_copy = False
+        for (layer, get_layer_noise_frames), mask_cache in zip(self.layers[self.first_layer_idx+1:], self.mask_caches[self.first_layer_idx+1:]):
+            noise_mask = layer.get_noise_mask(noise, start_idx=start_idx, full_length=self.length, mask_cache=mask_cache)
+            old_weight, new_weight = layer.get_blend_weights(noise_mask)
+            skip_old = not isinstance(old_weight, Tensor) and old_weight == 1
+            skip_new = not isinstance(new_weight, Tensor) and new_weight == 0
+            if skip_old and skip_new:
+                continue
+            if not is_copy:
+                noise = noise * old_weight
+                is_copy = True
+            elif not skip_old:
+                noise.mul_(old_weight)
+            if skip_new:
+                continue
+            # only create layer noise if it is actually used
+            # layers may use a different seed_gen device than the base noise
+            noise.add_(new_weight*get_layer_noise_frames(start_idx, end_idx).to(noise.device))
+        return noise
+
+    def materialize(self, chunk_size: int=None) -> Tensor:
+        '''Assembles noise for all frames chunk by chunk, so only one chunk of layer noise and masks exists at a time.'''
+        if len(self.layers) == 0:
+            return self.get_noise_frames(0, self.length)
+        chunk_size = chunk_size if chunk_size else self.CHUNK_SIZE
+        noise = None
+        for start_idx in range(0, self.length, chunk_size):
+            end_idx = min(start_idx+chunk_size, self.length)
+            chunk = self.get_frames(start_idx, end_idx)
+            if noise is None:
+                noise = torch.empty((self.length, *chunk.shape[1:]), dtype=chunk.dtype, device=chunk.device)
+            noise[start_idx:end_idx] = chunk
+        return noise
+
+
+class InitialNoiseCache:
+    '''
+    LRU cache of prepared noise, keyed by SampleSettings.get_noise_cache_key, limited to max_bytes total.
+    Tensors are copied going in and coming out, so callers are free to modify them in place.
+    Only noise in system memory is cached; device-resident noise is not kept around between runs.
+    '''
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[tuple, Tensor] = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.RLock()
+
+    def get(self, key: tuple) -> Union[Tensor, None]:
+        with self.lock:
+            noise = self.entries.get(key, None)
+            if noise is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return noise.clone()
+
+    def put(self, key: tuple, noise: Tensor):
+        size = self._get_size(noise)
+        if noise.device.type != "cpu" or size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self._get_size(self.entries.pop(key))
+            self.entries[key] = noise.clone()
+            self.total_bytes += size
+            self._evict(self.max_bytes)
+
+    def set_max_bytes(self, max_bytes: int):
+        with self.lock:
+            self.max_bytes = max_bytes
+            self._evict(max_bytes)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def get_stats(self) -> dict[str, int]:
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self.entries), "bytes": self.total_bytes, "max_bytes": self.max_bytes}
+
+    def get_stats_string(self) -> str:
+        stats = self.get_stats()
+        return (f"hits: {stats['hits']}, misses: {stats['misses']}, evictions: {stats['evictions']}, entries: {stats['entries']}, "
+                f"{stats['bytes'] / 2**20:.1f}/{stats['max_bytes'] / 2**20:.0f} MB")
+
+    def _evict(self, max_bytes: int):
+        while self.total_bytes > max_bytes and len(self.entries) > 0:
+            _, noise = self.entries.popitem(last=False)
+            self.total_bytes -= self._get_size(noise)
+            self.evictions += 1
+
+    @staticmethod
+    def _get_size(noise: Tensor):
+        return noise.numel() * noise.element_size()
+
+
+initial_noise_cache = InitialNoiseCache(max_bytes=512 * 1024 * 1024)
+
+
+def _get_seed_key(seed: Union[int, list[int], None]):
+    if isinstance(seed, Iterable):
+        return tuple(int(x) for x in seed)
+    return seed
+
+
+def _get_context_fingerprint(extra_args: dict) -> Union[tuple, None]:
+    # derivative noise types depend on the context window settings
+    opts: ContextOptionsGroup = extra_args.get("context_options", None)
+    if opts is None:
+        return None
+    context_length = opts.context_length if not opts.view_options else opts.view_options.context_length
+    context_overlap = opts.context_overlap if not opts.view_options else opts.view_options.context_overlap
+    return (context_length, context_overlap)
+
+
 class RandDevice:
     CPU = "cpu"
     GPU = "gpu"
@@ -238,17 +475,21 @@ class SeedNoiseGeneration:
     AUTO1111 = "auto1111"
     AUTO1111GPU = "auto1111 [gpu]"
     #AUTO1111NV = "auto1111 [nv]"
+    PHILOX = "philox"
+    PHILOXGPU = "philox [gpu]"
     USE_EXISTING = "use existing"
 
-    LIST = [COMFY, COMFYGPU, AUTO1111, AUTO1111GPU]
-    LIST_WITH_OVERRIDE = [USE_EXISTING, COMFY, COMFYGPU, AUTO1111, AUTO1111GPU]
+    LIST = [COMFY, COMFYGPU, AUTO1111, AUTO1111GPU, PHILOX, PHILOXGPU]
+    LIST_WITH_OVERRIDE = [USE_EXISTING, COMFY, COMFYGPU, AUTO1111, AUTO1111GPU, PHILOX, PHILOXGPU]
 
     _COMFY_GENS = [COMFY, COMFYGPU]
     _AUTO1111_GENS = [AUTO1111, AUTO1111GPU]
+    _PHILOX_GENS = [PHILOX, PHILOXGPU]
 
     _SOURCE_DICT = {
         COMFY: RandDevice.CPU, COMFYGPU: RandDevice.GPU,
         AUTO1111: RandDevice.CPU, AUTO1111GPU: RandDevice.GPU,
+        PHILOX: RandDevice.CPU, PHILOXGPU: RandDevice.GPU,
     }
 
     @classmethod
@@ -264,8 +505,66 @@ class SeedNoiseGeneration:
             return cls.create_noise_comfy(seed, latents, noise_type, batch_offset, extra_args, cls.get_device(seed_gen))
         elif seed_gen in cls._AUTO1111_GENS:
             return cls.create_noise_auto1111(seed, latents, noise_type, batch_offset, extra_args, cls.get_device(seed_gen))
+        elif seed_gen in cls._PHILOX_GENS:
+            return cls.create_noise_philox(seed, latents, noise_type, batch_offset, extra_args, cls.get_device(seed_gen))
         raise ValueError(f"Noise seed_gen {seed_gen} is not recognized.")
 
+    @classmethod
+    def supports_frame_access(cls, seed_gen: str, noise_type: str):
+        if noise_type in [NoiseLayerType.EMPTY, NoiseLayerType.CONSTANT]:
+            return True
+        # frames of auto1111 and philox noise are independent of each other, and derivative noise only gathers frames
+        return (noise_type == NoiseLayerType.DEFAULT or noise_type in DERIVATIVE_NOISE_IDXS_FUNC_MAP) and \
+            (seed_gen in cls._AUTO1111_GENS or seed_gen in cls._PHILOX_GENS)
+
+    @classmethod
+    def create_noise_frames_func(cls, seed: int, latents: Tensor, existing_seed_gen: str=COMFY, seed_gen: str=USE_EXISTING, noise_type: str=NoiseLayerType.DEFAULT,
+                                 batch_offset: int=0, extra_args: dict={}) -> Callable[[int, int], Tensor]:
+        '''Returns function that creates the same noise as create_noise, but only for frames [start_idx, end_idx) of latents.'''
+        if seed_gen == cls.USE_EXISTING:
+            seed_gen = existing_seed_gen
+        if cls.supports_frame_access(seed_gen, noise_type) and noise_type in DERIVATIVE_NOISE_IDXS_FUNC_MAP:
+            src_idxs = None
+            def create_derivative_noise_frames(start_idx: int, end_idx: int):
+                nonlocal src_idxs
+                if src_idxs is None:
+                    src_idxs = cls._get_derivative_noise_idxs(length=latents.shape[0], noise_type=noise_type, seed=seed, extra_args=extra_args)
+                    if src_idxs is None:
+                        src_idxs = torch.arange(latents.shape[0])
+                # only create the range of default noise frames that the requested frames are gathered from
+                frame_idxs = src_idxs[start_idx:end_idx]
+                min_idx = int(frame_idxs.min())
+                max_idx = int(frame_idxs.max())
+                base_noise = cls.create_noise(seed=seed, latents=latents[min_idx:max_idx+1], seed_gen=seed_gen, noise_type=NoiseLayerType.DEFAULT,
+                                              batch_offset=batch_offset+min_idx, extra_args=extra_args)
+                return base_noise.index_select(0, (frame_idxs - min_idx).to(base_noise.device))
+            return create_derivative_noise_frames
+        if cls.supports_frame_access(seed_gen, noise_type):
+            def create_noise_frames(start_idx: int, end_idx: int):
+                # only default noise depends on the position of the frame
+                frames_offset = start_idx if noise_type == NoiseLayerType.DEFAULT else 0
+                return cls.create_noise(seed=seed, latents=latents[start_idx:end_idx], seed_gen=seed_gen, noise_type=noise_type,
+                                        batch_offset=batch_offset+frames_offset, extra_args=extra_args)
+            return create_noise_frames
+        full_noise = None
+        def slice_full_noise(start_idx: int, end_idx: int):
+            nonlocal full_noise
+            if full_noise is None:
+                full_noise = cls.create_noise(seed=seed, latents=latents, seed_gen=seed_gen, noise_type=noise_type,
+                                              batch_offset=batch_offset, extra_args=extra_args)
+            return full_noise[start_idx:end_idx]
+        return slice_full_noise
+
+    @staticmethod
+    def create_noise_individual_seeds_frames_func(seeds: list[int], latents: Tensor, seed_offset: int=0, extra_args: dict={}, device=RandDevice.CPU) -> Callable[[int, int], Tensor]:
+        length = latents.shape[0]
+        if len(seeds) < length:
+            raise ValueError(f"{len(seeds)} seeds in seed_override were provided, but at least {length} are required to work with the current latents.")
+        def create_noise_frames(start_idx: int, end_idx: int):
+            return SeedNoiseGeneration.create_noise_individual_seeds(seeds=seeds[start_idx:end_idx], latents=latents[start_idx:end_idx], seed_offset=seed_offset,
+                                                                     extra_args=extra_args, device=device)
+        return create_noise_frames
+
     @staticmethod
     def create_noise_comfy(seed: int, latents: Tensor, noise_type: str=NoiseLayerType.DEFAULT, batch_offset: int=0, extra_args: dict={}, device=RandDevice.CPU):
         common_noise = SeedNoiseGeneration._create_common_noise(seed, latents, noise_type, batch_offset, extra_args, device)
@@ -275,12 +574,12 @@ class SeedNoiseGeneration:
             generator, raw_device = get_generator(device, seed)
             length = latents.shape[0]
             single_shape = (1 + batch_offset, latents.shape[1], latents.shape[2], latents.shape[3])
-            single_noise = torch.randn(single_shape, dtype=latents.dtype, layout=latents.layout, generator=generator, device=raw_device).to(device="cpu")
+            single_noise = torch.randn(single_shape, dtype=latents.dtype, layout=latents.layout, generator=generator, device=raw_device)
             return torch.cat([single_noise[batch_offset:]] * length, dim=0)
         # comfy creates noise with a single seed for the entire shape of the latents batched tensor
         generator, raw_device = get_generator(device, seed)
         offset_shape = (latents.shape[0] + batch_offset, latents.shape[1], latents.shape[2], latents.shape[3])
-        final_noise = torch.randn(offset_shape, dtype=latents.dtype, layout=latents.layout, generator=generator, device=raw_device).to(device="cpu")
+        final_noise = torch.randn(offset_shape, dtype=latents.dtype, layout=latents.layout, generator=generator, device=raw_device)
         final_noise = final_noise[batch_offset:]
         # convert to derivative noise type, if needed
         derivative_noise = SeedNoiseGeneration._create_derivative_noise(final_noise, noise_type=noise_type, seed=seed, extra_args=extra_args, device=device)
@@ -297,7 +596,7 @@ class SeedNoiseGeneration:
             generator, raw_device = get_generator(device, seed+batch_offset)
             length = latents.shape[0]
             single_shape = (1, latents.shape[1], latents.shape[2], latents.shape[3])
-            single_noise = torch.randn(single_shape, dtype=latents.dtype, layout=latents.layout, generator=generator, device=raw_device).to(device="cpu")
+            single_noise = torch.randn(single_shape, dtype=latents.dtype, layout=latents.layout, generator=generator, device=raw_device)
             return torch.cat([single_noise] * length, dim=0)
         # auto1111 applies growing seeds for a batch
         length = latents.shape[0]
@@ -306,7 +605,7 @@ class SeedNoiseGeneration:
         # i starts at 0
         for i in range(length):
             generator, raw_device = get_generator(device, seed+i+batch_offset)
-            all_noises.append(torch.randn(single_shape, dtype=latents.dtype, layout=latents.layout, generator=generator, device=raw_device).to(device="cpu"))
+            all_noises.append(torch.randn(single_shape, dtype=latents.dtype, layout=latents.layout, generator=generator, device=raw_device))
         final_noise = torch.cat(all_noises, dim=0)
         # convert to derivative noise type, if needed
         derivative_noise = SeedNoiseGeneration._create_derivative_noise(final_noise, noise_type=noise_type, seed=seed, extra_args=extra_args, device=device)
@@ -314,6 +613,28 @@ class SeedNoiseGeneration:
             return derivative_noise
         return final_noise
     
+    @staticmethod
+    def create_noise_philox(seed: int, latents: Tensor, noise_type: str=NoiseLayerType.DEFAULT, batch_offset: int=0, extra_args: dict={}, device=RandDevice.CPU):
+        common_noise = SeedNoiseGeneration._create_common_noise(seed, latents, noise_type, batch_offset, extra_args, device)
+        if common_noise is not None:
+            return common_noise
+        length = latents.shape[0]
+        if noise_type == NoiseLayerType.CONSTANT:
+            single_noise = SeedNoiseGeneration.create_noise_philox_frames(seed, [batch_offset], latents, device)
+            return torch.cat([single_noise] * length, dim=0)
+        # philox noise of each frame only depends on seed + frame index, so batch_offset costs nothing extra
+        final_noise = SeedNoiseGeneration.create_noise_philox_frames(seed, range(batch_offset, batch_offset+length), latents, device)
+        # convert to derivative noise type, if needed
+        derivative_noise = SeedNoiseGeneration._create_derivative_noise(final_noise, noise_type=noise_type, seed=seed, extra_args=extra_args, device=device)
+        if derivative_noise is not None:
+            return derivative_noise
+        return final_noise
+
+    @staticmethod
+    def create_noise_philox_frames(seed: int, frame_idxs: Union[Tensor, list[int], range], latents: Tensor, device=RandDevice.CPU):
+        raw_device = "cpu" if device == RandDevice.CPU else comfy.model_management.get_torch_device()
+        return philox.randn_frames(seed, frame_idxs, frame_shape=tuple(latents.shape[1:]), dtype=latents.dtype, device=raw_device, out_device=raw_device)
+
     @staticmethod
     def create_noise_individual_seeds(seeds: list[int], latents: Tensor, seed_offset: int=0, extra_args: dict={}, device=RandDevice.CPU):
         length = latents.shape[0]
@@ -324,7 +645,7 @@ class SeedNoiseGeneration:
         all_noises = []
         for seed in seeds:
             generator, raw_device = get_generator(device, seed+seed_offset)
-            all_noises.append(torch.randn(single_shape, dtype=latents.dtype, layout=latents.layout, generator=generator, device=raw_device).to(device="cpu"))
+            all_noises.append(torch.randn(single_shape, dtype=latents.dtype, layout=latents.layout, generator=generator, device=raw_device))
         return torch.cat(all_noises, dim=0)
 
     @staticmethod
@@ -340,57 +661,71 @@ class SeedNoiseGeneration:
             return None
         return derivative_func(noise=noise, seed=seed, extra_args=extra_args, device=device)
 
+    @staticmethod
+    def _get_derivative_noise_idxs(length: int, noise_type: str, seed: int, extra_args: dict) -> Union[Tensor, None]:
+        idxs_func = DERIVATIVE_NOISE_IDXS_FUNC_MAP.get(noise_type, None)
+        if idxs_func is None:
+            return None
+        return idxs_func(length=length, seed=seed, extra_args=extra_args)
+
     @staticmethod
     def _convert_to_repeated_context(noise: Tensor, extra_args: dict, device=RandDevice.CPU, **kwargs):
+        idxs = SeedNoiseGeneration._get_repeated_context_idxs(length=noise.shape[0], extra_args=extra_args)
         # if no context_length, return unmodified noise
-        opts: ContextOptionsGroup = extra_args["context_options"]
-        context_length: int = opts.context_length if not opts.view_options else opts.view_options.context_length
-        if context_length is None:
+        if idxs is None:
             return noise
-        length = noise.shape[0]
-        noise = noise[:context_length]
-        cat_count = (length // context_length) + 1
-        return torch.cat([noise] * cat_count, dim=0)[:length]
+        return SeedNoiseGeneration._gather_noise(noise, idxs)
 
     @staticmethod
     def _convert_to_freenoise(noise: Tensor, seed: int, extra_args: dict, device=RandDevice.CPU, **kwargs):
+        idxs = SeedNoiseGeneration._get_freenoise_idxs(length=noise.shape[0], seed=seed, extra_args=extra_args)
         # if no context_length, return unmodified noise
+        if idxs is None:
+            return noise
+        return SeedNoiseGeneration._gather_noise(noise, idxs)
+
+    @staticmethod
+    def _gather_noise(noise: Tensor, idxs: Tensor) -> Tensor:
+        idxs = idxs.to(noise.device)
+        changed = (idxs != torch.arange(len(idxs), device=idxs.device)).nonzero()
+        if len(changed) == 0:
+            return noise
+        # if all changed frames gather from the unchanged frames before them, write them in place to avoid copying the full noise
+        first_idx = int(changed[0])
+        if int(idxs[first_idx:].max()) < first_idx:
+            torch.index_select(noise[:first_idx], 0, idxs[first_idx:], out=noise[first_idx:])
+            return noise
+        return noise.index_select(0, idxs)
+
+    @staticmethod
+    def _get_repeated_context_idxs(length: int, extra_args: dict, **kwargs) -> Union[Tensor, None]:
+        opts: ContextOptionsGroup = extra_args["context_options"]
+        context_length: int = opts.context_length if not opts.view_options else opts.view_options.context_length
+        if context_length is None:
+            return None
+        # every frame reuses the noise of the same position within the first context window
+        return torch.arange(length) % context_length
+
+    @staticmethod
+    def _get_freenoise_idxs(length: int, seed: int, extra_args: dict, **kwargs) -> Union[Tensor, None]:
         opts: ContextOptionsGroup = extra_args["context_options"]
         context_length: int = opts.context_length if not opts.view_options else opts.view_options.context_length
         context_overlap: int = opts.context_overlap if not opts.view_options else opts.view_options.context_overlap
-        video_length: int = noise.shape[0]
         if context_length is None:
-            return noise
+            return None
         delta = context_length - context_overlap
         generator, _ = get_generator(RandDevice.CPU, seed) # no point in ever using non-CPU to just shuffle indexes
 
-        for start_idx in range(0, video_length-context_length, delta):
-            # start_idx corresponds to the beginning of a context window
-            # goal: place shuffled in the delta region right after the end of the context window
-            #       if space after context window is not enough to place the noise, adjust and finish
-            place_idx = start_idx + context_length
-            # if place_idx is outside the valid indexes, we are already finished
-            if place_idx >= video_length:
-                break
-            end_idx = place_idx - 1
-            # if there is not enough room to copy delta amount of indexes, copy limited amount and finish
-            if end_idx + delta >= video_length:
-                final_delta = video_length - place_idx
-                # generate list of indexes in final delta region
-                list_idx = torch.Tensor(list(range(start_idx,start_idx+final_delta))).to(torch.long)
-                # shuffle list
-                list_idx = list_idx[torch.randperm(final_delta, generator=generator)]
-                # apply shuffled indexes
-                noise[place_idx:place_idx+final_delta] = noise[list_idx]
-                break
-            # otherwise, do normal behavior
-            # generate list of indexes in delta region
-            list_idx = torch.Tensor(list(range(start_idx,start_idx+delta))).to(torch.long)
-            # shuffle list
-            list_idx = list_idx[torch.randperm(delta, generator=generator)]
-            # apply shuffled indexes
-            noise[place_idx:place_idx+delta] = noise[list_idx]
-        return noise
+        # shuffle indexes instead of noise, so that the noise itself only needs to be gathered once;
+        # randperm must still be called once per window, in order, to keep results the same for a given seed
+        idxs = torch.arange(length)
+        for place_idx in range(context_length, length, delta):
+            # place_idx is right after the end of the context window starting at start_idx;
+            # place shuffled delta region of the window there, limited to what is left of the video
+            start_idx = place_idx - context_length
+            count = min(delta, length - place_idx)
+            idxs[place_idx:place_idx+count] = idxs[start_idx + torch.randperm(count, generator=generator)]
+        return idxs
 
 
 DERIVATIVE_NOISE_FUNC_MAP = {
@@ -398,17 +733,24 @@ DERIVATIVE_NOISE_FUNC_MAP = {
     NoiseLayerType.FREENOISE: SeedNoiseGeneration._convert_to_freenoise,
     }
 
+DERIVATIVE_NOISE_IDXS_FUNC_MAP = {
+    NoiseLayerType.REPEATED_CONTEXT: SeedNoiseGeneration._get_repeated_context_idxs,
+    NoiseLayerType.FREENOISE: SeedNoiseGeneration._get_freenoise_idxs,
+    }
+
 
 class IterationOptions:
     SAMPLER = "sampler"
 
     def __init__(self, iterations: int=1, cache_init_noise=False, cache_init_latents=False,
-                 iter_batch_offset: int=0, iter_seed_offset: int=0):
+                 iter_batch_offset: int=0, iter_seed_offset: int=0, early_step_fraction: float=1.0):
         self.iterations = iterations
         self.cache_init_noise = cache_init_noise
         self.cache_init_latents = cache_init_latents
         self.iter_batch_offset = iter_batch_offset
         self.iter_seed_offset = iter_seed_offset
+        # fraction of sampling steps used by all iterations but the last one
+        self.early_step_fraction = early_step_fraction
         self.need_sampler = False
 
     def get_sigma(self, model: ModelPatcher, step: int):
@@ -420,6 +762,19 @@ class IterationOptions:
     def initialize(self, latents: Tensor):
         pass
 
+    def get_iter_sigmas(self, curr_i: int, sigmas: Tensor) -> Tensor:
+        '''
+        Returns sigmas to sample with on iteration curr_i. Early iterations only need to settle the overall layout,
+        so they can use an evenly spaced subset of the schedule; the last iteration always uses the full schedule.
+        '''
+        total_steps = len(sigmas) - 1
+        if curr_i >= self.iterations - 1 or self.early_step_fraction >= 1.0 or total_steps < 2:
+            return sigmas
+        steps = max(1, round(total_steps * self.early_step_fraction))
+        # first and last sigmas are always kept, so each iteration still denoises across the full range
+        idxs = torch.linspace(0, total_steps, steps+1).round().long()
+        return sigmas[idxs.to(sigmas.device)]
+
     def preprocess_latents(self, curr_i: int, model: ModelPatcher, latents: Tensor, noise: Tensor,
                            seed: int, sample_settings: SampleSettings, noise_extra_args: dict, **kwargs):
         if curr_i == 0 or (self.iter_batch_offset == 0 and self.iter_seed_offset == 0):
@@ -440,9 +795,11 @@ class FreeInitOptions(IterationOptions):
 
     def __init__(self, iterations: int, step: int=999, apply_to_1st_iter: bool=False,
                  filter=freeinit.FreeInitFilter.GAUSSIAN, d_s=0.25, d_t=0.25, n=4, init_type=FREEINIT_SAMPLER,
-                 iter_batch_offset: int=0, iter_seed_offset: int=1):
+                 iter_batch_offset: int=0, iter_seed_offset: int=1, early_step_fraction: float=1.0,
+                 mix_chunk_frames: int=freeinit.FREQ_MIX_CHUNK_FRAMES, mix_workers: int=1, mix_device=None):
         super().__init__(iterations=iterations, cache_init_noise=True, cache_init_latents=True,
-                         iter_batch_offset=iter_batch_offset, iter_seed_offset=iter_seed_offset)
+                         iter_batch_offset=iter_batch_offset, iter_seed_offset=iter_seed_offset,
+                         early_step_fraction=early_step_fraction)
         self.apply_to_1st_iter = apply_to_1st_iter
         self.step = step
         self.filter = filter
@@ -453,10 +810,23 @@ class FreeInitOptions(IterationOptions):
         self.freq_filter2 = None
         self.need_sampler = True if init_type in [self.FREEINIT_SAMPLER] else False
         self.init_type = init_type
+        # long latents are frequency-mixed in chunks, optionally with several workers and/or on another device
+        self.mix_chunk_frames = mix_chunk_frames
+        self.mix_workers = mix_workers
+        self.mix_device = mix_device
+
+    def get_mix_device(self):
+        if self.mix_device in [None, freeinit.FreeInitMixDevice.LATENTS]:
+            return None
+        if self.mix_device == freeinit.FreeInitMixDevice.CPU:
+            return torch.device("cpu")
+        if self.mix_device == freeinit.FreeInitMixDevice.GPU:
+            return comfy.model_management.get_torch_device()
+        return self.mix_device
 
     def initialize(self, latents: Tensor):
-        self.freq_filter = freeinit.get_freq_filter(latents.shape, device=latents.device, filter_type=self.filter,
-                                           n=self.n, d_s=self.d_s, d_t=self.d_t)
+        self.freq_filter = freeinit.get_rfft_freq_filter(latents.shape, device=latents.device, filter_type=self.filter,
+                                                         n=self.n, d_s=self.d_s, d_t=self.d_t)
     
     def preprocess_latents(self, curr_i: int, model: ModelPatcher, latents: Tensor, noise: Tensor, cached_latents: Tensor, cached_noise: Tensor,
                            seed:int, sample_settings: SampleSettings, noise_extra_args: dict, sampler: comfy.samplers.KSampler=None, **kwargs):
@@ -484,7 +854,8 @@ class FreeInitOptions(IterationOptions):
             z_rand = temp_sample_settings.prepare_noise(seed=seed, latents=latents, noise=None,
                                                     extra_args=noise_extra_args, force_create_noise=True)
             # 3. noise reinitialization - combines low freq. noise from noised_latents and high freq. noise from z_rand
-            noised_latents = freeinit.freq_mix_3d(x=noised_latents, noise=z_rand, LPF=self.freq_filter)
+            noised_latents = freeinit.freq_mix_3d(x=noised_latents, noise=z_rand, LPF=self.freq_filter,
+                                                  chunk_frames=self.mix_chunk_frames, workers=self.mix_workers, device=self.get_mix_device())
             return cached_latents, noised_latents
         elif self.init_type == self.DINKINIT_V1:
             # NOTE: This was my first attempt at implementing FreeInit; it sorta works due to my alpha_cumprod shenanigans,
@@ -501,7 +872,8 @@ class FreeInitOptions(IterationOptions):
                                                     extra_args=noise_extra_args, force_create_noise=True)
             ####z_rand = torch.randn_like(latents, dtype=latents.dtype, device=latents.device)
             # 3. noise reinitialization - combines low freq. noise from noised_latents and high freq. noise from z_rand
-            noised_latents = freeinit.freq_mix_3d(x=noised_latents, noise=z_rand, LPF=self.freq_filter)
+            noised_latents = freeinit.freq_mix_3d(x=noised_latents, noise=z_rand, LPF=self.freq_filter,
+                                                  chunk_frames=self.mix_chunk_frames, workers=self.mix_workers, device=self.get_mix_device())
             return cached_latents, noised_latents
         else:
             raise ValueError(f"FreeInit init_type '{self.init_type}' is not recognized.")
@@ -542,7 +914,8 @@ class NoiseCalibration:
             args[-1] = x
             e_t_theta = sample_func(model, zero_noise, *args, **kwargs) * (model.model.latent_format.scale_factor)
             x_0_t = (x - sqrt_one_minus_alpha_prod * e_t_theta) / sqrt_alpha_prod
-            freq_delta = (self.get_low_or_high_fft(x_0_t, self.scale, is_low=False) - self.get_low_or_high_fft(new_latents, self.scale, is_low=False))
+            # filtering is linear, so filtering the difference equals the difference of the filtered latents
+            freq_delta = self.get_low_or_high_fft(x_0_t - new_latents, self.scale, is_low=False)
             noise = e_t_theta + sqrt_alpha_prod / sqrt_one_minus_alpha_prod * freq_delta
         #return latents, noise
         #x = latents * sqrt_alpha_prod + noise * sqrt_one_minus_alpha_prod
@@ -555,30 +928,42 @@ class NoiseCalibration:
     @staticmethod
     # From NoiseCalibration code at https://github.com/yangqy1110/NC-SDEdit/
     def get_low_or_high_fft(x: Tensor, scale: float, is_low=True):
-        # reshape to match intended dims; starts in b c h w, turn into c b h w
-        x = rearrange(x, "b c h w -> c b h w")
-        # FFT
-        x_freq = fft.fftn(x, dim=(-2, -1))
-        x_freq = fft.fftshift(x_freq, dim=(-2, -1))
-        C, T, H, W = x_freq.shape
-        
-        # extract
-        if is_low:
-            mask = torch.zeros((C, T, H, W), device=x.device)
-            crow, ccol = H // 2, W // 2
-            mask[..., crow - int(crow * scale):crow + int(crow * scale), ccol - int(ccol * scale):ccol + int(ccol * scale)] = 1
-        else:
-            mask = torch.ones((C, T, H, W), device=x.device)
-            crow, ccol = H // 2, W //2
-            mask[..., crow - int(crow * scale):crow + int(crow * scale), ccol - int(ccol * scale):ccol + int(ccol * scale)] = 0
-        x_freq = x_freq * mask
-        
+        # FFT is only over h and w, so b c h w can be filtered as-is
+        H, W = x.shape[-2:]
+        x_freq = fft.rfft2(x, dim=(-2, -1))
+        x_freq = x_freq * get_calibration_mask(H=H, W=W, scale=scale, is_low=is_low, device=x.device)
         # IFFT
-        x_freq = fft.ifftshift(x_freq, dim=(-2, -1))
-        x_filtered = fft.ifftn(x_freq, dim=(-2, -1)).real
-        # rearrange back to ComfyUI expected dims
-        x_filtered = rearrange(x_filtered, "c b h w -> b c h w")
-        return x_filtered
+        return fft.irfft2(x_freq, s=(H, W), dim=(-2, -1))
+
+
+# recently used NoiseCalibration masks, keyed by (H, W, scale, is_low, device)
+_calibration_mask_cache: OrderedDict[tuple, Tensor] = OrderedDict()
+CALIBRATION_MASK_CACHE_SIZE = 8
+
+
+def get_calibration_mask(H: int, W: int, scale: float, is_low: bool, device) -> Tensor:
+    '''
+    Returns the (H, W//2+1) rfft2 mask for NoiseCalibration's low/high pass; results are cached.
+
+    The box is drawn in fftshift-ed order like the original code, then moved to natural frequency order and made symmetric
+    across positive and negative frequencies (which is what taking the real part of the complex IFFT does).
+    '''
+    key = (H, W, scale, is_low, str(device))
+    if key in _calibration_mask_cache:
+        _calibration_mask_cache.move_to_end(key)
+        return _calibration_mask_cache[key]
+    mask = torch.zeros((H, W)) if is_low else torch.ones((H, W))
+    crow, ccol = H // 2, W // 2
+    mask[crow - int(crow * scale):crow + int(crow * scale), ccol - int(ccol * scale):ccol + int(ccol * scale)] = 1 if is_low else 0
+    dims = (-2, -1)
+    mask = fft.ifftshift(mask, dim=dims)
+    # value at negated frequency index (-k mod N) for each of the dims
+    mask_negated = torch.roll(torch.flip(mask, dims=dims), shifts=(1, 1), dims=dims)
+    mask = ((mask + mask_negated) / 2)[..., :W//2 + 1].contiguous().to(device)
+    _calibration_mask_cache[key] = mask
+    while len(_calibration_mask_cache) > CALIBRATION_MASK_CACHE_SIZE:
+        _calibration_mask_cache.popitem(last=False)
+    return mask
 
 
 class CFGExtras:
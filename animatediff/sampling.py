@@ -1,6 +1,7 @@
 from typing import Callable
 
 import math
+import time
 import torch
 from torch import Tensor
 from torch.nn.functional import group_norm
@@ -24,6 +25,7 @@ from .context_extras import ContextRefMode
 from .sample_settings import SampleSettings, NoisedImageToInject
 from .utils_model import MachineState, vae_encode_raw_batched, vae_decode_raw_batched
 from .utils_motion import composite_extend, prepare_mask_batch, extend_to_batch_size
+from .utils_scheduling import LazyCond
 from .model_injection import InjectionParams, ModelPatcherHelper, MotionModelGroup, get_mm_attachment
 from .motion_module_ad import AnimateDiffFormat, AnimateDiffInfo, AnimateDiffVersion
 from .logger import logger
@@ -434,8 +436,10 @@ def outer_sample_wrapper(executor: WrapperExecutor, *args, **kwargs):
         # prepare iter opts preprocess kwargs, if needed
         iter_kwargs = {}
         # NOTE: original KSampler stuff is not doable here, so skipping...
+        full_sigmas = args[3]
 
         for curr_i in range(iter_opts.iterations):
+            iter_start_time = time.perf_counter()
             # handle GLOBALSTATE vars and step tally
             # NOTE: only KSampler/KSampler (Advanced) would have steps;
             # explore modifying ComfyUI to provide this when possible?
@@ -443,8 +447,10 @@ def outer_sample_wrapper(executor: WrapperExecutor, *args, **kwargs):
             ADGS.start_step = kwargs.get("start_step") or 0
             ADGS.current_step = ADGS.start_step
             ADGS.last_step = kwargs.get("last_step") or 0
+            # early iterations may use a coarser sigma schedule
+            args[3] = iter_opts.get_iter_sigmas(curr_i, full_sigmas)
             if iter_opts.iterations > 1:
-                logger.info(f"Iteration {curr_i+1}/{iter_opts.iterations}")
+                logger.info(f"Iteration {curr_i+1}/{iter_opts.iterations} ({len(args[3])-1}/{len(full_sigmas)-1} steps)")
             # perform any iter_opts preprocessing on latents
             latents, noise = iter_opts.preprocess_latents(curr_i=curr_i, model=helper.model, latents=latents, noise=noise,
                                                           cached_latents=cached_latents, cached_noise=cached_noise,
@@ -485,6 +491,8 @@ def outer_sample_wrapper(executor: WrapperExecutor, *args, **kwargs):
                     if i < len(injection_list):
                         to_inject = injection_list[i]
                         latents = perform_image_injection(ADGS, helper.model.model, latents, to_inject)
+            if iter_opts.iterations > 1:
+                logger.info(f"Iteration {curr_i+1}/{iter_opts.iterations} took {time.perf_counter() - iter_start_time:.2f}s")
         return latents
     finally:
         guider.model_options = orig_model_options
@@ -617,7 +625,7 @@ def sliding_calc_cond_batch(executor: Callable, model, conds: list[list[dict]],
             for key in actual_cond:
                 try:
                     cond_item = actual_cond[key]
-                    if isinstance(cond_item, Tensor):
+                    if isinstance(cond_item, (Tensor, LazyCond)):
                         # check that tensor is the expected length - x.size(0)
                         if cond_item.size(0) == x_in.size(0):
                             # if so, it's subsetting time - tell controls the expected indeces so they can handle them
@@ -635,11 +643,11 @@ def sliding_calc_cond_batch(executor: Callable, model, conds: list[list[dict]],
                         new_cond_item = cond_item.copy()
                         # when in dictionary, look for tensors and CONDCrossAttn [comfy/conds.py] (has cond attr that is a tensor)
                         for cond_key, cond_value in new_cond_item.items():
-                            if isinstance(cond_value, Tensor):
+                            if isinstance(cond_value, (Tensor, LazyCond)):
                                 if cond_value.size(0) == x_in.size(0):
                                     new_cond_item[cond_key] = cond_value[full_idxs]
                             # if has cond that is a Tensor, check if needs to be subset
-                            elif hasattr(cond_value, "cond") and isinstance(cond_value.cond, Tensor):
+                            elif hasattr(cond_value, "cond") and isinstance(cond_value.cond, (Tensor, LazyCond)):
                                 if cond_value.cond.size(0) == x_in.size(0):
                                     new_cond_item[cond_key] = cond_value._copy_with(cond_value.cond[full_idxs])
                             elif cond_key == "num_video_frames": # for SVD
@@ -1,6 +1,10 @@
 import re
 import math
-from typing import Union
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Union
+import numpy as np
 import torch
 from torch import Tensor
 import torch.nn.functional as F
@@ -12,7 +16,9 @@ import comfy.model_management
 
 from .utils_model import InterpolationMethod
 from .utils_motion import extend_list_to_batch_size
-from .utils_scheduling import SelectError, TensorInterp, convert_str_to_indexes, lerp_tensors, slerp_tensors
+from .encoding_cache import TextEncodingCache, get_clip_fingerprint, get_encoding_cache_key
+from .utils_scheduling import (SelectError, TensorInterp, LazyCond, convert_str_to_indexes, get_chained_interp_coeffs,
+                               get_interp_coeffs)
 from .logger import logger
 
 ###############################################
@@ -72,6 +78,11 @@ class SFormat:
     JSON = "json"
     PYTH = "pythonic"
 
+class SKind:
+    PROMPT = "prompt"
+    VALUE = "value"
+
+
 @dataclass
 class RegexErrorReport:
     start: int
@@ -91,11 +102,28 @@ class CondHolder:
     idx: int
     prompt: str
     raw_prompt: str
-    cond: Tensor
-    pooled: Tensor
+    cond: Tensor = None
+    pooled: Tensor = None
     hold: bool = False
     interp_weight: float = None
     interp_prompt: str = None
+    interp_from: 'CondHolder' = None
+
+@dataclass
+class PromptSchedulePlan:
+    '''Parts of prompt schedule evaluation that do not depend on encodings; reused for every scheduled hook keyframe.'''
+    # holder used by each frame
+    real_holders: list[CondHolder]
+    # all holders, in creation order
+    holders: list[CondHolder]
+    # holders in creation order, grouped into segments of frames interpolated toward the same prompt; others are alone
+    holder_groups: list[list[CondHolder]]
+    # (first frame, frame count, group idx, idx in group) for consecutive frames that use consecutive holders of a group
+    frame_runs: list[tuple[int, int, int, int]]
+    # unique prompts to encode
+    prompts: list[str]
+    # prompts that decide padded cond size
+    size_prompts: list[str]
 
 @dataclass
 class ParseErrorReport:
@@ -111,9 +139,366 @@ class PromptOptions:
     values_replace: dict[str, list[float]] = None
     print_schedule: bool = False
     add_dict: dict[str] = None
+    encoding_cache: TextEncodingCache = None
+    lazy_cond: bool = False
+    encoding_memo: 'EncodingMemo' = None
+    encode_batch_size: int = 8
+
+
+# marks that clip has not been fingerprinted yet, since None is a valid state
+_NO_STATE = object()
+
+
+class EncodingMemo:
+    '''
+    Remembers CLIP encodings, so each unique prompt is only encoded once per CLIP state (scheduled hook keyframe).
+    If kept between schedule evaluations (like by a Prompt Scheduling node), encodings of prompts that did not change
+    are reused as long as the CLIP is the same, so editing a schedule only encodes new or edited prompts.
+    If disk_cache is provided, encodings are also shared across runs.
+    '''
+    def __init__(self, clip: CLIP=None, disk_cache: TextEncodingCache=None):
+        self.clip = clip
+        self.disk_cache = disk_cache
+        self.source_ref: weakref.ref = None
+        self.source_patches_uuid = None
+        self.state = None
+        self.clip_fingerprint: Union[str, None] = None
+        self.clip_fingerprint_state = _NO_STATE
+        self.entries: dict[tuple, tuple[Tensor, Tensor]] = {}
+        self.tokens_entries: dict[tuple, tuple[Tensor, Tensor]] = {}
+        self.padded_entries: dict[tuple, Tensor] = {}
+        # tokenizing does not depend on hooks, so prompts are only tokenized once for all states
+        self.prompt_tokens: dict[str, tuple[dict, Union[tuple, None]]] = {}
+        self.used_keys: set[tuple] = set()
+        self.encode_count = 0
+        self.saved_count = 0
+        self.disk_count = 0
+        self.reused_count = 0
+
+    def prepare(self, source_clip: CLIP, clip: CLIP, disk_cache: TextEncodingCache=None):
+        '''
+        Prepares memo for a new schedule evaluation; clip is used for encoding, and may be a clone of source_clip.
+        Encodings from previous evaluation are kept only if source_clip is the same, unmodified CLIP.
+        '''
+        source_patches_uuid = getattr(source_clip.patcher, "patches_uuid", None)
+        if self.source_ref is None or self.source_ref() is not source_clip or self.source_patches_uuid != source_patches_uuid:
+            self.entries.clear()
+            self.tokens_entries.clear()
+            self.padded_entries.clear()
+            self.prompt_tokens.clear()
+        self.source_ref = weakref.ref(source_clip)
+        self.source_patches_uuid = source_patches_uuid
+        self.clip = clip
+        self.disk_cache = disk_cache
+        self.state = None
+        self.clip_fingerprint = None
+        self.clip_fingerprint_state = _NO_STATE
+        self.used_keys.clear()
+        self.encode_count = 0
+        self.saved_count = 0
+        self.disk_count = 0
+        self.reused_count = 0
+
+    def prune(self):
+        '''Removes encodings not used by latest evaluation, so only the current schedule's encodings are kept.'''
+        self.entries = {k: v for k, v in self.entries.items() if k in self.used_keys}
+        # keep tokens of kept encodings, so edited prompts that tokenize the same can still reuse them
+        kept_ids = set(id(v) for v in self.entries.values())
+        self.tokens_entries = {k: v for k, v in self.tokens_entries.items() if k in self.used_keys or id(v) in kept_ids}
+        used_prompts = set(key[1] for key in self.used_keys if len(key) == 2 and isinstance(key[1], str))
+        self.prompt_tokens = {k: v for k, v in self.prompt_tokens.items() if k in used_prompts}
+        self.padded_entries = {k: v for k, v in self.padded_entries.items() if k in self.used_keys}
+
+    def release(self):
+        '''Drops references to clip and disk_cache once evaluation is done, so the memo does not keep an unused CLIP alive.'''
+        self.clip = None
+        self.disk_cache = None
+
+    def set_state(self, state):
+        '''Sets current hook state of clip; encodings from other states are not reused.'''
+        self.state = state
+
+    def get_key(self, prompt: Union[str, tuple]):
+        return (self.state, prompt)
+
+    def tokenize(self, prompt: str) -> tuple[dict, Union[tuple, None]]:
+        '''Returns tokens of prompt and hashable version of them (None if not hashable).'''
+        tokenized = self.prompt_tokens.get(prompt, None)
+        if tokenized is None:
+            tokens = self.clip.tokenize(prompt)
+            tokenized = (tokens, get_tokens_key(tokens))
+            self.prompt_tokens[prompt] = tokenized
+        return tokenized
+
+    def encode(self, prompt: str) -> tuple[Tensor, Tensor]:
+        encoded = self.lookup(prompt)
+        if encoded is None:
+            tokens, tokens_key = self.tokenize(prompt)
+            if tokens_key is not None:
+                tokens_key = self.get_key(tokens_key)
+            encoded = self.clip.encode_from_tokens(tokens, return_pooled=True)
+            self.encode_count += 1
+            self.store(prompt, tokens_key, encoded, save_to_disk=True)
+        return encoded
+
+    def encode_all(self, prompts: list[str], batch_size: int=1, pbar: ProgressBar=None):
+        '''
+        Encodes all prompts; prompts that are not memoized or on disk go through the text encoder batch_size at a time,
+        with their token chunks encoded as batches (see batched_clip_encoding).
+        '''
+        # prompts that need encoding, keyed by tokens, so prompts that tokenize the same are encoded once
+        pending: dict[Union[tuple, int], list[tuple[str, dict, Union[tuple, None]]]] = {}
+        for prompt in prompts:
+            if self.lookup(prompt) is not None:
+                if pbar is not None:
+                    pbar.update(1)
+                continue
+            tokens, tokens_key = self.tokenize(prompt)
+            if tokens_key is not None:
+                tokens_key = self.get_key(tokens_key)
+            pending.setdefault(tokens_key if tokens_key is not None else len(pending), []).append((prompt, tokens, tokens_key))
+        groups = list(pending.values())
+        for start_idx in range(0, len(groups), max(1, batch_size)):
+            batch = groups[start_idx:start_idx+max(1, batch_size)]
+            tokens_list = [group[0][1] for group in batch]
+            if batch_size > 1 and len(batch) > 1:
+                with batched_clip_encoding(self.clip, tokens_list, batch_size):
+                    encoded_list = [self.clip.encode_from_tokens(tokens, return_pooled=True) for tokens in tokens_list]
+            else:
+                encoded_list = [self.clip.encode_from_tokens(tokens, return_pooled=True) for tokens in tokens_list]
+            for group, encoded in zip(batch, encoded_list):
+                self.encode_count += 1
+                for i, (prompt, _, tokens_key) in enumerate(group):
+                    if i > 0:
+                        self.saved_count += 1
+                    self.store(prompt, tokens_key, encoded, save_to_disk=i == 0)
+                if pbar is not None:
+                    pbar.update(len(group))
+            comfy.model_management.throw_exception_if_processing_interrupted()
+
+    def lookup(self, prompt: str) -> Union[tuple[Tensor, Tensor], None]:
+        '''Returns encoding of prompt if memoized or on disk (no encoding is done), otherwise None.'''
+        key = self.get_key(prompt)
+        encoded = self.entries.get(key, None)
+        if encoded is not None:
+            # each prompt is encoded once per evaluation, so this is from a previous evaluation
+            if key not in self.used_keys:
+                self.reused_count += 1
+                self.used_keys.add(key)
+            return encoded
+        # different prompts can still tokenize the same (e.g. whitespace)
+        tokens, tokens_key = self.tokenize(prompt)
+        if tokens_key is not None:
+            tokens_key = self.get_key(tokens_key)
+            self.used_keys.add(tokens_key)
+            encoded = self.tokens_entries.get(tokens_key, None)
+        if encoded is not None:
+            self.saved_count += 1
+        else:
+            encoded = self.load_from_disk(tokens_key)
+            if encoded is None:
+                return None
+            self.disk_count += 1
+        self.store(prompt, tokens_key, encoded)
+        return encoded
+
+    def store(self, prompt: str, tokens_key: Union[tuple, None], encoded: tuple[Tensor, Tensor], save_to_disk=False):
+        if save_to_disk:
+            self.save_to_disk(tokens_key, encoded)
+        if tokens_key is not None:
+            self.used_keys.add(tokens_key)
+            self.tokens_entries[tokens_key] = encoded
+        key = self.get_key(prompt)
+        self.entries[key] = encoded
+        self.used_keys.add(key)
+
+    def get_disk_key(self, tokens_key: Union[tuple, None]) -> Union[str, None]:
+        if self.disk_cache is None or tokens_key is None:
+            return None
+        # clip weights/hooks may differ per state, so fingerprint once per state
+        if self.clip_fingerprint_state != self.state:
+            self.clip_fingerprint = get_clip_fingerprint(self.clip)
+            self.clip_fingerprint_state = self.state
+        if self.clip_fingerprint is None:
+            return None
+        # tokens_key is (state, tokens); state is already part of fingerprint
+        return get_encoding_cache_key(self.clip_fingerprint, tokens_key[1])
+
+    def load_from_disk(self, tokens_key: Union[tuple, None]) -> Union[tuple[Tensor, Tensor], None]:
+        disk_key = self.get_disk_key(tokens_key)
+        if disk_key is None:
+            return None
+        return self.disk_cache.load(disk_key)
+
+    def save_to_disk(self, tokens_key: Union[tuple, None], encoded: tuple[Tensor, Tensor]):
+        disk_key = self.get_disk_key(tokens_key)
+        if disk_key is None:
+            return
+        self.disk_cache.save(disk_key, encoded[0], encoded[1])
+
+    def get_encoded(self, prompt: str) -> tuple[Tensor, Tensor]:
+        '''Same as encode, but lookups of already encoded prompts are not counted as saved encodes.'''
+        encoded = self.entries.get(self.get_key(prompt), None)
+        if encoded is not None:
+            return encoded
+        return self.encode(prompt)
+
+    def encode_padded(self, prompt: str, target_length: int) -> tuple[Tensor, Tensor]:
+        cond, pooled = self.get_encoded(prompt)
+        padded_key = (self.get_key(prompt), target_length)
+        padded_cond = self.padded_entries.get(padded_key, None)
+        if padded_cond is None:
+            padded_cond = pad_cond(cond, target_length=target_length)
+            self.padded_entries[padded_key] = padded_cond
+        self.used_keys.add(padded_key)
+        return padded_cond, pooled
+
+
+class BatchedRowEncoder:
+    '''
+    Stands in for encode of one of a CLIP's text encoders (e.g. clip_l) while a batch of prompts is encoded.
+    On first call, the rows (token chunks) of all prompts in the batch are encoded together, batch_size rows at a time,
+    on the text encoder's device; each call then returns the requested rows out of those results. Since only the encoder's
+    forward is replaced, token weights, combining of text encoders, and pooled outputs work the same as for single prompts.
+    '''
+    def __init__(self, orig_encode: Callable, rows: list[tuple[int]], batch_size: int):
+        self.orig_encode = orig_encode
+        self.rows = rows
+        self.batch_size = batch_size
+        self.encoded: dict[tuple[int], tuple[Tensor, Union[Tensor, None]]] = {}
+        self.disabled = False
+
+    def __call__(self, tokens: list[list[int]]):
+        keys = [get_row_key(row) for row in tokens]
+        if self.disabled or None in keys:
+            return self.orig_encode(tokens)
+        if any(key not in self.encoded for key in keys):
+            self.encode_rows(self.rows + keys)
+            self.rows = []
+            if self.disabled:
+                return self.orig_encode(tokens)
+        out = torch.cat([self.encoded[key][0] for key in keys], dim=0)
+        pooled = [self.encoded[key][1] for key in keys]
+        pooled = torch.cat(pooled, dim=0) if pooled[0] is not None else None
+        return out, pooled
+
+    def encode_rows(self, keys: list[tuple[int]]):
+        # rows can only be stacked with rows of the same length
+        rows_by_length: dict[int, list[tuple[int]]] = {}
+        for key in dict.fromkeys(keys):
+            if key not in self.encoded:
+                rows_by_length.setdefault(len(key), []).append(key)
+        for rows in rows_by_length.values():
+            for start_idx in range(0, len(rows), self.batch_size):
+                batch = rows[start_idx:start_idx+self.batch_size]
+                o = self.orig_encode([list(row) for row in batch])
+                # extra outputs (like attention masks) are not split per row, so leave those to the regular path
+                if len(o) != 2:
+                    self.disabled = True
+                    return
+                out, pooled = o
+                for i, key in enumerate(batch):
+                    self.encoded[key] = (out[i:i+1], pooled[i:i+1] if pooled is not None else None)
+
+
+def get_row_key(row: list) -> Union[tuple[int], None]:
+    if not all(isinstance(token, int) for token in row):
+        return None
+    return tuple(row)
+
+
+def get_planned_rows(encoder, chunks: list[list[tuple]]) -> list[tuple[int]]:
+    '''Returns rows encode_token_weights is expected to request for a prompt's chunks; mismatches are just encoded on demand.'''
+    rows = [get_row_key([token[0] for token in chunk]) for chunk in chunks]
+    rows = [row for row in rows if row is not None]
+    has_weights = any(token[1] != 1.0 for chunk in chunks for token in chunk)
+    special_tokens = getattr(encoder, "special_tokens", None)
+    if (has_weights or len(chunks) == 0) and special_tokens is not None:
+        # weighted tokens are applied relative to an encoded empty prompt
+        import comfy.sd1_clip
+        gen_empty_tokens = getattr(encoder, "gen_empty_tokens", comfy.sd1_clip.gen_empty_tokens)
+        max_length = max([len(chunk) for chunk in chunks], default=0)
+        empty_row = get_row_key(list(gen_empty_tokens(special_tokens, max_length)))
+        if empty_row is not None:
+            rows.append(empty_row)
+    return rows
+
+
+@contextmanager
+def batched_clip_encoding(clip: CLIP, tokens_list: list[dict], batch_size: int):
+    '''
+    While active, encode_from_tokens of clip encodes the token chunks of all prompts in tokens_list in batches of
+    batch_size rows. Text encoders are found as clip_{name} for each tokens key (e.g. clip_l, clip_g); text encoders
+    that are not found (like t5xxl) are left as-is.
+    '''
+    cond_stage_model = getattr(clip, "cond_stage_model", None)
+    patched: list[tuple[torch.nn.Module, Union[Callable, None]]] = []
+    try:
+        names = dict.fromkeys(name for tokens in tokens_list for name in tokens.keys()) if cond_stage_model is not None else {}
+        for name in names:
+            encoder = getattr(cond_stage_model, f"clip_{name}", None)
+            if encoder is None or not callable(getattr(encoder, "encode", None)):
+                continue
+            rows = [row for tokens in tokens_list for row in get_planned_rows(encoder, tokens.get(name, []))]
+            patched.append((encoder, vars(encoder).get("encode", None)))
+            encoder.encode = BatchedRowEncoder(encoder.encode, rows=rows, batch_size=batch_size)
+        yield
+    finally:
+        for encoder, instance_encode in reversed(patched):
+            if instance_encode is not None:
+                encoder.encode = instance_encode
+            else:
+                del encoder.encode
+
+
+def get_tokens_key(tokens: dict) -> Union[tuple, None]:
+    '''Returns hashable version of tokenized prompt, or None if tokens contain anything but plain numbers (e.g. embeddings).'''
+    if not isinstance(tokens, dict):
+        return None
+    key = []
+    try:
+        for name, chunks in tokens.items():
+            chunks_key = tuple(tuple(tuple(token) for token in chunk) for chunk in chunks)
+            for chunk in chunks_key:
+                for token in chunk:
+                    if not all(isinstance(x, (int, float)) for x in token):
+                        return None
+            key.append((name, chunks_key))
+    except TypeError:
+        return None
+    return tuple(key)
+
+
+# parsed (and validated) pairs per (kind, text, length), so unchanged schedules skip regex matching and idx parsing
+SCHEDULE_CACHE_SIZE = 64
+_schedule_cache: OrderedDict[tuple[str, str, int], tuple[InputPair]] = OrderedDict()
+
+def get_schedule_pairs(text: str, length: int, kind: str) -> list[InputPair]:
+    key = (kind, text, length)
+    pairs = _schedule_cache.get(key, None)
+    if pairs is None:
+        if kind == SKind.PROMPT:
+            pairs = tuple(compile_prompt_schedule(text, length))
+        elif kind == SKind.VALUE:
+            pairs = tuple(compile_value_schedule(text, length))
+        else:
+            raise ValueError(f"Schedule kind '{kind}' is not recognized.")
+        _schedule_cache[key] = pairs
+        while len(_schedule_cache) > SCHEDULE_CACHE_SIZE:
+            _schedule_cache.popitem(last=False)
+    else:
+        _schedule_cache.move_to_end(key)
+    # pairs get modified while evaluating, so return copies
+    return [replace(pair) for pair in pairs]
 
 
 def evaluate_prompt_schedule(text: str, length: int, clip: CLIP, options: PromptOptions):
+    pairs = get_schedule_pairs(text, length, SKind.PROMPT)
+    prepare_prompts(pairs, options)
+    return handle_prompt_interpolation(pairs, length, clip, options)
+
+
+def compile_prompt_schedule(text: str, length: int) -> list[InputPair]:
     text = strip_input(text)
     if len(text) == 0:
         raise Exception("No text provided to Prompt Scheduling.")
@@ -128,13 +513,13 @@ def evaluate_prompt_schedule(text: str, length: int, clip: CLIP, options: Prompt
             # if no errors found, assume this is the right format and pass on to parsing individual values
             json_matches, json_errors = get_matches_and_errors(text, _regex_prompt_json)
             if len(json_errors) == 0:
-                return parse_prompt_groups(json_matches, length, clip, options)
+                return parse_prompt_groups(json_matches, length)
         elif format is SFormat.PYTH:
             # check pythonic format
             # if no errors found, assume this is the right format and pass on to parsing individual values
             pyth_matches, pyth_errors = get_matches_and_errors(text, _regex_prompt_pyth)
             if len(pyth_errors) == 0:
-                return parse_prompt_groups(pyth_matches, length, clip, options)
+                return parse_prompt_groups(pyth_matches, length)
     # since both formats have errors, check which format is more 'correct' for the input
     # priority:
     # 1 - most matches
@@ -164,7 +549,7 @@ def evaluate_prompt_schedule(text: str, length: int, clip: CLIP, options: Prompt
     raise Exception(error_msg)
 
 
-def parse_prompt_groups(groups: list[tuple], length: int, clip: CLIP, options: PromptOptions):
+def parse_prompt_groups(groups: list[tuple], length: int):
     pairs: list[InputPair]
     errors: list[ParseErrorReport]
     # turn group tuples into InputPairs
@@ -179,9 +564,7 @@ def parse_prompt_groups(groups: list[tuple], length: int, clip: CLIP, options: P
             error_msg_list.append(f"{error.idx_str}: {error.reason}")
         error_msg = "\n".join(error_msg_list)
         raise Exception(error_msg)
-    prepare_prompts(pairs, options)
-    final_vals = handle_prompt_interpolation(pairs, length, clip, options)
-    return final_vals
+    return pairs
 
 
 def prepare_prompts(pairs: list[InputPair], options: PromptOptions):
@@ -235,27 +618,34 @@ def handle_prompt_interpolation(pairs: list[InputPair], length: int, clip: CLIP,
             if len(value) < length:
                 values_replace[key] = extend_list_to_batch_size(value, length)
 
+    source_clip = clip
     scheduled_keyframes = []
     if clip.use_clip_schedule:
         clip = clip.clone()
         scheduled_keyframes = clip.patcher.forced_hooks.get_hooks_for_clip_schedule()
 
-    pairs_lengths = len(pairs) * max(1, len(scheduled_keyframes))
-    pbar_total = length + pairs_lengths
-    pbar = ProgressBar(pbar_total)
-    # for now, use FizzNodes approach of calculating max size of tokens beforehand;
-    # this can up to double total encoding time, as this will be done again.
-    # TODO: do this dynamically to save encoding time
-    max_size = 0
-    for pair in pairs:
-        prepared_prompt = apply_values_replace_to_prompt(pair.val, 0, values_replace=values_replace)
-        cond: Tensor = clip.encode_from_tokens(clip.tokenize(prepared_prompt))
-        max_size = max(max_size, cond.shape[1])
-        pbar.update(1)
+    # plan which prompts each frame uses before encoding anything, so all unique prompts are known up front;
+    # only encoding and interpolation is repeated for each scheduled hook keyframe
+    plan = get_prompt_schedule_plan(pairs, length, values_replace)
+    pbar = ProgressBar(len(plan.prompts) * max(1, len(scheduled_keyframes)))
+    memo = options.encoding_memo
+    if memo is None:
+        memo = EncodingMemo()
+    memo.prepare(source_clip=source_clip, clip=clip, disk_cache=options.encoding_cache)
+    try:
+        return _handle_prompt_interpolation(plan, length, clip, scheduled_keyframes, options, memo, pbar)
+    finally:
+        memo.release()
+
 
+def _handle_prompt_interpolation(plan: PromptSchedulePlan, length: int, clip: CLIP, scheduled_keyframes: list,
+                                 options: PromptOptions, memo: EncodingMemo, pbar: ProgressBar):
     # if do not need to schedule clip with hooks, do nothing special
     if not clip.use_clip_schedule:
-        return _handle_prompt_interpolation(pairs, length, clip, options, values_replace, max_size, pbar)
+        output = _build_prompt_interpolation(plan, clip, options, memo, pbar)
+        memo.prune()
+        log_encoding_memo(memo, length)
+        return output
     # otherwise, need to account for keyframes on forced_hooks
     full_output = []
     for i, scheduled_opts in enumerate(scheduled_keyframes):
@@ -266,12 +656,14 @@ def handle_prompt_interpolation(pairs: list[InputPair], length: int, clip: CLIP,
         hooks_keyframes = scheduled_opts[1]
         for hook, keyframe in hooks_keyframes:
             hook.hook_keyframe._current_keyframe = keyframe
+        # encodings only depend on hook strengths, so keyframes with the same strengths share encodings
+        memo.set_state(tuple(keyframe.strength for _, keyframe in hooks_keyframes))
         try:
             # don't print_schedule on non-first iteration
             orig_print_schedule = options.print_schedule
             if orig_print_schedule and i != 0:
                 options.print_schedule = False
-            schedule_output = _handle_prompt_interpolation(pairs, length, clip, options, values_replace, max_size, pbar)
+            schedule_output = _build_prompt_interpolation(plan, clip, options, memo, pbar)
         finally:
             options.print_schedule = orig_print_schedule
         for cond, pooled_dict in schedule_output:
@@ -280,14 +672,73 @@ def handle_prompt_interpolation(pairs: list[InputPair], length: int, clip: CLIP,
             pooled_dict["clip_start_percent"] = t_range[0]
             pooled_dict["clip_end_percent"] = t_range[1]
         full_output.extend(schedule_output)
+    memo.prune()
+    log_encoding_memo(memo, length)
     return full_output
 
 
-def _handle_prompt_interpolation(pairs: list[InputPair], length: int, clip: CLIP, options: PromptOptions,
-                                 values_replace: dict[str, list[float]], max_size: int, pbar: ProgressBar):
+def log_encoding_memo(memo: EncodingMemo, length: int):
+    saved_str = ""
+    if memo.saved_count > 0:
+        saved_str = f" ({memo.saved_count} prompt{'s' if memo.saved_count != 1 else ''} tokenized the same as another)"
+    if memo.disk_count > 0:
+        saved_str += f" ({memo.disk_count} loaded from text encoding cache)"
+    if memo.reused_count > 0:
+        saved_str += f" ({memo.reused_count} reused from previous run)"
+    logger.info(f"PromptScheduling encoded {memo.encode_count} unique prompt{'s' if memo.encode_count != 1 else ''} " +
+                f"for {length} frame{'s' if length != 1 else ''}{saved_str}.")
+
+
+def get_prompts_to_encode(holders: list[CondHolder], size_prompts: list[str]) -> list[str]:
+    # dict keeps first-seen order
+    prompts = dict.fromkeys(size_prompts)
+    for holder in holders:
+        prompts[holder.prompt if holder.interp_from is None else holder.interp_prompt] = None
+    return list(prompts)
+
+
+def get_prompt_schedule_plan(pairs: list[InputPair], length: int, values_replace: dict[str, list[float]]) -> PromptSchedulePlan:
+    real_holders, holders = _plan_prompt_interpolation(pairs, length, values_replace)
+    # for now, use FizzNodes approach of padding to the max size of each prompt (at idx 0)
+    size_prompts = [apply_values_replace_to_prompt(pair.val, 0, values_replace=values_replace) for pair in pairs]
+    prompts = get_prompts_to_encode(holders, size_prompts)
+    # group chains of frames interpolated toward the same prompt, so each chain can be interpolated at once
+    holder_groups: list[list[CondHolder]] = []
+    group_idxs: dict[int, tuple[int, int]] = {}
+    for holder in holders:
+        if holder.interp_from is not None and len(holder_groups) > 0:
+            group = holder_groups[-1]
+            if group[-1] is holder.interp_from and group[-1].interp_prompt == holder.interp_prompt:
+                group_idxs[id(holder)] = (len(holder_groups)-1, len(group))
+                group.append(holder)
+                continue
+        group_idxs[id(holder)] = (len(holder_groups), 0)
+        holder_groups.append([holder])
+    # consecutive frames that use consecutive holders of the same group can be written at once
+    frame_runs: list[tuple[int, int, int, int]] = []
+    for i, holder in enumerate(real_holders):
+        group_idx, j = group_idxs[id(holder)]
+        if len(frame_runs) > 0:
+            start, count, prev_group_idx, prev_j = frame_runs[-1]
+            if holder.interp_from is not None and prev_group_idx == group_idx and prev_j+count == j:
+                frame_runs[-1] = (start, count+1, prev_group_idx, prev_j)
+                continue
+        frame_runs.append((i, 1, group_idx, j))
+    return PromptSchedulePlan(real_holders=real_holders, holders=holders, holder_groups=holder_groups, frame_runs=frame_runs,
+                              prompts=prompts, size_prompts=size_prompts)
+
+
+def _plan_prompt_interpolation(pairs: list[InputPair], length: int, values_replace: dict[str, list[float]]) -> tuple[list[CondHolder], list[CondHolder]]:
+    '''
+    Returns holder used by each frame and all holders in creation order. Holders only describe what gets encoded and interpolated;
+    their conds are filled in by _build_prompt_interpolation.
+    '''
     real_holders: list[CondHolder] = [None] * length
-    real_cond = [None] * length
-    real_pooled = [None] * length
+    holders: list[CondHolder] = []
+    def add_holder(holder: CondHolder):
+        holders.append(holder)
+        return holder
+
     prev_holder: Union[CondHolder, None] = None
     for idx, pair in enumerate(pairs):
         holder = None
@@ -300,30 +751,17 @@ def _handle_prompt_interpolation(pairs: list[InputPair], length: int, clip: CLIP
                     continue
                 real_prompt = apply_values_replace_to_prompt(pair.val, i, values_replace=values_replace)
                 if holder is None or holder.prompt != real_prompt:
-                    cond, pooled = clip.encode_from_tokens(clip.tokenize(real_prompt), return_pooled=True)
-                    cond = pad_cond(cond, target_length=max_size)
-                    holder = CondHolder(idx=i, prompt=real_prompt, raw_prompt=pair.val, cond=cond, pooled=pooled, hold=pair.hold)
+                    holder = add_holder(CondHolder(idx=i, prompt=real_prompt, raw_prompt=pair.val, hold=pair.hold))
                 else:
-                    holder = replace(holder)
-                    holder.idx = i
-                real_cond[i] = cond
-                real_pooled[i] = pooled
+                    holder = add_holder(replace(holder, idx=i))
                 real_holders[i] = holder
-                pbar.update(1)
-                comfy.model_management.throw_exception_if_processing_interrupted()
         # if idx is exactly one greater than the one before, nothing special
         elif prev_holder.idx == pair.idx-1:
-            comfy.model_management.throw_exception_if_processing_interrupted()
             holder = prev_holder
             if pair.idx < length:
                 real_prompt = apply_values_replace_to_prompt(pair.val, pair.idx, values_replace=values_replace)
-                cond, pooled = clip.encode_from_tokens(clip.tokenize(real_prompt), return_pooled=True)
-                cond = pad_cond(cond, target_length=max_size)
-                holder = CondHolder(idx=pair.idx, prompt=real_prompt, raw_prompt=pair.val, cond=cond, pooled=pooled, hold=pair.hold)
-                real_cond[pair.idx] = cond
-                real_pooled[pair.idx] = pooled
+                holder = add_holder(CondHolder(idx=pair.idx, prompt=real_prompt, raw_prompt=pair.val, hold=pair.hold))
                 real_holders[pair.idx] = holder
-                pbar.update(1)
         else:
             # if holding value, no interpolation
             if prev_holder.hold:
@@ -337,27 +775,14 @@ def _handle_prompt_interpolation(pairs: list[InputPair], length: int, clip: CLIP
                         holder = prev_holder
                     real_prompt = apply_values_replace_to_prompt(pair.val, i, values_replace=values_replace)
                     if holder.prompt != real_prompt:
-                        cond, pooled = clip.encode_from_tokens(clip.tokenize(real_prompt), return_pooled=True)
-                        cond = pad_cond(cond, target_length=max_size)
-                        holder = CondHolder(idx=i, prompt=real_prompt, raw_prompt=pair.val, cond=cond, pooled=pooled, hold=pair.hold)
+                        holder = add_holder(CondHolder(idx=i, prompt=real_prompt, raw_prompt=pair.val, hold=pair.hold))
                     else:
-                        holder = replace(holder)
-                        holder.idx = i
-                    real_cond[i] = holder.cond
-                    real_pooled[i] = holder.pooled
+                        holder = add_holder(replace(holder, idx=i))
                     real_holders[i] = holder
-                    pbar.update(1)
-                    comfy.model_management.throw_exception_if_processing_interrupted()
                 if pair.idx < length:
                     real_prompt = apply_values_replace_to_prompt(pair.val, pair.idx, values_replace=values_replace)
-                    cond, pooled = clip.encode_from_tokens(clip.tokenize(real_prompt), return_pooled=True)
-                    cond = pad_cond(cond, target_length=max_size)
-                    holder = CondHolder(idx=pair.idx, prompt=real_prompt, raw_prompt=pair.val, cond=cond, pooled=pooled, hold=pair.hold)
-                    real_cond[pair.idx] = cond
-                    real_pooled[pair.idx] = pooled
+                    holder = add_holder(CondHolder(idx=pair.idx, prompt=real_prompt, raw_prompt=pair.val, hold=pair.hold))
                     real_holders[pair.idx] = holder
-                    pbar.update(1)
-                    comfy.model_management.throw_exception_if_processing_interrupted()
             # otherwise, interpolate
             else:
                 diff_len = abs(pair.idx-prev_holder.idx)+1
@@ -365,9 +790,6 @@ def _handle_prompt_interpolation(pairs: list[InputPair], length: int, clip: CLIP
                                                               method=InterpolationMethod.LINEAR)
                 interp_weights = InterpolationMethod.get_weights(num_from=0.0, num_to=1.0, length=diff_len,
                                                               method=InterpolationMethod.LINEAR)
-                cond_to = None
-                pooled_to = None
-                cond_from = None
                 holder = None
                 interm_holder = prev_holder
                 for raw_idx, weight in zip(interp_idxs, interp_weights):
@@ -375,35 +797,17 @@ def _handle_prompt_interpolation(pairs: list[InputPair], length: int, clip: CLIP
                         is_over_length = True
                         continue
                     idx_int = round(float(raw_idx))
-                    # calculate cond_to stuff if not done yet
+                    # get cond_to holder if not done yet
                     real_prompt = apply_values_replace_to_prompt(pair.val, idx_int, values_replace=values_replace)
                     if holder is None or holder.prompt != real_prompt:
-                        cond_to, pooled_to = clip.encode_from_tokens(clip.tokenize(real_prompt), return_pooled=True)
-                        cond_to = pad_cond(cond_to, target_length=max_size)
-                        holder = CondHolder(idx=idx_int, prompt=real_prompt, raw_prompt=pair.val, cond=cond_to, pooled=pooled_to, hold=pair.hold)
-                    # calculate interm_holder stuff if needed
+                        holder = add_holder(CondHolder(idx=idx_int, prompt=real_prompt, raw_prompt=pair.val, hold=pair.hold))
+                    # get fresh interm_holder if needed; otherwise, keep interpolating from the previous frame
                     real_prompt = apply_values_replace_to_prompt(interm_holder.raw_prompt, idx_int, values_replace=values_replace)
                     if interm_holder.prompt != real_prompt:
-                        cond_from, pooled_from = clip.encode_from_tokens(clip.tokenize(real_prompt), return_pooled=True)
-                        cond_from = pad_cond(cond_from, target_length=max_size)
-                        interm_holder = CondHolder(idx=idx_int, prompt=real_prompt, raw_prompt=interm_holder.raw_prompt, cond=cond_from, pooled=pooled_from, hold=holder.hold)
-                    else:
-                        interm_holder = CondHolder(idx=interm_holder.idx, prompt=interm_holder.prompt, raw_prompt=interm_holder.raw_prompt, cond=interm_holder.cond, pooled=interm_holder.pooled, hold=interm_holder.hold)
-                    # interpolate conds
-                    if options.interp == TensorInterp.LERP:
-                        cond_interp = lerp_tensors(tensor_from=interm_holder.cond, tensor_to=cond_to, strength_to=weight)
-                    elif options.interp == TensorInterp.SLERP:
-                        cond_interp = slerp_tensors(tensor_from=interm_holder.cond, tensor_to=cond_to, strength_to=weight)
-                    pooled_interp = pooled_to
-                    if math.isclose(weight, 0.0):
-                        pooled_interp = interm_holder.pooled
-                    interm_holder = CondHolder(idx=idx_int, prompt=interm_holder.prompt, raw_prompt=interm_holder.raw_prompt, cond=cond_interp, pooled=pooled_interp, hold=holder.hold,
-                                               interp_weight=weight, interp_prompt=holder.prompt)
-                    real_cond[idx_int] = cond_interp
-                    real_pooled[idx_int] = pooled_interp
+                        interm_holder = add_holder(CondHolder(idx=idx_int, prompt=real_prompt, raw_prompt=interm_holder.raw_prompt, hold=holder.hold))
+                    interm_holder = add_holder(CondHolder(idx=idx_int, prompt=interm_holder.prompt, raw_prompt=interm_holder.raw_prompt, hold=holder.hold,
+                                                          interp_weight=weight, interp_prompt=holder.prompt, interp_from=interm_holder))
                     real_holders[idx_int] = interm_holder
-                    pbar.update(1)
-                    comfy.model_management.throw_exception_if_processing_interrupted()
         if is_over_length:
             break
         assert holder is not None
@@ -417,18 +821,23 @@ def _handle_prompt_interpolation(pairs: list[InputPair], length: int, clip: CLIP
             # check if any value replacement needs to be accounted for
             real_prompt = apply_values_replace_to_prompt(prev_holder.raw_prompt, i, values_replace=values_replace)
             if prev_holder.prompt != real_prompt:
-                cond, pooled = clip.encode_from_tokens(clip.tokenize(real_prompt), return_pooled=True)
-                cond = pad_cond(cond, target_length=max_size)
-                prev_holder = CondHolder(idx=i, prompt=real_prompt, raw_prompt=prev_holder.raw_prompt, cond=cond, pooled=pooled, hold=prev_holder.hold)
-            real_cond[i] = prev_holder.cond
-            real_pooled[i] = prev_holder.pooled
+                prev_holder = add_holder(CondHolder(idx=i, prompt=real_prompt, raw_prompt=prev_holder.raw_prompt, hold=prev_holder.hold))
             real_holders[i] = prev_holder
-            pbar.update(1)
         else:
             prev_holder = real_holders[i]
-    
-    final_cond = torch.cat(real_cond, dim=0)
-    final_pooled = torch.cat(real_pooled, dim=0)
+    return real_holders, holders
+
+
+def _build_prompt_interpolation(plan: PromptSchedulePlan, clip: CLIP, options: PromptOptions, memo: EncodingMemo, pbar: ProgressBar):
+    real_holders = plan.real_holders
+    # encode all prompts first
+    memo.encode_all(plan.prompts, batch_size=options.encode_batch_size, pbar=pbar)
+    max_size = max(memo.get_encoded(prompt)[0].shape[1] for prompt in plan.size_prompts)
+    if options.lazy_cond:
+        final_cond = _build_lazy_cond(real_holders, plan.holders, options, memo, max_size)
+    else:
+        final_cond = _build_cond(plan, options, memo, max_size)
+    final_pooled = torch.cat([holder.pooled for holder in real_holders], dim=0)
 
     if options.print_schedule:
         logger.info(f"PromptScheduling ({len(real_holders)} prompts)")
@@ -446,6 +855,112 @@ def _handle_prompt_interpolation(pairs: list[InputPair], length: int, clip: CLIP
     return [[final_cond, final_pooled_dict]]
 
 
+def _build_cond(plan: PromptSchedulePlan, options: PromptOptions, memo: EncodingMemo, max_size: int) -> Tensor:
+    '''
+    Returns cond of all frames, written into one output tensor. Each frame of an interpolated segment is kept as weights
+    on the segment's (from, to) pair, and consecutive frames of a segment are written to the output with one matmul.
+    Fills in pooled of holders; conds are only filled in for holders that are not part of a segment, or are needed as the
+    start of another segment.
+    '''
+    if options.interp not in TensorInterp._LIST:
+        raise ValueError(f"Prompt interpolation '{options.interp}' is not recognized.")
+    # per group: (pair of flattened from and to conds, coeffs of segment); None for holders that are not interpolated
+    group_weights: list[Union[tuple[Tensor, Tensor], None]] = []
+    group_of: dict[int, tuple[int, int]] = {}
+    cond_shape = None
+    def get_cond(holder: CondHolder):
+        if holder.cond is None:
+            group_idx, j = group_of[id(holder)]
+            pair, coeffs = group_weights[group_idx]
+            holder.cond = torch.mm(coeffs[j:j+1], pair).reshape(1, *cond_shape)
+        return holder.cond
+
+    # holders are reused for each scheduled hook keyframe, so clear out conds of other keyframes
+    for holder in plan.holders:
+        if holder.interp_from is not None:
+            holder.cond = None
+    # fill in groups in creation order, so interpolation sources are always filled in first
+    for group_idx, group in enumerate(plan.holder_groups):
+        holder = group[0]
+        if holder.interp_from is None:
+            holder.cond, holder.pooled = memo.encode_padded(holder.prompt, target_length=max_size)
+            cond_shape = holder.cond.shape[1:]
+            group_weights.append(None)
+            continue
+        cond_from = get_cond(holder.interp_from)
+        cond_to, pooled_to = memo.encode_padded(holder.interp_prompt, target_length=max_size)
+        coeffs = get_chained_interp_coeffs(tensor_from=cond_from, tensor_to=cond_to,
+                                           strengths_to=[x.interp_weight for x in group], interp=options.interp)
+        group_weights.append((torch.stack([cond_from.reshape(-1), cond_to.reshape(-1).to(cond_from)]), coeffs))
+        for j, segment_holder in enumerate(group):
+            group_of[id(segment_holder)] = (group_idx, j)
+            segment_holder.pooled = pooled_to
+            if math.isclose(segment_holder.interp_weight, 0.0):
+                segment_holder.pooled = segment_holder.interp_from.pooled
+
+    first_cond = get_cond(plan.real_holders[0])
+    final_cond = torch.empty((len(plan.real_holders), *cond_shape), dtype=first_cond.dtype, device=first_cond.device)
+    for start, count, group_idx, j in plan.frame_runs:
+        if group_weights[group_idx] is None:
+            final_cond[start] = plan.real_holders[start].cond[0]
+            continue
+        pair, coeffs = group_weights[group_idx]
+        torch.mm(coeffs[j:j+count], pair, out=final_cond[start:start+count].view(count, -1))
+    return final_cond
+
+
+def _build_lazy_cond(real_holders: list[CondHolder], holders: list[CondHolder], options: PromptOptions, memo: EncodingMemo,
+                     max_size: int) -> LazyCond:
+    '''
+    Returns LazyCond of unique prompt conds + each frame's weights on them. Since each interpolated frame is interpolated
+    from the previous frame, its weights are built from the weights of the frame it is interpolated from.
+    Fills in pooled of holders; conds are not filled in.
+    '''
+    keyframe_idxs: dict[str, int] = {}
+    keyframes: list[Tensor] = []
+    for holder in holders:
+        prompt = holder.prompt if holder.interp_from is None else holder.interp_prompt
+        if prompt not in keyframe_idxs:
+            keyframe_idxs[prompt] = len(keyframes)
+            keyframes.append(memo.encode_padded(prompt, target_length=max_size)[0])
+    keyframes = torch.cat(keyframes, dim=0)
+    gram = None
+    if options.interp == TensorInterp.SLERP:
+        # dot products between keyframes give dot products and norms of any weighted sum of them
+        flat = keyframes.reshape(keyframes.shape[0], -1).to(torch.float64)
+        gram = torch.mm(flat, flat.t())
+        del flat
+    # per holder: weights on keyframes, and (for slerp) dot products of holder's cond with each keyframe
+    weights: dict[int, tuple[Tensor, Tensor]] = {}
+    for holder in holders:
+        if holder.interp_from is None:
+            keyframe_idx = keyframe_idxs[holder.prompt]
+            holder_weights = torch.zeros(keyframes.shape[0], dtype=torch.float64)
+            holder_weights[keyframe_idx] = 1.0
+            holder_dots = gram[keyframe_idx] if gram is not None else None
+            holder.pooled = memo.get_encoded(holder.prompt)[1]
+        else:
+            to_idx = keyframe_idxs[holder.interp_prompt]
+            from_weights, from_dots = weights[id(holder.interp_from)]
+            if gram is not None:
+                coeff_from, coeff_to = get_interp_coeffs(options.interp, holder.interp_weight, dot=from_dots[to_idx].item(),
+                                                         norm_from=math.sqrt(max(0.0, torch.dot(from_weights, from_dots).item())),
+                                                         norm_to=math.sqrt(gram[to_idx, to_idx].item()))
+            else:
+                coeff_from, coeff_to = get_interp_coeffs(options.interp, holder.interp_weight)
+            holder_weights = from_weights * coeff_from
+            holder_weights[to_idx] += coeff_to
+            holder_dots = None
+            if gram is not None:
+                holder_dots = from_dots * coeff_from + gram[to_idx] * coeff_to
+            holder.pooled = memo.get_encoded(holder.interp_prompt)[1]
+            if math.isclose(holder.interp_weight, 0.0):
+                holder.pooled = holder.interp_from.pooled
+        weights[id(holder)] = (holder_weights, holder_dots)
+    frame_weights = torch.stack([weights[id(holder)][0] for holder in real_holders], dim=0)
+    return LazyCond(keyframes=keyframes, frame_weights=frame_weights)
+
+
 def pad_cond(cond: Tensor, target_length: int):
     # FizzNodes-style cond padding
     # TODO: test out other methods of padding
@@ -460,7 +975,12 @@ def pad_cond(cond: Tensor, target_length: int):
     return cond
 
 
-def evaluate_value_schedule(text: str, length: int):
+def evaluate_value_schedule(text: str, length: int) -> list[float]:
+    pairs = get_schedule_pairs(text, length, SKind.VALUE)
+    return handle_val_interpolation(pairs, length)
+
+
+def compile_value_schedule(text: str, length: int) -> list[InputPair]:
     text = strip_input(text)
     if len(text) == 0:
         raise Exception("No text provided to Value Scheduling.")
@@ -534,9 +1054,7 @@ def parse_value_groups(groups: list[tuple], length: int):
             error_msg_list.append(f"{error.idx_str}: {error.reason}")
         error_msg = "\n".join(error_msg_list)
         raise Exception(error_msg)
-    # perform third parse, where hold and interpolation is used to fill in any in-between values
-    final_vals = handle_val_interpolation(pairs, length)
-    return final_vals
+    return pairs
 
 
 def handle_float_vals(groups: list[tuple]):
@@ -553,54 +1071,52 @@ def handle_float_vals(groups: list[tuple]):
     return actual_pairs, errors
 
 
-def handle_val_interpolation(pairs: list[InputPair], length: int):
+def handle_val_interpolation(pairs: list[InputPair], length: int) -> list[float]:
     if length == 0:
         length = max(pairs, key=lambda x: x.idx).idx+1
-    real_vals = [None] * length
+    # later pairs overwrite earlier ones, so apply each pair's whole range of frames at once, in order
+    real_vals = np.zeros(length, dtype=np.float64)
+    assigned = np.zeros(length, dtype=bool)
+    def assign(idxs: np.ndarray, vals: Union[float, np.ndarray]):
+        # idxs past the end are skipped; negative idxs count from the end
+        valid = idxs < length
+        if not isinstance(vals, float):
+            vals = vals[valid]
+        idxs = idxs[valid]
+        real_vals[idxs] = vals
+        assigned[idxs] = True
 
     prev_pair = None
     for pair in pairs:
         # if no last pair is set, then use first provided val up to the idx
         if prev_pair is None:
-            for i in range(0, pair.idx+1):
-                if i >= length:
-                    break
-                real_vals[i] = pair.val
+            assign(np.arange(0, pair.idx+1), pair.val)
         # if idx is exactly one greater than the one before, nothing special
         elif prev_pair.idx == pair.idx-1:
-            if pair.idx < length:
-                real_vals[pair.idx] = pair.val
+            assign(np.array([pair.idx]), pair.val)
         else:
             # if holding value, no interpolation
             if prev_pair.hold:
                 # keep same value as last_pair, then assign current index value
-                for i in range(prev_pair.idx+1, pair.idx):
-                    if i >= length:
-                        continue
-                    real_vals[i] = prev_pair.val
-                if pair.idx < length:
-                    real_vals[pair.idx] = pair.val
+                assign(np.arange(prev_pair.idx+1, pair.idx), prev_pair.val)
+                assign(np.array([pair.idx]), pair.val)
             # otherwise, interpolate
             else:
                 diff_len = abs(pair.idx-prev_pair.idx)+1
-                interp_idxs = InterpolationMethod.get_weights(num_from=prev_pair.idx, num_to=pair.idx, length=diff_len,
-                                                              method=InterpolationMethod.LINEAR)
+                interp_idxs = np.round(InterpolationMethod.get_weights(num_from=prev_pair.idx, num_to=pair.idx, length=diff_len,
+                                                                       method=InterpolationMethod.LINEAR).numpy()).astype(np.int64)
                 interp_vals = InterpolationMethod.get_weights(num_from=prev_pair.val, num_to=pair.val, length=diff_len,
-                                                              method=InterpolationMethod.LINEAR)
-                for idx, val in zip(interp_idxs, interp_vals):
-                    if idx >= length:
-                        continue
-                    real_vals[round(float(idx))] = float(val)
+                                                              method=InterpolationMethod.LINEAR).numpy().astype(np.float64)
+                assign(interp_idxs, interp_vals)
         prev_pair = pair
-    # fill in None gaps with last used value
-    # TODO: review if this works as intended, or if needs to be a bit more thorough
-    prev_val = None
-    for i in range(len(real_vals)):
-        if real_vals[i] is None:
-            real_vals[i] = prev_val
-        else:
-            prev_val = real_vals[i]
-    return real_vals
+    # fill in gaps with last used value
+    last_assigned = np.where(assigned, np.arange(length), -1)
+    np.maximum.accumulate(last_assigned, out=last_assigned)
+    final_vals = real_vals[last_assigned].tolist()
+    # frames before the first assigned value have no value to use
+    for i in range(int(np.count_nonzero(last_assigned < 0))):
+        final_vals[i] = None
+    return final_vals
 
 
 def handle_group_idxs(pairs: list[InputPair], length: int):
@@ -1,4 +1,6 @@
 import hashlib
+import json
+import threading
 from pathlib import Path
 from typing import Callable, Union
 from collections.abc import Iterable
@@ -384,7 +386,7 @@ def get_motion_lora_path(lora_name: str):
 
 
 # modified from https://stackoverflow.com/questions/22058048/hashing-a-file-in-python
-def calculate_file_hash(filename: str, hash_every_n: int = 50):
+def calculate_file_hash_raw(filename: str, hash_every_n: int = 50):
     h = hashlib.sha256()
     b = bytearray(1024*1024)
     mv = memoryview(b)
@@ -398,6 +400,109 @@ def calculate_file_hash(filename: str, hash_every_n: int = 50):
     return h.hexdigest()
 
 
+class FileHashIndex:
+    '''
+    Persistent (path, size, mtime) -> hash index, so file hashes only get recomputed when the file changes.
+    '''
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        self.entries: dict[str, dict[str]] = None
+        self.lock = threading.RLock()
+
+    def _load(self):
+        if self.entries is not None:
+            return
+        self.entries = {}
+        if not os.path.isfile(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r") as f:
+                loaded = json.load(f)
+            if isinstance(loaded, dict):
+                self.entries = loaded
+        except Exception as e:
+            logger.warning(f"Could not read hash index at {self.index_path}; it will be rebuilt. Error: {e}")
+
+    def _save(self):
+        # write to temp file first, so a partially written index is never read
+        temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(temp_path, self.index_path)
+        except Exception as e:
+            logger.warning(f"Could not write hash index to {self.index_path}. Error: {e}")
+
+    def get_hash(self, filename: str, hash_every_n: int=50, save=True) -> str:
+        path = os.path.abspath(filename)
+        stat = os.stat(path)
+        with self.lock:
+            self._load()
+            entry = self.entries.get(path, None)
+            if (isinstance(entry, dict) and entry.get("size") == stat.st_size and entry.get("mtime") == stat.st_mtime_ns
+                    and entry.get("hash_every_n") == hash_every_n and "hash" in entry):
+                return entry["hash"]
+        # hash outside of lock, so other files can be looked up in the meantime
+        file_hash = calculate_file_hash_raw(path, hash_every_n=hash_every_n)
+        with self.lock:
+            self.entries[path] = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "hash_every_n": hash_every_n, "hash": file_hash}
+            if save:
+                self._save()
+        return file_hash
+
+    def warm(self, filenames: list[str]):
+        for filename in filenames:
+            try:
+                self.get_hash(filename, save=False)
+            except Exception:
+                pass
+        with self.lock:
+            # forget files that have since been removed
+            self.entries = {k: v for k, v in self.entries.items() if os.path.isfile(k)}
+            self._save()
+
+
+# hash index lives next to motion models
+file_hash_index = FileHashIndex(str(Path(folder_paths.models_dir) / Folders.ANIMATEDIFF_MODELS / ".ade_hash_index.json"))
+
+
+def check_and_warm_file_hash_index():
+    motion_models = get_available_motion_models()
+    if len(motion_models) == 0:
+        logger.error(f"No motion models found. Please download one and place in: {folder_paths.get_folder_paths(Folders.ANIMATEDIFF_MODELS)}")
+        return
+    filenames = [get_motion_model_path(x) for x in motion_models]
+    filenames.extend([get_motion_lora_path(x) for x in get_available_motion_loras()])
+    file_hash_index.warm([x for x in filenames if x is not None])
+
+
+def warm_file_hash_index():
+    # listing model folders can be slow on network drives, so keep it off of the startup path
+    thread = threading.Thread(target=check_and_warm_file_hash_index, name="ADE_hash_index", daemon=True)
+    thread.start()
+    return thread
+
+
+def is_indexed_file(filename: str):
+    # only motion models and motion LoRAs are kept in the hash index, so it stays bounded by the contents of those folders
+    path = os.path.abspath(filename)
+    for folder in folder_paths.get_folder_paths(Folders.ANIMATEDIFF_MODELS) + folder_paths.get_folder_paths(Folders.MOTION_LORA):
+        folder = os.path.abspath(folder)
+        try:
+            if os.path.commonpath([path, folder]) == folder:
+                return True
+        except ValueError:
+            # on different drives
+            continue
+    return False
+
+
+def calculate_file_hash(filename: str, hash_every_n: int = 50):
+    if not is_indexed_file(filename):
+        return calculate_file_hash_raw(filename, hash_every_n=hash_every_n)
+    return file_hash_index.get_hash(filename, hash_every_n=hash_every_n)
+
+
 def calculate_model_hash(model: ModelPatcher):
     unet = model.model.diff
     t = unet.input_blocks[1]
@@ -43,6 +43,159 @@ def slerp_tensors(tensor_from: Tensor, tensor_to: Tensor, strength_to: Tensor, d
     return (tensor_from * sin_from + tensor_to * sin_to) / omega.sin()
 
 
+def get_interp_coeffs(interp: str, strength_to: float, dot: float=None, norm_from: float=None, norm_to: float=None,
+                      dot_threshold=0.9995) -> tuple[float, float]:
+    '''
+    Returns (coeff_from, coeff_to) so that interpolated = tensor_from * coeff_from + tensor_to * coeff_to, matching
+    lerp_tensors/slerp_tensors. Slerp needs dot product and norms of the tensors.
+    '''
+    if interp == TensorInterp.LERP:
+        return 1.0-strength_to, strength_to
+    elif interp == TensorInterp.SLERP:
+        cos = dot / (norm_from * norm_to)
+        if abs(cos) > dot_threshold:
+            return 1.0-strength_to, strength_to
+        omega = math.acos(max(-1.0, min(1.0, cos)))
+        sin_omega = math.sin(omega)
+        return math.sin((1.0-strength_to) * omega) / sin_omega, math.sin(strength_to * omega) / sin_omega
+    raise ValueError(f"Prompt interpolation '{interp}' is not recognized.")
+
+
+def get_chained_interp_coeffs(tensor_from: Tensor, tensor_to: Tensor, strengths_to: list[float], interp: str) -> Tensor:
+    '''
+    Returns (frames, 2) coeffs for all frames of an interpolated segment, where frame = tensor_from * coeffs[:, 0] + tensor_to * coeffs[:, 1].
+    Like prompt scheduling, each frame is interpolated toward tensor_to starting from the previous frame (first frame
+    starts from tensor_from), so every frame stays a weighted sum of the pair.
+    '''
+    dot_ft = norm_ff = norm_tt = None
+    if interp == TensorInterp.SLERP:
+        # dot products of the pair are computed once; norms of in-between frames follow from them
+        flat_from = tensor_from.reshape(-1).to(torch.float64)
+        flat_to = tensor_to.reshape(-1).to(torch.float64)
+        dot_ft = torch.dot(flat_from, flat_to).item()
+        norm_ff = torch.dot(flat_from, flat_from).item()
+        norm_tt = torch.dot(flat_to, flat_to).item()
+        del flat_from, flat_to
+    coeffs = []
+    a, b = 1.0, 0.0
+    for strength_to in strengths_to:
+        if interp == TensorInterp.SLERP:
+            coeff_from, coeff_to = get_interp_coeffs(interp, strength_to, dot=a*dot_ft + b*norm_tt,
+                                                     norm_from=math.sqrt(max(0.0, a*a*norm_ff + 2*a*b*dot_ft + b*b*norm_tt)),
+                                                     norm_to=math.sqrt(norm_tt))
+        else:
+            coeff_from, coeff_to = get_interp_coeffs(interp, strength_to)
+        a, b = a * coeff_from, b * coeff_from + coeff_to
+        coeffs.append((a, b))
+    return torch.tensor(coeffs, dtype=tensor_from.dtype, device=tensor_from.device)
+
+
+def _materialize_lazy(obj):
+    if isinstance(obj, LazyCond):
+        return obj.materialize()
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_materialize_lazy(x) for x in obj)
+    if isinstance(obj, dict):
+        return {k: _materialize_lazy(v) for k, v in obj.items()}
+    return obj
+
+
+class LazyCond:
+    '''
+    Cond of shape (frames, tokens, dim) stored as unique keyframe conds (keyframes, tokens, dim) plus the weight of each
+    keyframe per frame (frames, keyframes); frames are only computed when needed.
+
+    Selecting frames along dim 0 (like when sliding context gets a window's conds) stays lazy. Anything else materializes it
+    into a regular Tensor, so it can be used anywhere a cond Tensor is expected (e.g. CONDCrossAttn).
+    '''
+    def __init__(self, keyframes: Tensor, frame_weights: Tensor):
+        self.keyframes = keyframes
+        self.frame_weights = frame_weights.to(dtype=keyframes.dtype, device=keyframes.device)
+
+    @property
+    def shape(self):
+        return torch.Size((self.frame_weights.shape[0], *self.keyframes.shape[1:]))
+
+    @property
+    def dtype(self):
+        return self.keyframes.dtype
+
+    @property
+    def device(self):
+        return self.keyframes.device
+
+    @property
+    def ndim(self):
+        return self.keyframes.ndim
+
+    def size(self, dim: int=None):
+        if dim is None:
+            return self.shape
+        return self.shape[dim]
+
+    def dim(self):
+        return self.ndim
+
+    def numel(self):
+        return math.prod(self.shape)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def materialize(self) -> Tensor:
+        flat = self.keyframes.reshape(self.keyframes.shape[0], -1)
+        return torch.mm(self.frame_weights, flat).reshape(self.shape)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, (slice, list, range)) or (isinstance(idx, Tensor) and idx.ndim == 1):
+            if isinstance(idx, range):
+                idx = list(idx)
+            return LazyCond(self.keyframes, self.frame_weights[idx])
+        return self.materialize()[idx]
+
+    def to(self, *args, **kwargs):
+        return self.materialize().to(*args, **kwargs)
+
+    @classmethod
+    def __torch_function__(cls, func, types, args=(), kwargs=None):
+        if kwargs is None:
+            kwargs = {}
+        return func(*_materialize_lazy(args), **_materialize_lazy(kwargs))
+
+    def __getattr__(self, name: str):
+        # only called for attributes not defined here; defer to materialized Tensor
+        if name.startswith("__") or name in ("keyframes", "frame_weights"):
+            raise AttributeError(name)
+        return getattr(self.materialize(), name)
+
+    def __add__(self, other):
+        return self.materialize() + _materialize_lazy(other)
+
+    def __radd__(self, other):
+        return _materialize_lazy(other) + self.materialize()
+
+    def __sub__(self, other):
+        return self.materialize() - _materialize_lazy(other)
+
+    def __rsub__(self, other):
+        return _materialize_lazy(other) - self.materialize()
+
+    def __mul__(self, other):
+        return self.materialize() * _materialize_lazy(other)
+
+    def __rmul__(self, other):
+        return _materialize_lazy(other) * self.materialize()
+
+    def __truediv__(self, other):
+        return self.materialize() / _materialize_lazy(other)
+
+    def __neg__(self):
+        return -self.materialize()
+
+    def __repr__(self):
+        return f"LazyCond(shape={tuple(self.shape)}, keyframes={self.keyframes.shape[0]}, dtype={self.dtype}, device={self.device})"
+
+
 def validate_index(raw_index: Union[str, int, float], length: int=0, is_range: bool=False, allow_negative=False, allow_missing=False, allow_decimal=False) -> int:
     is_decimal = False
     if isinstance(raw_index, str):
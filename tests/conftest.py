@@ -0,0 +1,47 @@
+import importlib
+import importlib.util
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+# tests run against a ComfyUI install; by default, the one this repo is installed in (ComfyUI/custom_nodes/<this repo>)
+COMFYUI_PATH = Path(os.environ.get("COMFYUI_PATH", REPO_ROOT.parents[1]))
+# name the package is imported under, same as ComfyUI would import a custom node folder
+PACKAGE_NAME = "ADE_under_test"
+
+
+def add_comfyui_to_path():
+    if str(COMFYUI_PATH) not in sys.path:
+        sys.path.insert(0, str(COMFYUI_PATH))
+
+
+def load_package():
+    '''
+    Imports this repo the way ComfyUI imports custom nodes and returns it; skips the test if ComfyUI is not available.
+    '''
+    if PACKAGE_NAME in sys.modules:
+        return sys.modules[PACKAGE_NAME]
+    add_comfyui_to_path()
+    pytest.importorskip("comfy", reason=f"ComfyUI not found at {COMFYUI_PATH}; set COMFYUI_PATH to run this test.")
+    pytest.importorskip("folder_paths", reason=f"ComfyUI not found at {COMFYUI_PATH}; set COMFYUI_PATH to run this test.")
+    spec = importlib.util.spec_from_file_location(PACKAGE_NAME, REPO_ROOT / "__init__.py", submodule_search_locations=[str(REPO_ROOT)])
+    package = importlib.util.module_from_spec(spec)
+    sys.modules[PACKAGE_NAME] = package
+    try:
+        spec.loader.exec_module(package)
+    except Exception:
+        del sys.modules[PACKAGE_NAME]
+        raise
+    return package
+
+
+@pytest.fixture(scope="session")
+def ade():
+    '''Returns function to import a submodule of animatediff, e.g. ade("sample_settings").'''
+    load_package()
+    def import_submodule(module_name: str):
+        return importlib.import_module(f"{PACKAGE_NAME}.animatediff.{module_name}")
+    return import_submodule
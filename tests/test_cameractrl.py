@@ -0,0 +1,109 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import torch
+
+
+# previous implementation (before encoded features were cached per context window), kept as a reference for results
+def reference_camera_features(adapter, camera_encoder, orig_camera_poses, x: torch.Tensor, full_length: int, sub_idxs, batched_number: int):
+    goal_length = x.size(0) // batched_number
+    pose_idxs = np.arange(max(full_length, len(orig_camera_poses)))
+    pose_idxs = np.minimum(pose_idxs, len(orig_camera_poses)-1)
+    if sub_idxs is not None:
+        pose_idxs = pose_idxs[sub_idxs]
+    if len(pose_idxs) > goal_length:
+        pose_idxs = pose_idxs[:goal_length]
+    elif len(pose_idxs) < goal_length:
+        pose_idxs = np.concatenate([pose_idxs, np.full(goal_length-len(pose_idxs), pose_idxs[-1])])
+    camera_poses = orig_camera_poses.select(pose_idxs)
+    b, c, h, w = x.shape
+    plucker_embedding = adapter.prepare_pose_embedding(camera_poses, image_width=w*8, image_height=h*8).to(dtype=x.dtype, device=x.device)
+    return camera_encoder(plucker_embedding, video_length=goal_length, batched_number=batched_number)
+
+
+class CountingEncoder:
+    def __init__(self, encoder):
+        self.encoder = encoder
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self.encoder(*args, **kwargs)
+
+
+@pytest.fixture(scope="module")
+def camera_setup(ade):
+    adapter = ade("adapter_cameractrl")
+    nodes_cameractrl = ade("nodes_cameractrl")
+    torch.manual_seed(0)
+    encoder = adapter.CameraPoseEncoder(channels=[32, 64], nums_rb=2, temporal_attention_nhead=2).eval()
+    with torch.no_grad():
+        for param in encoder.parameters():
+            param.normal_(std=0.05)
+    poses = nodes_cameractrl.ndarray_to_poses(nodes_cameractrl.get_camera_motion(np.array([0.3, 1., -0.5]), np.array([1., 0.2, -2.]), 1.3, 20))
+    return adapter, encoder, adapter.CameraPoses.from_poses(poses)
+
+
+def run_prepare(ade, camera_setup, steps: list[list], full_length: int, batched_number: int=2):
+    adapter, encoder, camera_poses = camera_setup
+    attachment = ade("model_injection").MotionModelAttachment()
+    attachment.orig_camera_poses = camera_poses
+    counting = CountingEncoder(encoder)
+    features = []
+    model = SimpleNamespace(camera_encoder=counting, set_camera_features=lambda camera_features: features.append(camera_features))
+    patcher = SimpleNamespace(model=model)
+    results = []
+    for windows in steps:
+        for sub_idxs in windows:
+            goal_length = len(sub_idxs) if sub_idxs is not None else full_length
+            x = torch.zeros((goal_length*batched_number, 4, 8, 8))
+            features.clear()
+            with torch.no_grad():
+                attachment.prepare_camera_features(patcher, x, list(range(batched_number)), {"full_length": full_length, "sub_idxs": sub_idxs})
+                expected = reference_camera_features(adapter, encoder, camera_poses, x, full_length, sub_idxs, batched_number)
+            results.append((features[-1] if features else None, expected))
+    return results, counting.calls
+
+
+@pytest.mark.parametrize("full_length", [8, 16])
+def test_camera_features_without_context_match_reference(ade, camera_setup, full_length):
+    results, calls = run_prepare(ade, camera_setup, steps=[[None], [None], [None]], full_length=full_length)
+    # set once, then reused for the following steps
+    assert calls == 1
+    actual, expected = results[0]
+    assert len(actual) == len(expected)
+    for a, e in zip(actual, expected):
+        assert torch.equal(a, e)
+    assert results[1][0] is None and results[2][0] is None
+
+
+def test_camera_features_with_context_match_reference(ade, camera_setup):
+    windows = [list(range(0, 16)), list(range(12, 28)), list(range(24, 32)) + list(range(0, 8))]
+    results, calls = run_prepare(ade, camera_setup, steps=[windows, windows], full_length=32)
+    # each window is encoded once, no matter the amount of steps
+    assert calls == len(windows)
+    for actual, expected in results:
+        assert len(actual) == len(expected)
+        for a, e in zip(actual, expected):
+            assert torch.equal(a, e)
+
+
+@pytest.mark.parametrize("frames", [1, 3, 4])
+def test_ray_condition_crosses_per_ray(ade, frames):
+    # torch.cross without dim picks the first dimension of size 3, which was the frame dimension for 3-frame windows
+    adapter = ade("adapter_cameractrl")
+    generator = torch.Generator().manual_seed(frames)
+    c2w = torch.eye(4).repeat(1, frames, 1, 1)
+    c2w[..., :3, :] = torch.randn((1, frames, 3, 4), generator=generator)
+    K = torch.rand((1, frames, 4), generator=generator) * 8 + 1
+    plucker = adapter.ray_condition(K, c2w, 5, 7, device="cpu")
+    assert plucker.shape == (1, frames, 5, 7, 6)
+    # each frame matches the frame embedded on its own
+    for idx in range(frames):
+        single = adapter.ray_condition(K[:, idx:idx+1], c2w[:, idx:idx+1], 5, 7, device="cpu")
+        assert torch.allclose(plucker[:, idx:idx+1], single, atol=1e-6)
+    # moment is origin x direction for every ray
+    rays_d = plucker[..., 3:]
+    rays_o = c2w[:, :, None, None, :3, 3].expand_as(rays_d)
+    assert torch.allclose(plucker[..., :3], torch.linalg.cross(rays_o, rays_d, dim=-1), atol=1e-6)
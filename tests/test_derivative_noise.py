@@ -0,0 +1,89 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+import torch
+
+
+def get_extra_args(context_length: int, context_overlap: int):
+    return {"context_options": SimpleNamespace(context_length=context_length, context_overlap=context_overlap, view_options=None)}
+
+
+# previous loop implementations (before noise was computed as a single gather), kept as a reference for results
+def reference_repeated_context(noise: torch.Tensor, context_length: int):
+    length = noise.shape[0]
+    noise = noise[:context_length]
+    cat_count = (length // context_length) + 1
+    return torch.cat([noise] * cat_count, dim=0)[:length]
+
+
+def reference_freenoise(noise: torch.Tensor, seed: int, context_length: int, context_overlap: int, get_generator, cpu_device):
+    video_length = noise.shape[0]
+    delta = context_length - context_overlap
+    generator, _ = get_generator(cpu_device, seed)
+    for start_idx in range(0, video_length-context_length, delta):
+        place_idx = start_idx + context_length
+        if place_idx >= video_length:
+            break
+        end_idx = place_idx - 1
+        if end_idx + delta >= video_length:
+            final_delta = video_length - place_idx
+            list_idx = torch.Tensor(list(range(start_idx,start_idx+final_delta))).to(torch.long)
+            list_idx = list_idx[torch.randperm(final_delta, generator=generator)]
+            noise[place_idx:place_idx+final_delta] = noise[list_idx]
+            break
+        list_idx = torch.Tensor(list(range(start_idx,start_idx+delta))).to(torch.long)
+        list_idx = list_idx[torch.randperm(delta, generator=generator)]
+        noise[place_idx:place_idx+delta] = noise[list_idx]
+    return noise
+
+
+CONTEXT_CASES = [(16, 4), (16, 8), (16, 0), (8, 7), (4, 2), (1, 0), (24, 12)]
+
+
+@pytest.mark.parametrize("context_length,context_overlap", CONTEXT_CASES)
+def test_freenoise_matches_reference(ade, context_length, context_overlap):
+    sample_settings = ade("sample_settings")
+    gen = sample_settings.SeedNoiseGeneration
+    for length in list(range(1, 70)) + [257]:
+        for seed in (0, 123):
+            noise = torch.randn((length, 2, 3, 3), generator=torch.Generator().manual_seed(length))
+            expected = reference_freenoise(noise.clone(), seed, context_length, context_overlap,
+                                           sample_settings.get_generator, sample_settings.RandDevice.CPU)
+            actual = gen._convert_to_freenoise(noise.clone(), seed=seed, extra_args=get_extra_args(context_length, context_overlap))
+            assert torch.equal(actual, expected), (length, seed)
+
+
+@pytest.mark.parametrize("context_length,context_overlap", CONTEXT_CASES)
+def test_repeated_context_matches_reference(ade, context_length, context_overlap):
+    gen = ade("sample_settings").SeedNoiseGeneration
+    for length in list(range(1, 70)) + [257]:
+        noise = torch.randn((length, 2, 3, 3), generator=torch.Generator().manual_seed(length))
+        expected = reference_repeated_context(noise.clone(), context_length)
+        actual = gen._convert_to_repeated_context(noise.clone(), extra_args=get_extra_args(context_length, context_overlap))
+        assert torch.equal(actual, expected), length
+
+
+# not part of the default run (~40MB of noise, best of 3); results are covered by the tests above
+@pytest.mark.benchmark
+def test_derivative_noise_benchmark_10k_frames(ade):
+    sample_settings = ade("sample_settings")
+    gen = sample_settings.SeedNoiseGeneration
+    noise = torch.randn((10000, 4, 16, 16), generator=torch.Generator().manual_seed(0))
+    extra_args = get_extra_args(16, 4)
+    def best_of(func, runs=3):
+        times = []
+        for _ in range(runs):
+            source = noise.clone()
+            start = time.perf_counter()
+            result = func(source)
+            times.append(time.perf_counter() - start)
+        return min(times), result
+    old_time, expected = best_of(lambda x: reference_freenoise(x, 42, 16, 4, sample_settings.get_generator, sample_settings.RandDevice.CPU))
+    new_time, actual = best_of(lambda x: gen._convert_to_freenoise(x, seed=42, extra_args=extra_args))
+    assert torch.equal(actual, expected)
+    print(f"FreeNoise, 10k frames: loop {old_time*1000:.1f}ms, gather {new_time*1000:.1f}ms")
+    old_time, expected = best_of(lambda x: reference_repeated_context(x, 16))
+    new_time, actual = best_of(lambda x: gen._convert_to_repeated_context(x, extra_args=extra_args))
+    assert torch.equal(actual, expected)
+    print(f"repeated_context, 10k frames: cat {old_time*1000:.1f}ms, gather {new_time*1000:.1f}ms")
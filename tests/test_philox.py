@@ -0,0 +1,89 @@
+import math
+
+import pytest
+import torch
+
+
+# Philox4x32-10 known-answer vectors from the Random123 distribution: (counter, key, expected output)
+KNOWN_ANSWERS = [
+    ((0x00000000, 0x00000000, 0x00000000, 0x00000000), (0x00000000, 0x00000000),
+     (0x6627e8d5, 0xe169c58d, 0xbc57ac4c, 0x9b00dbd8)),
+    ((0xffffffff, 0xffffffff, 0xffffffff, 0xffffffff), (0xffffffff, 0xffffffff),
+     (0x408f276d, 0x41c83b0e, 0xa20bc7c6, 0x6d5451fd)),
+    ((0x243f6a88, 0x85a308d3, 0x13198a2e, 0x03707344), (0xa4093822, 0x299f31d0),
+     (0xd16cfe09, 0x94fdcceb, 0x5001e420, 0x24126ea1)),
+]
+
+FRAME_SHAPE = (4, 9, 7)
+
+
+def get_latents(length: int):
+    return torch.zeros((length, *FRAME_SHAPE))
+
+
+def reference_box_muller(words: tuple[int]):
+    # same mapping as philox.randn_frames, done in python floats
+    u = [(word + 1.0) / 4294967296.0 for word in words]
+    radius_a = math.sqrt(-2.0 * math.log(u[0]))
+    radius_b = math.sqrt(-2.0 * math.log(u[2]))
+    return [radius_a * math.cos(2.0 * math.pi * u[1]), radius_a * math.sin(2.0 * math.pi * u[1]),
+            radius_b * math.cos(2.0 * math.pi * u[3]), radius_b * math.sin(2.0 * math.pi * u[3])]
+
+
+@pytest.mark.parametrize("counter,key,expected", KNOWN_ANSWERS)
+def test_philox_known_answers(ade, counter, key, expected):
+    philox = ade("philox")
+    c0, c1, c2, c3 = [torch.tensor([c], dtype=torch.int64) for c in counter]
+    result = philox.philox_4x32(c0, c1, c2, c3, seed=key[0] | (key[1] << 32))
+    assert tuple(int(r) for r in result) == expected
+
+
+def test_philox_frames_match_known_answers(ade):
+    # first 4 values of frame 0 with seed 0 come from counter 0 and key 0
+    gen = ade("sample_settings").SeedNoiseGeneration
+    noise = gen.create_noise_philox_frames(0, [0], get_latents(1).to(torch.float64), device="cpu")
+    expected = torch.tensor(reference_box_muller(KNOWN_ANSWERS[0][2]), dtype=torch.float64)
+    assert torch.allclose(noise.flatten()[:4], expected, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("seed", [0, 42, 2**40 + 7])
+def test_philox_frames_independent_of_chunking(ade, seed):
+    philox = ade("philox")
+    gen = ade("sample_settings").SeedNoiseGeneration
+    length = philox.FRAME_CHUNK * 2 + 5
+    latents = get_latents(length)
+    full = gen.create_noise_philox_frames(seed, range(length), latents, device="cpu")
+    assert full.shape == latents.shape
+    # split at and across FRAME_CHUNK boundaries, in separate calls
+    for split in (1, philox.FRAME_CHUNK - 1, philox.FRAME_CHUNK, philox.FRAME_CHUNK + 3):
+        first = gen.create_noise_philox_frames(seed, range(split), latents, device="cpu")
+        second = gen.create_noise_philox_frames(seed, range(split, length), latents, device="cpu")
+        assert torch.equal(torch.cat([first, second]), full), split
+    # single frames and out-of-order subsets
+    for idx in (0, philox.FRAME_CHUNK, length - 1):
+        assert torch.equal(gen.create_noise_philox_frames(seed, [idx], latents, device="cpu")[0], full[idx])
+    subset = [length - 1, 3, philox.FRAME_CHUNK + 1, 3]
+    assert torch.equal(gen.create_noise_philox_frames(seed, subset, latents, device="cpu"), full[subset])
+
+
+def test_philox_batch_offset_matches_frames(ade):
+    sample_settings = ade("sample_settings")
+    gen = sample_settings.SeedNoiseGeneration
+    full = gen.create_noise_philox_frames(7, range(50), get_latents(50), device="cpu")
+    offset = gen.create_noise_philox(7, get_latents(20), batch_offset=30, device=sample_settings.RandDevice.CPU)
+    assert torch.equal(offset, full[30:])
+
+
+def test_philox_frames_without_float64(ade, monkeypatch):
+    # devices without float64 (e.g. MPS) do Box-Muller on CPU; on CPU this must not change anything
+    philox = ade("philox")
+    expected = philox.randn_frames(3, range(40), FRAME_SHAPE)
+    monkeypatch.setitem(philox._float64_support, "cpu", False)
+    assert torch.equal(philox.randn_frames(3, range(40), FRAME_SHAPE), expected)
+
+
+def test_philox_frames_are_standard_normal(ade):
+    philox = ade("philox")
+    noise = philox.randn_frames(0, range(64), (4, 32, 32))
+    assert abs(noise.mean().item()) < 0.01
+    assert abs(noise.std().item() - 1.0) < 0.01
@@ -0,0 +1,108 @@
+import pytest
+import torch
+
+
+@pytest.fixture(scope="module")
+def tiny_clip_cls(ade):
+    sd1_clip = pytest.importorskip("comfy.sd1_clip")
+
+    class TinyTextEncoder(torch.nn.Module, sd1_clip.ClipTokenWeightEncoder):
+        # rows are encoded independently of each other, like a CLIP text transformer
+        def __init__(self, dim: int, seed: int):
+            super().__init__()
+            generator = torch.Generator().manual_seed(seed)
+            self.embedding = torch.nn.Parameter(torch.randn(1000, dim, generator=generator))
+            self.proj = torch.nn.Parameter(torch.randn(dim, dim, generator=generator))
+            self.special_tokens = {"start": 998, "end": 999, "pad": 999}
+            self.forward_batches: list[int] = []
+
+        def encode(self, tokens):
+            self.forward_batches.append(len(tokens))
+            hidden = (self.embedding[torch.tensor(tokens)] @ self.proj).cumsum(dim=1)
+            return hidden, hidden[:, -1]
+
+    class TinyCondStageModel(torch.nn.Module):
+        # combines two text encoders the way SDXL does
+        def __init__(self):
+            super().__init__()
+            self.clip_l = TinyTextEncoder(8, seed=1)
+            self.clip_g = TinyTextEncoder(12, seed=2)
+
+        def encode_token_weights(self, token_weight_pairs):
+            g_out, g_pooled = self.clip_g.encode_token_weights(token_weight_pairs["g"])
+            l_out, _ = self.clip_l.encode_token_weights(token_weight_pairs["l"])
+            cut_to = min(l_out.shape[1], g_out.shape[1])
+            return torch.cat([l_out[:, :cut_to], g_out[:, :cut_to]], dim=-1), g_pooled
+
+    class TinyCLIP:
+        use_clip_schedule = False
+        layer_idx = None
+
+        def __init__(self):
+            self.cond_stage_model = TinyCondStageModel()
+            self.patcher = None
+
+        def tokenize(self, text: str):
+            tokens = []
+            for word in text.split():
+                weight = 1.0
+                if word.startswith("(") and ":" in word:
+                    word, weight = word[1:-1].split(":")
+                    weight = float(weight)
+                tokens.append((sum(word.encode()) % 990, weight))
+            chunks = max(1, (len(tokens) + 7) // 8)
+            tokens += [(999, 1.0)] * (chunks * 8 - len(tokens))
+            chunked = [[(998, 1.0)] + tokens[i*8:(i+1)*8] + [(999, 1.0)] for i in range(chunks)]
+            return {"l": [list(chunk) for chunk in chunked], "g": [list(chunk) for chunk in chunked]}
+
+        def encode_from_tokens(self, tokens, return_pooled=False, return_dict=False):
+            cond, pooled = self.cond_stage_model.encode_token_weights(tokens)
+            return (cond, pooled) if return_pooled else cond
+
+        def add_hooks_to_dict(self, pooled_dict: dict):
+            return pooled_dict
+
+    return TinyCLIP
+
+
+PROMPTS = ["a cat", "a dog on a hill", "(cat:1.3) in the rain", "a very long prompt with many words that needs two chunks to encode",
+           "a  cat", "sun", "moon and stars", "(dog:0.8) (cat:1.2) together"]
+
+
+@pytest.mark.parametrize("batch_size", [2, 3, 64])
+def test_batched_encoding_matches_single(ade, tiny_clip_cls, batch_size):
+    scheduling = ade("scheduling")
+    encoded = {}
+    for size in (1, batch_size):
+        clip = tiny_clip_cls()
+        memo = scheduling.EncodingMemo()
+        memo.prepare(source_clip=clip, clip=clip)
+        with torch.no_grad():
+            memo.encode_all(PROMPTS, batch_size=size)
+        encoded[size] = [memo.lookup(prompt) for prompt in PROMPTS]
+        # "a  cat" tokenizes the same as "a cat", so is only encoded once
+        assert memo.encode_count == len(PROMPTS) - 1
+        # regular encode is restored afterwards
+        assert "encode" not in vars(clip.cond_stage_model.clip_l)
+        if size == 1:
+            assert max(clip.cond_stage_model.clip_l.forward_batches) <= 2
+        else:
+            assert len(clip.cond_stage_model.clip_l.forward_batches) < len(PROMPTS) - 1
+            assert max(clip.cond_stage_model.clip_l.forward_batches) <= batch_size
+    for (cond, pooled), (cond_batched, pooled_batched) in zip(encoded[1], encoded[batch_size]):
+        assert cond.shape == cond_batched.shape
+        assert torch.allclose(cond, cond_batched, atol=1e-5)
+        assert torch.allclose(pooled, pooled_batched, atol=1e-5)
+
+
+def test_batched_encoding_in_schedule(ade, tiny_clip_cls):
+    scheduling = ade("scheduling")
+    schedule = ", ".join(f'"{i*4}": "{prompt}"' for i, prompt in enumerate(PROMPTS))
+    outputs = []
+    for batch_size in (1, 8):
+        with torch.no_grad():
+            outputs.append(scheduling.evaluate_prompt_schedule(schedule, len(PROMPTS)*4, tiny_clip_cls(),
+                                                               scheduling.PromptOptions(encode_batch_size=batch_size)))
+    for (cond, pooled_dict), (cond_batched, pooled_dict_batched) in zip(*outputs):
+        assert torch.allclose(cond, cond_batched, atol=1e-5)
+        assert torch.allclose(pooled_dict["pooled_output"], pooled_dict_batched["pooled_output"], atol=1e-5)
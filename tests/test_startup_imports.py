@@ -0,0 +1,84 @@
+import importlib
+import json
+import subprocess
+import sys
+
+from conftest import COMFYUI_PATH, PACKAGE_NAME, REPO_ROOT, load_package
+
+# modules that are fine to load when ComfyUI imports the package; everything else is only imported once a node is used
+STARTUP_MODULES = {"", "animatediff", "animatediff.logger", "animatediff.documentation", "animatediff.nodes",
+                   "animatediff.dinklink", "animatediff.utils_model"}
+
+# run in a fresh interpreter, so modules imported by other tests do not count
+STARTUP_SCRIPT = f'''
+import importlib.util, json, sys, time
+sys.path.insert(0, {str(COMFYUI_PATH)!r})
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location({PACKAGE_NAME!r}, {str(REPO_ROOT / "__init__.py")!r},
+                                              submodule_search_locations=[{str(REPO_ROOT)!r}])
+package = importlib.util.module_from_spec(spec)
+sys.modules[{PACKAGE_NAME!r}] = package
+spec.loader.exec_module(package)
+seconds = time.perf_counter() - start
+prefix = {PACKAGE_NAME!r}
+loaded = sorted(name[len(prefix)+1:] for name in sys.modules if name == prefix or name.startswith(prefix + "."))
+with open(sys.argv[1], "w") as f:
+    json.dump({{"seconds": seconds, "loaded": loaded, "nodes": len(package.NODE_CLASS_MAPPINGS)}}, f)
+'''
+
+
+def run_startup_import(tmp_path) -> dict:
+    # result goes to a file, since logs from the package can be interleaved with stdout
+    result_path = tmp_path / "startup.json"
+    result = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT, str(result_path)], capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result_path.read_text())
+
+
+def test_startup_does_not_import_node_modules(tmp_path):
+    # skips if ComfyUI is not available
+    load_package()
+    startup = run_startup_import(tmp_path)
+    print(f"package import: {startup['seconds']*1000:.1f}ms for {startup['nodes']} nodes")
+    heavy = [name for name in startup["loaded"] if name not in STARTUP_MODULES]
+    assert heavy == [], f"modules imported at startup: {heavy}"
+
+
+def test_node_import_benchmark():
+    package = load_package()
+    nodes = importlib.import_module(f"{PACKAGE_NAME}.animatediff.nodes")
+    # logs import cost of each node module (only meaningful in a fresh process, e.g. pytest -s -k benchmark)
+    nodes.benchmark_node_imports()
+    # every registered node must resolve to its real class
+    for node_id, node in package.NODE_CLASS_MAPPINGS.items():
+        assert hasattr(node._resolve_node(), "INPUT_TYPES"), node_id
+
+
+def test_dinklink_classes_resolve_on_access():
+    load_package()
+    dinklink = importlib.import_module(f"{PACKAGE_NAME}.animatediff.dinklink")
+    motion_module_ad = importlib.import_module(f"{PACKAGE_NAME}.animatediff.motion_module_ad")
+    link_ade = dinklink.get_dinklink()[dinklink.DinkLinkConst.ADE]
+    assert dinklink.DinkLinkConst.ADE_ANIMATEDIFFMODEL in link_ade
+    assert link_ade[dinklink.DinkLinkConst.ADE_ANIMATEDIFFMODEL] is motion_module_ad.AnimateDiffModel
+    assert link_ade.get(dinklink.DinkLinkConst.ADE_ANIMATEDIFFINFO) is motion_module_ad.AnimateDiffInfo
+
+
+def test_dinklink_lazy_entries_enumerate_and_copy():
+    load_package()
+    dinklink = importlib.import_module(f"{PACKAGE_NAME}.animatediff.dinklink")
+    motion_module_ad = importlib.import_module(f"{PACKAGE_NAME}.animatediff.motion_module_ad")
+    link = dinklink.LazyLinkDict({"version": 1})
+    link.set_lazy("model", ".motion_module_ad", "AnimateDiffModel")
+    link.set_lazy("info", ".motion_module_ad", "AnimateDiffInfo")
+    expected = {"version": 1, "model": motion_module_ad.AnimateDiffModel, "info": motion_module_ad.AnimateDiffInfo}
+    assert len(link) == 3
+    assert set(link) == set(expected) and set(link.keys()) == set(expected)
+    copied = link.copy()
+    assert isinstance(copied, dinklink.LazyLinkDict) and set(copied) == set(expected)
+    assert dict(link.items()) == expected
+    assert list(link.values()).count(motion_module_ad.AnimateDiffInfo) == 1
+    assert dict(copied) == expected
+    assert {**dinklink.LazyLinkDict(copied)} == expected
+    del copied["model"]
+    assert "model" not in copied and len(copied) == 2